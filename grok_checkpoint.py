@@ -3,11 +3,11 @@ import subprocess
 import sys
 import argparse
 import datetime
-import json
 import uuid
 import logging
 from logging.handlers import RotatingFileHandler
 from git_ops import get_git_interface
+from grok_local.checkpoint_store import CheckpointStore, checkpoint_fields
 
 PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
 CHECKPOINT_DIR = os.path.join(PROJECT_DIR, "checkpoints")
@@ -26,14 +26,18 @@ if not os.path.exists(CHECKPOINT_DIR):
     logger.info(f"Created checkpoint directory: {CHECKPOINT_DIR}")
 
 def list_checkpoints():
-    checkpoint_files = [f for f in os.listdir(CHECKPOINT_DIR) if f.endswith('.json') and 'checkpoint' in f.lower()]
-    if not checkpoint_files:
-        logger.info("No checkpoint files found in checkpoints/")
-        return "No checkpoint files found in checkpoints/"
-    logger.info(f"Found checkpoint files in checkpoints/: {checkpoint_files}")
-    return "\n".join(checkpoint_files)
+    store = CheckpointStore()
+    try:
+        checkpoints, total = store.query()
+    finally:
+        store.close()
+    if not total:
+        logger.info("No checkpoints found in checkpoints/")
+        return "No checkpoints found in checkpoints/"
+    logger.info(f"Found {total} checkpoints in checkpoints/")
+    return "\n".join(f"{cp.get('timestamp')}: {checkpoint_fields(cp)[3]}" for cp in checkpoints)
 
-def save_checkpoint(description, git_interface, filename="checkpoint.json", current_task="", chat_address=None, chat_group=None, chat_url=None, file_content=None, git_update=False):
+def save_checkpoint(description, git_interface, filename=None, current_task="", chat_address=None, chat_group=None, chat_url=None, file_content=None, git_update=False):
     checkpoint_data = {
         "description": description,
         "timestamp": datetime.datetime.now().isoformat(),
@@ -46,11 +50,17 @@ def save_checkpoint(description, git_interface, filename="checkpoint.json", curr
         checkpoint_data["chat_url"] = chat_url
     if file_content:
         checkpoint_data["file_content"] = file_content
+    if filename:
+        checkpoint_data["name"] = filename  # --file used to pick the file; it now names the log entry
     
     try:
-        checkpoint_path = os.path.join(CHECKPOINT_DIR, filename)
-        with open(checkpoint_path, "w") as f:
-            json.dump(checkpoint_data, f, indent=4)
+        # Appended to the same log checkpoint_command writes, so list checkpoints sees both.
+        store = CheckpointStore()
+        try:
+            store.append(checkpoint_data)
+        finally:
+            store.close()
+        checkpoint_path = store.log_path
         logger.info(f"Checkpoint saved: {description} to {checkpoint_path}")
 
         bootstrap_path = os.path.join(PROJECT_DIR, "grok_bootstrap.py")
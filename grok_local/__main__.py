@@ -3,7 +3,9 @@ import atexit
 import argparse
 import time
 import signal
+import socket
 import sys
+import importlib.util
 sys.path.insert(0, '.')
 from grok_local.command_handler import CommandHandler
 from git_ops import get_git_interface
@@ -12,22 +14,42 @@ from grok_local.ai_adapters.stub_ai import StubAI
 print(f"Debug: Imported CommandHandler from {CommandHandler.__module__}", file=sys.stderr)
 
 BRIDGE_PROCESS = None
+BRIDGE_HOST, BRIDGE_PORT = "127.0.0.1", 5000
+
+def _bridge_listening():
+    try:
+        with socket.create_connection((BRIDGE_HOST, BRIDGE_PORT), timeout=0.2):
+            return True
+    except OSError:
+        return False
 
 def start_bridge():
     global BRIDGE_PROCESS
     if BRIDGE_PROCESS is None:
-        BRIDGE_PROCESS = subprocess.Popen(["python", "grok_local/grok_bridge.py"])
+        # Prefer the asyncio bridge; fall back to the Flask one when aiohttp isn't installed.
+        if importlib.util.find_spec("aiohttp"):
+            BRIDGE_PROCESS = subprocess.Popen([sys.executable, "-m", "grok_local.grok_bridge_async"])
+        else:
+            BRIDGE_PROCESS = subprocess.Popen(["python", "grok_local/grok_bridge.py"])
+        deadline = time.time() + 5
+        while time.time() < deadline and BRIDGE_PROCESS.poll() is None and not _bridge_listening():
+            time.sleep(0.05)
         print("Started grok_bridge at http://0.0.0.0:5000")
-        time.sleep(2)
 
 def stop_bridge():
     global BRIDGE_PROCESS
     if BRIDGE_PROCESS and BRIDGE_PROCESS.poll() is None:
-        BRIDGE_PROCESS.send_signal(signal.SIGTERM)
         try:
-            BRIDGE_PROCESS.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            BRIDGE_PROCESS.kill()
+            import requests
+            requests.post(f"http://{BRIDGE_HOST}:{BRIDGE_PORT}/shutdown", timeout=2)
+            BRIDGE_PROCESS.wait(timeout=2)
+        except Exception:
+            # Flask bridge (no /shutdown) or a bridge that didn't drain in time.
+            BRIDGE_PROCESS.send_signal(signal.SIGTERM)
+            try:
+                BRIDGE_PROCESS.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                BRIDGE_PROCESS.kill()
         print("Stopped grok_bridge")
         BRIDGE_PROCESS = None
 
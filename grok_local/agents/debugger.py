@@ -13,9 +13,12 @@ class DebuggerAgent(BaseAgent):
         error = task.input_data
         context = memory.retrieve(f"debug:{code}") or ""
         prompt = f"Fix this code given the error:\nCode:\n\nError: {error}\nContext: {context}\nReturn only fixed code in  format, no explanations."
-        log_conversation(f"Debugger: Starting model call at {datetime.now()} with prompt length: {len(prompt)}")
+        started = datetime.now()
+        log_conversation(f"Debugger: Starting model call at {started} with prompt length: {len(prompt)}")
         response = self._call_model(prompt)
-        log_conversation(f"Debugger: Model call completed at {datetime.now()}")
+        completed = datetime.now()
+        log_conversation(f"Debugger: Model call completed at {completed}", event="model_call",
+                         duration=(completed - started).total_seconds(), model=self.model, agent="Debugger")
         try:
             fixed_code = response.split("")[0].strip()
         except IndexError:
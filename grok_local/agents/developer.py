@@ -12,9 +12,12 @@ class DeveloperAgent(BaseAgent):
     def run(self, task: Task, memory):
         context = memory.retrieve(task.description) or ""
         prompt = f"Generate Python code for: {task.description}. Context: {context}\nReturn only code in ```python format, no explanations."
-        log_conversation(f"Developer: Sending prompt at {datetime.now()}: {prompt}")
+        started = datetime.now()
+        log_conversation(f"Developer: Sending prompt at {started}: {prompt}")
         response = self.stub_ai.delegate(prompt)
-        log_conversation(f"Developer: Received response at {datetime.now()}: {response}")
+        completed = datetime.now()
+        log_conversation(f"Developer: Received response at {completed}: {response}", event="model_call",
+                         duration=(completed - started).total_seconds(), model=self.model, agent="Developer")
         try:
             if "```python" in response:
                 code = response.split("```python")[1].split("```")[0].strip()
@@ -1,10 +1,17 @@
 # grok_local/ai_adapters/grok_browser_ai.py
 from abc import ABC, abstractmethod
-import time
+import asyncio
 import logging
-from grok_local.browser_adapter import BrowserAdapter
+from grok_local.browser_pool import get_pool
+from grok_local.async_browser import get_async_browser, run_sync, stream_sync
+from grok_local.utils import drain_stream
 from grok_local.config import logger, BROWSER_BACKEND
 
+GROK_CHAT_URL = "https://grok.com"
+RESPONSE_STABLE_MS = 1500  # The answer is complete once its text stops changing for this long
+RESPONSE_TIMEOUT = 120
+STOP_SELECTOR = None  # "Stop generating" button, if the chat UI shows one while answering; ends the stream early
+
 class AIAdapter(ABC):
     @abstractmethod
     def delegate(self, request):
@@ -12,25 +19,60 @@ class AIAdapter(ABC):
 
 class GrokBrowserAI(AIAdapter):
     def __init__(self):
-        self.browser = BrowserAdapter(BROWSER_BACKEND)
+        self.backend = BROWSER_BACKEND
 
     def delegate(self, request):
         try:
-            logger.info("Navigating to grok.com home page")
-            self.browser.goto("https://grok.com")
-            time.sleep(5)
+            return drain_stream(self.stream(request))
+        except Exception as e:
+            logger.error(f"Browser interaction error: {str(e)}")
+            return f"Error with grok.com browser: {str(e)}"
+
+    def stream(self, request):
+        """Yield answer deltas as grok.com renders them; returns the full answer. Errors propagate."""
+        if self.backend == "PLAYWRIGHT_ASYNC":
+            # Shared browser on a background loop: concurrent callers each get their own tab.
+            return (yield from stream_sync(lambda on_delta: self.astream(request, on_delta)))
+        # Pages come from the calling thread's pool, already sitting on grok.com; no launch or load per call.
+        with get_pool(GROK_CHAT_URL, self.backend).checkout() as browser:
             logger.debug(f"Sending prompt: {request}")
-            self.browser.fill(".question-input", request)
-            self.browser.click(".submit-btn")
-            time.sleep(5)
-            response = self.browser.extract_text(".response-output")
-            if not response or response.strip() == "":
-                logger.warning("No response extracted from grok.com")
-                return "No response received from grok.com"
-            logger.info(f"Grok.com browser response to '{request}': {response}")
-            return response
+            browser.wait_for_selector(".question-input")
+            browser.fill(".question-input", request)
+            browser.watch_text(".response-output", STOP_SELECTOR)
+            browser.click(".submit-btn")
+            response = yield from browser.stream_text(".response-output", RESPONSE_STABLE_MS, RESPONSE_TIMEOUT,
+                                                      STOP_SELECTOR)
+        return self._finish(request, response)
+
+    async def astream(self, request, on_delta):
+        """stream() on a tab of the shared async browser, with deltas passed to on_delta; returns the full answer."""
+        async with get_async_browser(GROK_CHAT_URL).tab() as tab:
+            logger.debug(f"Sending prompt: {request}")
+            await tab.wait_for_selector(".question-input")
+            await tab.fill(".question-input", request)
+            await tab.watch_text(".response-output", STOP_SELECTOR)
+            await tab.click(".submit-btn")
+            response = await tab.stream_text(".response-output", on_delta, RESPONSE_STABLE_MS, RESPONSE_TIMEOUT,
+                                             STOP_SELECTOR)
+        return self._finish(request, response)
+
+    async def adelegate(self, request):
+        """delegate() on the shared async browser; must run on that browser's loop (see run_sync)."""
+        try:
+            return await self.astream(request, lambda delta: None)
         except Exception as e:
             logger.error(f"Browser interaction error: {str(e)}")
             return f"Error with grok.com browser: {str(e)}"
-        finally:
-            self.browser.close()
+
+    def delegate_many(self, requests):
+        """Answer several prompts at once, one tab each (up to GROK_BROWSER_TABS); results keep input order."""
+        async def gather():
+            return await asyncio.gather(*(self.adelegate(request) for request in requests))
+        return run_sync(gather())
+
+    def _finish(self, request, response):
+        if not response or response.strip() == "":
+            logger.warning("No response extracted from grok.com")
+            return "No response received from grok.com"
+        logger.info(f"Grok.com browser response to '{request}': {response}")
+        return response
@@ -3,7 +3,8 @@ from abc import ABC, abstractmethod
 import requests
 import time
 import logging
-from grok_local.config import logger
+from grok_local.config import logger, OLLAMA_URL
+from grok_local.utils import stream_ollama
 
 class AIAdapter(ABC):
     @abstractmethod
@@ -18,7 +19,7 @@ class LocalDeepSeekAI(AIAdapter):
 
     def delegate(self, request):
         try:
-            url = "http://localhost:11434/api/generate"
+            url = OLLAMA_URL
             payload = {
                 "model": self.model,
                 "prompt": request,
@@ -35,3 +36,11 @@ class LocalDeepSeekAI(AIAdapter):
         except Exception as e:
             logger.error(f"Local {self.model} error: {str(e)}")
             return f"Error with local {self.model}: {str(e)}"
+
+    def stream(self, request):
+        """Yield response deltas as the local model generates them; returns the full response."""
+        start_time = time.time()
+        result = yield from stream_ollama(OLLAMA_URL, {"model": self.model, "prompt": request, "stream": True}, timeout=600)
+        logger.info(f"Local {self.model} took {time.time() - start_time:.2f} seconds")
+        logger.info(f"Local {self.model} response: {result}")
+        return result
@@ -0,0 +1,168 @@
+# grok_local/asset_cache.py
+"""Request interception for Playwright pages: block heavy or tracking requests and serve static
+content-hashed assets (Next.js chunks like main-app-1284e9164cb2e71b.js) from a local cache.
+
+Because those asset URLs change whenever their content does, a cached copy never goes stale, so after
+the first visit a page load only fetches the HTML and API calls.
+"""
+import os
+import re
+import json
+import hashlib
+import tempfile
+import threading
+from urllib.parse import urlparse
+from grok_local.config import logger
+
+ASSET_CACHE_DIR = os.getenv("GROK_ASSET_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "asset_cache"))
+INTERCEPT = os.getenv("GROK_BROWSER_INTERCEPT", "1").lower() not in ("0", "false", "no")
+BLOCKED_TYPES = {t.strip() for t in os.getenv("GROK_BROWSER_BLOCK", "image,font,media").split(",") if t.strip()}
+ANALYTICS_HOSTS = ("google-analytics.com", "googletagmanager.com", "doubleclick.net", "segment.io", "segment.com",
+                   "mixpanel.com", "sentry.io", "datadoghq.com", "amplitude.com", "hotjar.com", "ads-twitter.com")
+CACHEABLE_TYPES = {"script", "stylesheet", "font"}
+# Response headers stored with a cached asset and replayed on a hit. Without the CORS ones a crossorigin
+# script or font served from the cache is rejected by the page; they are replayed as first received, so
+# an Access-Control-Allow-Origin echoing one page's origin is only right for pages of that origin.
+REPLAYED_HEADERS = ("content-type", "access-control-", "timing-allow-origin", "cross-origin-resource-policy")
+_HASHED_ASSET = re.compile(r"(/_next/static/|[-./][0-9a-f]{8,}\.(?:js|css|woff2?|ttf)$)")
+
+def is_hashed_asset(url):
+    return bool(_HASHED_ASSET.search(urlparse(url).path))
+
+def replayed_headers(headers):
+    """The subset of a response's headers (names lowercased) worth replaying from the cache."""
+    return {name.lower(): value for name, value in headers.items() if name.lower().startswith(REPLAYED_HEADERS)}
+
+def is_analytics(url):
+    host = urlparse(url).hostname or ""
+    return any(host == h or host.endswith("." + h) for h in ANALYTICS_HOSTS)
+
+class AssetCache:
+    """Content-addressed blobs (objects/ab/<sha256>) plus one small index file per URL; safe across processes."""
+
+    def __init__(self, root=ASSET_CACHE_DIR):
+        self.root = root
+
+    def _index_path(self, url):
+        return os.path.join(self.root, "index", hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def get(self, url):
+        """(body, headers) for a cached url, or None."""
+        try:
+            with open(self._index_path(url), encoding="utf-8") as f:
+                entry = json.load(f)
+            with open(self._object_path(entry["digest"]), "rb") as f:
+                body = f.read()
+            # Entries written before headers were kept have only the content type.
+            return body, entry.get("headers") or {"content-type": entry["content_type"]}
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, url, body, headers):
+        """Cache body with the replayable subset of its response headers."""
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            self._write(path, body)  # Identical chunks under different URLs are stored once
+        headers = replayed_headers(headers)
+        headers.setdefault("content-type", "application/octet-stream")
+        entry = {"url": url, "digest": digest, "content_type": headers["content-type"], "headers": headers,
+                 "size": len(body)}
+        self._write(self._index_path(url), json.dumps(entry).encode("utf-8"))
+
+class RequestInterceptor:
+    """Route handler for page.route('**/*', ...), with per-navigation counters (see reset())."""
+
+    def __init__(self, cache=None, blocked_types=BLOCKED_TYPES):
+        self.cache = cache or AssetCache()
+        self.blocked_types = set(blocked_types)
+        self._lock = threading.Lock()
+        self.stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats():
+        return {"requests": 0, "blocked": 0, "cache_hits": 0, "cache_misses": 0, "bytes_saved": 0, "bytes_cached": 0}
+
+    def reset(self):
+        """Start counting a new navigation; returns the counters of the previous one."""
+        with self._lock:
+            stats, self.stats = self.stats, self._empty_stats()
+        return stats
+
+    def _count(self, **increments):
+        with self._lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def _decide(self, request):
+        url, kind = request.url, request.resource_type
+        self._count(requests=1)
+        if kind in self.blocked_types or is_analytics(url):
+            self._count(blocked=1)
+            return "block", None
+        if request.method == "GET" and kind in CACHEABLE_TYPES and is_hashed_asset(url):
+            cached = self.cache.get(url)
+            if cached:
+                self._count(cache_hits=1, bytes_saved=len(cached[0]))
+                return "hit", cached
+            return "fetch", None
+        return "continue", None
+
+    def _store(self, url, response, body):
+        self._count(cache_misses=1)
+        if response.status == 200:
+            self.cache.put(url, body, response.headers)
+            self._count(bytes_cached=len(body))
+
+    def handle(self, route):
+        action, cached = self._decide(route.request)
+        try:
+            if action == "block":
+                route.abort()
+            elif action == "hit":
+                route.fulfill(status=200, body=cached[0], headers=cached[1])
+            elif action == "fetch":
+                response = route.fetch()
+                body = response.body()
+                self._store(route.request.url, response, body)
+                route.fulfill(response=response, body=body)
+            else:
+                route.continue_()
+        except Exception as e:
+            logger.debug(f"Request interception failed for {route.request.url}: {str(e)}")
+            if action == "fetch":
+                route.continue_()  # Don't leave the request hanging; let it hit the network untouched
+
+    async def handle_async(self, route):
+        action, cached = self._decide(route.request)
+        try:
+            if action == "block":
+                await route.abort()
+            elif action == "hit":
+                await route.fulfill(status=200, body=cached[0], headers=cached[1])
+            elif action == "fetch":
+                response = await route.fetch()
+                body = await response.body()
+                self._store(route.request.url, response, body)
+                await route.fulfill(response=response, body=body)
+            else:
+                await route.continue_()
+        except Exception as e:
+            logger.debug(f"Request interception failed for {route.request.url}: {str(e)}")
+            if action == "fetch":
+                await route.continue_()
+
+def log_navigation(url, stats):
+    logger.info(f"Loaded {url}: {stats['requests']} requests, {stats['blocked']} blocked, "
+                f"{stats['cache_hits']} served from cache ({stats['bytes_saved']} bytes saved), "
+                f"{stats['cache_misses']} cached for next time")
@@ -0,0 +1,282 @@
+# grok_local/async_browser.py
+"""Async Playwright backend: one Chromium, up to N tabs driven concurrently.
+
+AsyncTab mirrors BrowserAdapter's methods as coroutines. Sync callers (adapters running in dispatcher
+worker threads) go through run_sync(), which schedules work on a single background event loop that owns
+the shared browser, so concurrent delegations each get their own tab instead of their own browser.
+"""
+import os
+import time
+import queue
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from grok_local.config import logger
+from grok_local.browser_adapter import (DEFAULT_WAIT, POLL_INTERVAL, last_text_script, watch_text_script,
+                                        poll_text_script)
+from grok_local.asset_cache import RequestInterceptor, INTERCEPT, log_navigation
+from grok_local.browser_replay import replay_url, replay_har
+
+try:
+    from playwright.async_api import async_playwright
+    ASYNC_PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    ASYNC_PLAYWRIGHT_AVAILABLE = False
+
+MAX_TABS = int(os.getenv("GROK_BROWSER_TABS", 4))
+
+async def wait_until_stable_async(read, stable_ms=1000, timeout=60, interval=POLL_INTERVAL, description="value"):
+    """Async twin of browser_adapter.wait_until_stable; read is a coroutine function."""
+    deadline = time.monotonic() + timeout
+    last, changed_at = None, time.monotonic()
+    while True:
+        value = await read()
+        now = time.monotonic()
+        if value != last:
+            last, changed_at = value, now
+        elif value and (now - changed_at) * 1000 >= stable_ms:
+            return value
+        if now >= deadline:
+            raise TimeoutError(f"Timed out after {timeout}s waiting for {description} to settle")
+        await asyncio.sleep(interval)
+
+async def stream_deltas_async(poll, on_delta, stable_ms=1000, timeout=60, interval=0.05, description="answer"):
+    """Async twin of browser_adapter.stream_deltas: deltas go to on_delta(text); returns the final text."""
+    deadline = time.monotonic() + timeout
+    sent = ""
+    while True:
+        state = await poll() or {"text": "", "idle_ms": 0, "stopped": False}
+        text = (state["text"] or "").rstrip()
+        if text.startswith(sent) and len(text) > len(sent):
+            on_delta(text[len(sent):])
+            sent = text
+        if text and (state["stopped"] or state["idle_ms"] >= stable_ms):
+            return text
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Timed out after {timeout}s waiting for {description} to finish")
+        await asyncio.sleep(interval)
+
+class AsyncTab:
+    backend = "PLAYWRIGHT_ASYNC"
+
+    def __init__(self, page, interceptor=None):
+        self.driver = page
+        self.interceptor = interceptor
+        self.last_navigation = None
+
+    async def goto(self, url):
+        url = replay_url(url)
+        logger.debug(f"Navigating to {url} with {self.backend}")
+        if self.interceptor:
+            self.interceptor.reset()
+        await self.driver.goto(url)
+        if self.interceptor:
+            self.last_navigation = self.interceptor.reset()
+            log_navigation(url, self.last_navigation)
+
+    async def fill(self, selector, value):
+        logger.debug(f"Filling {selector} with '{value}' using {self.backend}")
+        await self.driver.wait_for_selector(selector, timeout=DEFAULT_WAIT * 1000)
+        await self.driver.fill(selector, value)
+
+    async def click(self, selector):
+        logger.debug(f"Clicking {selector} with {self.backend}")
+        await self.driver.wait_for_selector(selector, timeout=DEFAULT_WAIT * 1000)
+        await self.driver.click(selector)
+
+    async def extract_text(self, selector):
+        await self.driver.wait_for_selector(selector, timeout=DEFAULT_WAIT * 1000)
+        return await self.driver.locator(selector).last.inner_text()
+
+    async def evaluate(self, script):
+        return await self.driver.evaluate(script)
+
+    async def content(self):
+        return await self.driver.content()
+
+    async def wait_for_selector(self, selector, timeout=DEFAULT_WAIT):
+        try:
+            await self.driver.wait_for_selector(selector, timeout=timeout * 1000)
+        except Exception as e:
+            raise TimeoutError(f"Timed out after {timeout}s waiting for {selector}") from e
+
+    async def wait_for_network_idle(self, timeout=DEFAULT_WAIT, idle_ms=500):
+        try:
+            await self.driver.wait_for_load_state("networkidle", timeout=timeout * 1000)
+        except Exception as e:
+            raise TimeoutError(f"Timed out after {timeout}s waiting for network idle") from e
+
+    async def wait_for_text_stable(self, selector, stable_ms=1000, timeout=60):
+        script = last_text_script(selector)
+        read = lambda: self._read(script)
+        return await wait_until_stable_async(read, stable_ms, timeout, description=selector)
+
+    async def watch_text(self, selector, stop_selector=None):
+        await self.driver.evaluate(watch_text_script(selector, stop_selector))
+
+    async def stream_text(self, selector, on_delta, stable_ms=1000, timeout=60, stop_selector=None):
+        """Feed answer deltas to on_delta as they render; returns the complete text (see BrowserAdapter.stream_text)."""
+        if await self.driver.evaluate(poll_text_script()) is None:
+            await self.watch_text(selector, stop_selector)
+        script = poll_text_script(stop_selector)
+        poll = lambda: self.driver.evaluate(script)
+        return await stream_deltas_async(poll, on_delta, stable_ms, timeout, description=selector)
+
+    async def _read(self, script):
+        return ((await self.driver.evaluate(script)) or "").strip()
+
+    async def is_alive(self):
+        if self.driver.is_closed():
+            return False
+        try:
+            await self.driver.evaluate("1")
+            return True
+        except Exception as e:
+            logger.debug(f"Async tab health check failed: {str(e)}")
+            return False
+
+class AsyncBrowserAdapter:
+    """One Chromium with at most max_tabs pages in use at once; idle pages are kept warm on warm_url."""
+
+    def __init__(self, headless=True, max_tabs=MAX_TABS, warm_url=None, intercept=INTERCEPT):
+        if not ASYNC_PLAYWRIGHT_AVAILABLE:
+            raise ValueError("Unsupported or unavailable browser backend: PLAYWRIGHT_ASYNC")
+        self.headless = headless
+        self.max_tabs = max_tabs
+        self.warm_url = warm_url
+        self.intercept = intercept
+        self._playwright = None
+        self._browser = None
+        self._idle = []
+        self._slots = asyncio.Semaphore(max_tabs)
+        self._lock = asyncio.Lock()
+        self._rewarming = set()  # Tasks taking used tabs back to warm_url
+
+    async def _ensure_browser(self):
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=self.headless)
+                self._idle = []
+                logger.info(f"Async browser launched for up to {self.max_tabs} concurrent tabs")
+        return self._browser
+
+    async def _new_tab(self):
+        browser = await self._ensure_browser()
+        context = await browser.new_context()
+        page = await context.new_page()
+        interceptor = None
+        if self.intercept:
+            interceptor = RequestInterceptor()
+            await page.route("**/*", interceptor.handle_async)
+        if replay_har():
+            await page.route_from_har(replay_har(), not_found="abort")
+        tab = AsyncTab(page, interceptor)
+        if self.warm_url:
+            await tab.goto(self.warm_url)
+        return tab
+
+    async def _discard(self, tab):
+        try:
+            await tab.driver.context.close()
+        except Exception as e:
+            logger.debug(f"Error closing async tab: {str(e)}")
+
+    async def _rewarm(self, tab):
+        """Take a used tab back to warm_url, then make it idle; its slot stays taken until then."""
+        try:
+            await tab.goto(self.warm_url)
+            self._idle.append(tab)
+        except Exception as e:
+            logger.warning(f"Re-warming async tab failed: {str(e)}")
+            await self._discard(tab)
+        finally:
+            self._slots.release()
+
+    @asynccontextmanager
+    async def tab(self):
+        """async with adapter.tab() as tab: ... — waits for a free slot; a failing tab is closed, not reused.
+
+        A used tab goes back to warm_url in the background, so the caller is not held up by the reload.
+        """
+        await self._slots.acquire()
+        try:
+            tab = None
+            while self._idle and tab is None:
+                candidate = self._idle.pop()
+                if await candidate.is_alive():
+                    tab = candidate
+                else:
+                    await self._discard(candidate)
+            if tab is None:
+                tab = await self._new_tab()
+        except BaseException:
+            self._slots.release()
+            raise
+        healthy = False
+        try:
+            yield tab
+            healthy = True
+        finally:
+            if healthy and self.warm_url:
+                task = asyncio.ensure_future(self._rewarm(tab))
+                self._rewarming.add(task)
+                task.add_done_callback(self._rewarming.discard)
+            else:
+                if healthy:
+                    self._idle.append(tab)
+                else:
+                    await self._discard(tab)
+                self._slots.release()
+
+    async def close(self):
+        if self._rewarming:
+            await asyncio.gather(*self._rewarming, return_exceptions=True)
+        for tab in self._idle:
+            await self._discard(tab)
+        self._idle = []
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._browser = self._playwright = None
+
+_loop = None
+_loop_lock = threading.Lock()
+_adapters = {}
+
+def _browser_loop():
+    """The background event loop that owns every shared AsyncBrowserAdapter."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="async-browser", daemon=True).start()
+    return _loop
+
+def get_async_browser(warm_url=None):
+    """The shared adapter for warm_url; only use it from coroutines run via run_sync()."""
+    with _loop_lock:
+        if warm_url not in _adapters:
+            _adapters[warm_url] = AsyncBrowserAdapter(warm_url=warm_url)
+        return _adapters[warm_url]
+
+def run_sync(coro, timeout=None):
+    """Run a coroutine on the browser loop from any thread and block for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _browser_loop()).result(timeout)
+
+def stream_sync(start):
+    """Generator bridging a streaming coroutine to sync callers.
+
+    start(on_delta) must return a coroutine that calls on_delta(text) for each delta and returns the
+    final value; the deltas are yielded here as they arrive and the final value is the generator's return.
+    """
+    deltas = queue.Queue()
+    future = asyncio.run_coroutine_threadsafe(start(deltas.put), _browser_loop())
+    future.add_done_callback(lambda _: deltas.put(None))
+    while True:
+        delta = deltas.get()
+        if delta is None:
+            return future.result()
+        yield delta
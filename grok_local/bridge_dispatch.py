@@ -0,0 +1,194 @@
+# grok_local/bridge_dispatch.py
+"""Scheduler that answers bridge requests itself by fanning them out to get_ai_adapter backends."""
+import os
+import time
+import heapq
+import itertools
+import threading
+from grok_local.config import logger
+from grok_local.utils import drain_stream
+
+DEFAULT_PRIORITY = 5  # Lower is more urgent
+AGING_SECONDS = float(os.getenv("GROK_BRIDGE_AGING_SECONDS", 30))  # Waiting this long is worth one priority level
+MAX_ATTEMPTS = 2
+BRIDGE_BACKENDS = os.getenv("GROK_BRIDGE_BACKENDS", "")  # e.g. "LOCAL_DEEPSEEK:2,CHATGPT:4"; empty = mailbox only
+
+def parse_backends(spec):
+    """'LOCAL_DEEPSEEK:2,STUB' -> {'LOCAL_DEEPSEEK': 2, 'STUB': 1}"""
+    backends = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, slots = part.partition(":")
+        backends[name.strip().upper()] = max(1, int(slots)) if slots else 1
+    return backends
+
+class _Job:
+    __slots__ = ("request_id", "question", "priority", "backend", "enqueued_at", "attempts", "tried")
+
+    def __init__(self, request_id, question, priority, backend):
+        self.request_id = request_id
+        self.question = question
+        self.priority = priority
+        self.backend = backend
+        self.enqueued_at = time.time()
+        self.attempts = 0
+        self.tried = set()
+
+    @property
+    def key(self):
+        # Aging: every AGING_SECONDS spent queued counts as one priority level. Because all jobs age at
+        # the same rate, priority * AGING_SECONDS + enqueued_at orders them exactly like the aged score.
+        return self.priority * AGING_SECONDS + self.enqueued_at
+
+class Dispatcher:
+    """Priority queues per backend plus a shared one, served by a fixed number of worker slots per backend.
+
+    A worker takes the more urgent (aged) of the heads of its own backend's queue and the shared queue,
+    and when both are empty steals the most urgent job queued for another backend it hasn't already
+    failed on.
+    """
+
+    def __init__(self, store, backends, on_complete=None, adapter_factory=None, on_chunk=None):
+        self.store = store
+        self.backends = dict(backends)
+        self.on_complete = on_complete
+        self.on_chunk = on_chunk
+        self.adapter_factory = adapter_factory
+        self.queues = {name: [] for name in self.backends}
+        self.queues[None] = []  # Jobs any backend may take
+        self.busy = {name: 0 for name in self.backends}
+        self.stats = {name: {"completed": 0, "failed": 0, "stolen": 0} for name in self.backends}
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stopping = False
+
+    def start(self):
+        for name, slots in self.backends.items():
+            for slot in range(slots):
+                thread = threading.Thread(target=self._worker, args=(name,), name=f"bridge-{name.lower()}-{slot}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        logger.info(f"Bridge dispatcher started with backends {self.backends}")
+        return self
+
+    def stop(self, timeout=5):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def submit(self, request_id, question, priority=DEFAULT_PRIORITY, backend=None):
+        backend = backend.upper() if backend else None
+        if backend not in self.queues:
+            backend = None  # Unknown or unconfigured backend: let anyone take it
+        self._push(_Job(request_id, question, priority, backend))
+
+    def _push(self, job):
+        with self._cond:
+            heapq.heappush(self.queues[job.backend], (job.key, next(self._counter), job))
+            self._cond.notify_all()
+
+    @staticmethod
+    def _pop_eligible(queue, name):
+        """Pop the most urgent (key, seq, job) backend name hasn't already failed on, leaving the rest queued."""
+        skipped, found = [], None
+        while queue:
+            item = heapq.heappop(queue)
+            if name not in item[2].tried:
+                found = item
+                break
+            skipped.append(item)
+        for item in skipped:
+            heapq.heappush(queue, item)
+        return found
+
+    def _take(self, name):
+        """Pop the next job for backend name, or None. Caller holds the condition."""
+        heads = []
+        for queue in (self.queues[name], self.queues[None]):
+            item = self._pop_eligible(queue, name)
+            if item:
+                heads.append((item, queue))
+        if heads:
+            # Keys are absolute (priority and enqueue time), so heads of different queues compare directly,
+            # aging included; the runner-up goes back where it was.
+            heads.sort(key=lambda head: head[0][:2])
+            for item, queue in heads[1:]:
+                heapq.heappush(queue, item)
+            return heads[0][0][2], False
+        victims = sorted((queue[0][0], other) for other, queue in self.queues.items() if other not in (None, name) and queue)
+        for _, other in victims:
+            item = self._pop_eligible(self.queues[other], name)
+            if item:
+                return item[2], True
+        return None, False
+
+    def _worker(self, name):
+        adapter = None
+        while True:
+            with self._cond:
+                job, stolen = self._take(name)
+                while job is None and not self._stopping:
+                    self._cond.wait()
+                    job, stolen = self._take(name)
+                if self._stopping:
+                    return
+                self.busy[name] += 1
+                if stolen:
+                    self.stats[name]["stolen"] += 1
+            streamed = []
+            try:
+                entry = self.store.get(job.request_id)
+                if entry is None or entry["status"] != "pending":
+                    continue  # Answered by a human responder (or evicted) while queued
+                if adapter is None:
+                    adapter = self._make_adapter(name)
+                started = time.time()
+                if hasattr(adapter, "stream"):
+                    # Partial answers land in the store as they are generated, so SSE clients see them early.
+                    response = drain_stream(adapter.stream(job.question),
+                                            lambda delta: self._chunk(job.request_id, delta, streamed))
+                else:
+                    response = adapter.delegate(job.question)
+                logger.info(f"Bridge {name} answered {job.request_id} in {time.time() - started:.2f}s")
+                if self.store.complete(job.request_id, response, only_pending=True) and self.on_complete:
+                    self.on_complete(job.request_id, response)
+                self.stats[name]["completed"] += 1
+            except Exception as e:
+                logger.error(f"Bridge {name} failed on {job.request_id}: {str(e)}")
+                self.stats[name]["failed"] += 1
+                adapter = None  # Rebuild it; a crashed browser or session shouldn't poison the slot
+                job.attempts += 1
+                job.tried.add(name)
+                # Once partial output has been published, a retry would append a second answer to it.
+                if not streamed and job.attempts < MAX_ATTEMPTS and set(self.backends) - job.tried:
+                    job.backend = None if job.backend == name else job.backend
+                    self._push(job)
+                elif self.store.complete(job.request_id, f"Error: all backends failed: {str(e)}", only_pending=True) \
+                        and self.on_complete:
+                    self.on_complete(job.request_id, None)
+            finally:
+                with self._cond:
+                    self.busy[name] -= 1
+
+    def _chunk(self, request_id, delta, streamed):
+        self.store.add_chunk(request_id, delta)
+        streamed.append(delta)
+        if self.on_chunk:
+            self.on_chunk(request_id, delta)
+
+    def _make_adapter(self, name):
+        if self.adapter_factory:
+            return self.adapter_factory(name)
+        from grok_local.ai_adapters import get_ai_adapter
+        return get_ai_adapter(name)
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                "queued": {name or "any": len(queue) for name, queue in self.queues.items()},
+                "busy": dict(self.busy),
+                "slots": dict(self.backends),
+                "backends": {name: dict(stats) for name, stats in self.stats.items()},
+            }
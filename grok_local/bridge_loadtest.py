@@ -0,0 +1,252 @@
+# grok_local/bridge_loadtest.py
+"""Load generator for grok_bridge / grok_bridge_async.
+
+Each simulated client POSTs /ask, hands the id to a scripted fake responder (which answers through
+/response after a configurable delay) and waits via /wait-response or /stream-response. Reports
+throughput, latency percentiles and errors, and saves everything as JSON for before/after comparison.
+
+    python -m grok_local.bridge_loadtest --requests 500 --concurrency 50 --rate 100 --output after.json
+    python -m grok_local.bridge_loadtest --start-bridge async --compare before.json
+"""
+import os
+import sys
+import json
+import time
+import heapq
+import random
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import requests
+from grok_local.percentiles import percentile
+
+class FakeResponder:
+    """Answers bridge requests over HTTP once each one's scripted delay has passed."""
+
+    def __init__(self, url, delay_ms=(50, 50), workers=16, chunks=0):
+        self.url = url
+        self.delay_ms = delay_ms
+        self.chunks = chunks
+        self._heap = []
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._local = threading.local()
+        self._stopped = False
+        self.errors = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def schedule(self, request_id):
+        """Queue an answer for request_id; returns the scripted delay in seconds."""
+        delay = random.uniform(*self.delay_ms) / 1000.0
+        with self._cond:
+            heapq.heappush(self._heap, (time.perf_counter() + delay, request_id))
+            self._cond.notify()
+        return delay
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and (not self._heap or self._heap[0][0] > time.perf_counter()):
+                    self._cond.wait(self._heap[0][0] - time.perf_counter() if self._heap else None)
+                if self._stopped:
+                    return
+                _, request_id = heapq.heappop(self._heap)
+            self._pool.submit(self._answer, request_id)
+
+    def _session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _answer(self, request_id):
+        try:
+            for i in range(self.chunks):
+                self._session().get(f"{self.url}/response", params={"id": request_id, "response": f"chunk {i} ",
+                                                                    "partial": 1}, timeout=10)
+            resp = self._session().get(f"{self.url}/response", params={"id": request_id, "response": f"answer {request_id}"},
+                                       timeout=10)
+            if resp.status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        with self._cond:  # Answers run on pool threads
+            self.errors += 1
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._pool.shutdown(wait=True)
+
+def _wait_sse(session, url, request_id, timeout):
+    with session.get(f"{url}/stream-response", params={"id": request_id, "timeout": timeout},
+                     stream=True, timeout=timeout + 5) as resp:
+        if resp.status_code != 200:
+            return f"http_{resp.status_code}"
+        event = None
+        for line in resp.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                event = line[7:]
+                if event in ("done", "timeout"):
+                    return None if event == "done" else "timeout"
+    return "stream_closed"
+
+def run_load(url, total, concurrency, rate=0.0, mode="wait", delay_ms=(50, 50), chunks=0, timeout=30, unique=True):
+    """Drive the bridge and return a results dict (latencies in ms)."""
+    responder = FakeResponder(url, delay_ms, workers=max(4, concurrency), chunks=chunks)
+    local = threading.local()
+    lock = threading.Lock()
+    counter = iter(range(total))
+    latencies, overheads, errors = [], [], {}
+    start = time.perf_counter()
+
+    def client():
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        session = local.session
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                return
+            if rate:
+                # Open-loop pacing: request i is due at start + i / rate, whatever happened before it.
+                time.sleep(max(0.0, start + index / rate - time.perf_counter()))
+            question = f"load test question {index}" if unique else "load test question"
+            sent = time.perf_counter()
+            error = None
+            try:
+                resp = session.post(f"{url}/ask", json={"question": question}, timeout=10)
+                if resp.status_code != 200:
+                    error = f"ask_http_{resp.status_code}"
+                else:
+                    body = resp.json()
+                    delay = responder.schedule(body["id"]) if not body.get("coalesced") else 0.0
+                    if mode == "stream":
+                        error = _wait_sse(session, url, body["id"], timeout)
+                    else:
+                        resp = session.get(f"{url}/wait-response", params={"id": body["id"], "timeout": timeout},
+                                           timeout=timeout + 5)
+                        error = None if resp.status_code == 200 else ("timeout" if resp.status_code == 202
+                                                                      else f"wait_http_{resp.status_code}")
+            except requests.RequestException as e:
+                error = type(e).__name__
+            elapsed = time.perf_counter() - sent
+            with lock:
+                if error:
+                    errors[error] = errors.get(error, 0) + 1
+                else:
+                    latencies.append(elapsed * 1000)
+                    overheads.append(max(0.0, elapsed - delay) * 1000)
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    responder.stop()
+
+    latencies.sort()
+    overheads.sort()
+    failed = sum(errors.values())
+    summary = lambda values: {f"p{p}": round(percentile(values, p), 2) for p in (50, 95, 99)} if values else {}
+    return {
+        "requests": total,
+        "completed": len(latencies),
+        "failed": failed,
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        "errors": errors,
+        "responder_errors": responder.errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "latency_ms": dict(summary(latencies), mean=round(sum(latencies) / len(latencies), 2) if latencies else None,
+                           max=round(latencies[-1], 2) if latencies else None),
+        "bridge_overhead_ms": summary(overheads),
+    }
+
+def _start_bridge(kind, url):
+    port = urlparse(url).port or 5000
+    env = dict(os.environ, GROK_BRIDGE_DB=os.path.join(tempfile.mkdtemp(), "loadtest.sqlite"))
+    if kind == "async":
+        cmd = [sys.executable, "-m", "grok_local.grok_bridge_async", str(port)]
+    else:
+        cmd = [sys.executable, "-m", "grok_local.grok_bridge", str(port)]
+    process = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 10
+    while time.time() < deadline and process.poll() is None:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError(f"{kind} bridge did not start on port {port}")
+
+def _stop_bridge(process, url):
+    try:
+        requests.post(f"{url}/shutdown", timeout=2)
+        process.wait(timeout=5)
+    except Exception:
+        process.terminate()
+        process.wait(timeout=5)
+
+def _print_comparison(before, after):
+    print(f"Compared with {before.get('label') or 'previous run'}:")
+    rows = [("throughput_rps", ("results", "throughput_rps")), ("error_rate", ("results", "error_rate"))]
+    rows += [(f"latency {p}", ("results", "latency_ms", p)) for p in ("p50", "p95", "p99")]
+    for name, path in rows:
+        old, new = before, after
+        for key in path:
+            old = old.get(key) if isinstance(old, dict) else None
+            new = new.get(key) if isinstance(new, dict) else None
+        if old is None or new is None:
+            continue
+        change = f" ({(new - old) / old * 100:+.1f}%)" if old else ""
+        print(f"  {name}: {old} -> {new}{change}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the grok bridge with a scripted fake responder.")
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="Bridge base URL")
+    parser.add_argument("--requests", type=int, default=200, help="Total requests to send")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent simulated clients")
+    parser.add_argument("--rate", type=float, default=0.0, help="Target requests/second (0 = as fast as possible)")
+    parser.add_argument("--mode", choices=["wait", "stream"], default="wait", help="Wait via /wait-response or SSE")
+    parser.add_argument("--delay-ms", type=float, nargs=2, default=[50, 50], metavar=("MIN", "MAX"),
+                        help="Responder delay range in ms")
+    parser.add_argument("--chunks", type=int, default=0, help="Partial chunks the responder posts before answering")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request wait timeout in seconds")
+    parser.add_argument("--duplicates", action="store_true", help="Send the same question every time (exercises coalescing)")
+    parser.add_argument("--start-bridge", choices=["async", "flask"], help="Start a throwaway bridge with a temp store")
+    parser.add_argument("--label", default="", help="Name stored with the results")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--compare", help="Previous results JSON to diff against")
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    process = _start_bridge(args.start_bridge, url) if args.start_bridge else None
+    try:
+        results = run_load(url, args.requests, args.concurrency, args.rate, args.mode, tuple(args.delay_ms),
+                           args.chunks, args.timeout, unique=not args.duplicates)
+    finally:
+        if process:
+            _stop_bridge(process, url)
+
+    report = {"label": args.label, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+              "results": results}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            _print_comparison(json.load(f), report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# grok_local/bridge_store.py
+import os
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import threading
+
+BRIDGE_DB = os.getenv("GROK_BRIDGE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "bridge_requests.sqlite"))
+COMPLETED_TTL = int(os.getenv("GROK_BRIDGE_TTL", 60 * 60))  # Seconds to keep answered requests around
+# Only questions asked this recently are joined: an older one's askers have likely stopped waiting (MAX_WAIT)
+COALESCE_WINDOW = int(os.getenv("GROK_BRIDGE_COALESCE_WINDOW", 60))
+PENDING_TTL = int(os.getenv("GROK_BRIDGE_PENDING_TTL", 5 * 60))  # Seconds a question waits for an answer before it expires
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS requests (
+    id TEXT PRIMARY KEY,
+    question TEXT NOT NULL,
+    status TEXT NOT NULL,
+    response TEXT,
+    chunks TEXT NOT NULL DEFAULT '[]',
+    created_at REAL NOT NULL,
+    completed_at REAL
+);
+CREATE INDEX IF NOT EXISTS requests_status ON requests (status, created_at);
+CREATE INDEX IF NOT EXISTS requests_completed_at ON requests (completed_at);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL DEFAULT 0);
+INSERT OR IGNORE INTO counters (name) VALUES ('asked'), ('coalesced');
+"""
+# Columns added after the first release of the store; older databases are migrated in place.
+MIGRATIONS = {
+    "question_key": "ALTER TABLE requests ADD COLUMN question_key TEXT",
+    "hits": "ALTER TABLE requests ADD COLUMN hits INTEGER NOT NULL DEFAULT 0",
+}
+
+def question_key(question):
+    """Key under which identical in-flight questions are coalesced: case and whitespace are ignored."""
+    normalized = " ".join(question.casefold().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+class RequestStore:
+    """Bridge requests in SQLite (WAL), shared by every bridge worker and client process on the machine."""
+
+    def __init__(self, path=BRIDGE_DB, ttl=COMPLETED_TTL, pending_ttl=PENDING_TTL, coalesce_window=COALESCE_WINDOW):
+        self.path = path
+        self.ttl = ttl
+        self.pending_ttl = pending_ttl
+        self.coalesce_window = coalesce_window
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(requests)")}
+        for column, statement in MIGRATIONS.items():
+            if column not in columns:
+                conn.execute(statement)
+        conn.execute("CREATE INDEX IF NOT EXISTS requests_pending_key ON requests (question_key) WHERE status = 'pending'")
+
+    def _conn(self):
+        # sqlite3 connections can't be shared across threads; keep one per thread (and per process).
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def create(self, question):
+        return self.submit(question, coalesce=False)[0]
+
+    def submit(self, question, coalesce=True):
+        """Add a question, or attach to the newest identical one asked within the coalesce window and still
+        pending. Returns (request_id, coalesced)."""
+        key = question_key(question)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")  # Serializes the lookup+insert across bridge processes
+        try:
+            row = None
+            if coalesce:
+                row = conn.execute("SELECT id FROM requests WHERE question_key = ? AND status = 'pending' "
+                                   "AND created_at >= ? ORDER BY created_at DESC LIMIT 1",
+                                   (key, time.time() - self.coalesce_window)).fetchone()
+            if row:
+                request_id = row[0]
+                conn.execute("UPDATE requests SET hits = hits + 1 WHERE id = ?", (request_id,))
+                conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'coalesced'")
+            else:
+                request_id = uuid.uuid4().hex
+                conn.execute("INSERT INTO requests (id, question, question_key, status, created_at) "
+                             "VALUES (?, ?, ?, 'pending', ?)", (request_id, question, key, time.time()))
+            conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'asked'")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return request_id, row is not None
+
+    def get(self, request_id):
+        row = self._conn().execute("SELECT * FROM requests WHERE id = ?", (request_id,)).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        entry["chunks"] = json.loads(entry["chunks"])
+        return entry
+
+    def add_chunk(self, request_id, text):
+        """Append a partial answer; returns False, dropping it, once the request is answered or expired."""
+        cur = self._conn().execute("UPDATE requests SET chunks = json_insert(chunks, '$[#]', ?) "
+                                   "WHERE id = ? AND status = 'pending'", (text, request_id))
+        return cur.rowcount > 0
+
+    def complete(self, request_id, response, only_pending=False):
+        """Store the answer; with only_pending, leave requests someone else already answered untouched.
+
+        A late answer to an expired request is still stored, for whoever asks again.
+        """
+        query = "UPDATE requests SET status = 'completed', response = ?, completed_at = ? WHERE id = ?"
+        if only_pending:
+            query += " AND status != 'completed'"
+        cur = self._conn().execute(query, (response, time.time(), request_id))
+        return cur.rowcount > 0
+
+    def pending(self, limit=100):
+        rows = self._conn().execute("SELECT id, question, created_at FROM requests WHERE status = 'pending' "
+                                    "ORDER BY created_at LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def counts(self):
+        return dict(self._conn().execute("SELECT status, COUNT(*) FROM requests GROUP BY status").fetchall())
+
+    def coalesce_stats(self):
+        """Lifetime ask/coalesce counters plus the pending requests that currently have attached askers."""
+        counters = dict(self._conn().execute("SELECT name, value FROM counters").fetchall())
+        attached = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM requests "
+                                        "WHERE status = 'pending' AND hits > 0").fetchone()
+        asked = counters.get("asked", 0)
+        return {"asked": asked, "coalesced": counters.get("coalesced", 0),
+                "hit_rate": round(counters.get("coalesced", 0) / asked, 3) if asked else 0.0,
+                "pending_shared": attached[0], "pending_attached": attached[1]}
+
+    def completed_since(self, since):
+        """Ids answered at or after since (any process), for waking local waiters."""
+        rows = self._conn().execute("SELECT id FROM requests WHERE completed_at >= ?", (since,)).fetchall()
+        return [row[0] for row in rows]
+
+    def expire(self, ttl=None):
+        """Mark requests pending for more than ttl seconds expired, so nobody waits on them; returns their ids."""
+        cutoff = time.time() - (self.pending_ttl if ttl is None else ttl)
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            ids = [row[0] for row in conn.execute("SELECT id FROM requests WHERE status = 'pending' AND created_at < ?",
+                                                  (cutoff,))]
+            conn.execute("UPDATE requests SET status = 'expired', completed_at = ? WHERE status = 'pending' "
+                         "AND created_at < ?", (time.time(), cutoff))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return ids
+
+    def evict(self, ttl=None):
+        """Delete completed and expired requests older than ttl seconds; returns how many were removed."""
+        cutoff = time.time() - (self.ttl if ttl is None else ttl)
+        cur = self._conn().execute("DELETE FROM requests WHERE status IN ('completed', 'expired') AND completed_at < ?",
+                                   (cutoff,))
+        return cur.rowcount
@@ -1,6 +1,13 @@
 # grok_local/browser_adapter.py
+import json
+import time
 import logging
 from grok_local.config import logger
+from grok_local.asset_cache import RequestInterceptor, INTERCEPT, log_navigation
+from grok_local.browser_replay import replay_url, replay_har
+
+DEFAULT_WAIT = 10  # Seconds any wait_* call may take before raising TimeoutError
+POLL_INTERVAL = 0.1
 
 # Conditional imports for browser backends
 try:
@@ -22,12 +29,104 @@ try:
 except ImportError:
     BROWSER_USE_AVAILABLE = False
 
+def wait_until(condition, timeout=DEFAULT_WAIT, interval=POLL_INTERVAL, description="condition"):
+    """Poll condition() until it returns something truthy and return that; TimeoutError at the deadline."""
+    deadline = time.monotonic() + timeout
+    while True:
+        result = condition()
+        if result:
+            return result
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Timed out after {timeout}s waiting for {description}")
+        time.sleep(interval)
+
+def wait_until_stable(read, stable_ms=1000, timeout=60, interval=POLL_INTERVAL, description="value"):
+    """Poll read() until it is non-empty and unchanged for stable_ms; returns the settled value.
+
+    Meant for answers that render incrementally: too short a fixed sleep truncates them, too long wastes time.
+    """
+    deadline = time.monotonic() + timeout
+    last, changed_at = None, time.monotonic()
+    while True:
+        value = read()
+        now = time.monotonic()
+        if value != last:
+            last, changed_at = value, now
+        elif value and (now - changed_at) * 1000 >= stable_ms:
+            return value
+        if now >= deadline:
+            raise TimeoutError(f"Timed out after {timeout}s waiting for {description} to settle")
+        time.sleep(interval)
+
+def watch_text_script(selector, stop_selector=None):
+    """JS that installs a MutationObserver tracking the newest element matching selector.
+
+    Only elements added after installation count, so install it before submitting the question. The
+    observer keeps the latest text and when it last changed in window.__grokStream; poll_text_script reads it.
+    """
+    return f"""(() => {{
+      const selector = {json.dumps(selector)}, stopSelector = {json.dumps(stop_selector)};
+      if (window.__grokStream) window.__grokStream.observer.disconnect();
+      const state = window.__grokStream = {{text: "", changedAt: Date.now(), stopSeen: false,
+                                            base: document.querySelectorAll(selector).length}};
+      const update = () => {{
+        const nodes = document.querySelectorAll(selector);
+        const text = nodes.length > state.base ? nodes[nodes.length - 1].innerText : "";
+        if (text !== state.text) {{ state.text = text; state.changedAt = Date.now(); }}
+        if (stopSelector && document.querySelector(stopSelector)) state.stopSeen = true;
+      }};
+      state.observer = new MutationObserver(update);
+      state.observer.observe(document.body, {{childList: true, subtree: true, characterData: true}});
+      return true;
+    }})()"""
+
+def poll_text_script(stop_selector=None):
+    """JS returning {text, idle_ms, stopped} from the watch_text_script observer, or null if none is installed."""
+    return f"""(() => {{
+      const state = window.__grokStream;
+      if (!state) return null;
+      const stopSelector = {json.dumps(stop_selector)};
+      const stopped = stopSelector ? state.stopSeen && !document.querySelector(stopSelector) : false;
+      return {{text: state.text, idle_ms: Date.now() - state.changedAt, stopped}};
+    }})()"""
+
+def stream_deltas(poll, stable_ms=1000, timeout=60, interval=0.05, description="answer"):
+    """Turn successive snapshots from poll() into text deltas; returns the final text.
+
+    poll() gives {text, idle_ms, stopped}. The answer is done once a stop button has come and gone, or
+    the text has been non-empty and unchanged for stable_ms. Only appends are yielded; if the page
+    rewrites earlier text, the generator's return value is still the authoritative full answer.
+    """
+    deadline = time.monotonic() + timeout
+    sent = ""
+    while True:
+        state = poll() or {"text": "", "idle_ms": 0, "stopped": False}
+        text = (state["text"] or "").rstrip()
+        if text.startswith(sent) and len(text) > len(sent):
+            yield text[len(sent):]
+            sent = text
+        if text and (state["stopped"] or state["idle_ms"] >= stable_ms):
+            return text
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Timed out after {timeout}s waiting for {description} to finish")
+        time.sleep(interval)
+
+def last_text_script(selector):
+    """JS expression for the innerText of the last element matching selector ('' if none)."""
+    return (f"(() => {{ const nodes = document.querySelectorAll({json.dumps(selector)}); "
+            f"return nodes.length ? nodes[nodes.length - 1].innerText : ''; }})()")
+
 class BrowserAdapter:
-    def __init__(self, backend, headless=True):
+    def __init__(self, backend, headless=True, page=None, intercept=INTERCEPT):
         self.backend = backend
         self.driver = None
         self.headless = headless
-        if backend == "SELENIUM" and SELENIUM_AVAILABLE:
+        self.owns_driver = page is None
+        self.interceptor = None
+        self.last_navigation = None  # Interception counters for the latest goto()
+        if page is not None:
+            self.driver = page  # Borrowed from a BrowserPool, which owns the browser behind it
+        elif backend == "SELENIUM" and SELENIUM_AVAILABLE:
             self.driver = webdriver.Chrome()
         elif backend == "PLAYWRIGHT" and PLAYWRIGHT_AVAILABLE:
             self.playwright = sync_playwright().start()
@@ -37,15 +136,27 @@ class BrowserAdapter:
         else:
             logger.error(f"Unsupported or unavailable browser backend: {backend}")
             raise ValueError(f"Unsupported or unavailable browser backend: {backend}")
+        if intercept and backend == "PLAYWRIGHT":
+            # Only Playwright exposes request routing; other backends load pages untouched.
+            self.interceptor = RequestInterceptor()
+            self.driver.route("**/*", self.interceptor.handle)
+        if replay_har() and backend == "PLAYWRIGHT":
+            self.driver.route_from_har(replay_har(), not_found="abort")
 
     def goto(self, url):
+        url = replay_url(url)
         logger.debug(f"Navigating to {url} with {self.backend}")
+        if self.interceptor:
+            self.interceptor.reset()
         if self.backend == "SELENIUM":
             self.driver.get(url)
         elif self.backend == "PLAYWRIGHT":
             self.driver.goto(url)
         elif self.backend == "BROWSER_USE":
             self.driver.goto(url)  # Assuming Browser supports goto
+        if self.interceptor:
+            self.last_navigation = self.interceptor.reset()
+            log_navigation(url, self.last_navigation)
 
     def fill(self, selector, value):
         logger.debug(f"Filling {selector} with '{value}' using {self.backend}")
@@ -80,8 +191,96 @@ class BrowserAdapter:
         elif self.backend == "BROWSER_USE":
             return self.driver.extract_text(selector)
 
+    def evaluate(self, script):
+        """Run a JavaScript expression in the page and return its value (None where unsupported)."""
+        if self.backend == "SELENIUM":
+            return self.driver.execute_script(f"return ({script});")
+        if self.backend == "PLAYWRIGHT":
+            return self.driver.evaluate(script)
+        if hasattr(self.driver, "evaluate"):
+            return self.driver.evaluate(script)
+        return None
+
+    def _read_text(self, selector):
+        # Last match without waiting: chat pages append one response element per answer.
+        if self.backend == "BROWSER_USE" and not hasattr(self.driver, "evaluate"):
+            return self.driver.extract_text(selector) or ""
+        return self.evaluate(last_text_script(selector)) or ""
+
+    def wait_for_selector(self, selector, timeout=DEFAULT_WAIT):
+        logger.debug(f"Waiting up to {timeout}s for {selector} with {self.backend}")
+        if self.backend == "PLAYWRIGHT":
+            try:
+                self.driver.wait_for_selector(selector, timeout=timeout * 1000)
+            except Exception as e:
+                raise TimeoutError(f"Timed out after {timeout}s waiting for {selector}") from e
+            return
+        if self.backend == "SELENIUM":
+            wait_until(lambda: self.driver.find_elements(By.CSS_SELECTOR, selector), timeout, description=selector)
+        else:
+            wait_until(lambda: self._read_text(selector), timeout, description=selector)
+
+    def wait_for_network_idle(self, timeout=DEFAULT_WAIT, idle_ms=500):
+        """Wait until the page has loaded and no new resources have been fetched for idle_ms."""
+        logger.debug(f"Waiting up to {timeout}s for network idle with {self.backend}")
+        if self.backend == "PLAYWRIGHT":
+            try:
+                self.driver.wait_for_load_state("networkidle", timeout=timeout * 1000)
+            except Exception as e:
+                raise TimeoutError(f"Timed out after {timeout}s waiting for network idle") from e
+            return
+        # No network events outside Playwright: treat a settled Resource Timing count as idle.
+        probe = "document.readyState === 'complete' ? performance.getEntriesByType('resource').length : -1"
+        if self.evaluate("1") is None:
+            logger.debug(f"{self.backend} cannot run scripts; skipping network idle wait")
+            return
+        wait_until_stable(lambda: (self.evaluate(probe) or 0) + 1, idle_ms, timeout, description="network idle")
+
+    def wait_for_text_stable(self, selector, stable_ms=1000, timeout=60):
+        """Wait for the last element matching selector to stop changing; returns its text."""
+        logger.debug(f"Waiting up to {timeout}s for {selector} to stop changing with {self.backend}")
+        return wait_until_stable(lambda: self._read_text(selector).strip(), stable_ms, timeout, description=selector)
+
+    def watch_text(self, selector, stop_selector=None):
+        """Start observing selector for a new answer; call before submitting, then iterate stream_text()."""
+        self.evaluate(watch_text_script(selector, stop_selector))
+
+    def stream_text(self, selector, stable_ms=1000, timeout=60, stop_selector=None):
+        """Generator of text deltas for the answer rendering into selector; returns the complete text.
+
+        Same shape as LocalDeepSeekAI.stream(): for delta in stream: ..., full text from StopIteration.
+        """
+        if self.evaluate(poll_text_script()) is None:
+            self.watch_text(selector, stop_selector)
+        return (yield from stream_deltas(lambda: self.evaluate(poll_text_script(stop_selector)), stable_ms, timeout,
+                                         description=selector))
+
+    def content(self):
+        if self.backend == "PLAYWRIGHT":
+            return self.driver.content()
+        if hasattr(self.driver, 'page_source'):
+            return self.driver.page_source
+        return self.driver.content()
+
+    def is_alive(self):
+        """Cheap health check: False once the page or driver has crashed or been closed."""
+        try:
+            if self.backend == "SELENIUM":
+                self.driver.execute_script("return 1")
+            elif self.backend == "PLAYWRIGHT":
+                if self.driver.is_closed():
+                    return False
+                self.driver.evaluate("1")
+            return True
+        except Exception as e:
+            logger.debug(f"Browser health check failed with {self.backend}: {str(e)}")
+            return False
+
     def close(self):
         logger.debug(f"Closing browser with {self.backend}")
+        if not self.owns_driver:
+            self.driver.context.close()  # Pooled Playwright pages each get their own context
+            return
         if self.backend == "SELENIUM":
             self.driver.quit()
         elif self.backend == "PLAYWRIGHT":
@@ -0,0 +1,116 @@
+# grok_local/browser_bench.py
+"""Offline end-to-end benchmark for the browser paths: GrokBrowserAI.delegate and fetch_dynamic.
+
+Runs against the replay server (grok_local/browser_replay.py), so no live site is touched and results
+are comparable between runs. The first call of each target is reported separately as the cold start
+(browser launch and first page load); the percentiles cover the warm calls after it.
+
+    python -m grok_local.browser_bench --iterations 20 --output before.json
+    GROK_BROWSER_INTERCEPT=0 python -m grok_local.browser_bench --compare before.json
+"""
+import os
+import json
+import time
+import argparse
+from grok_local.config import BROWSER_BACKEND
+from grok_local.percentiles import percentile
+from grok_local.browser_replay import ReplayServer, SIMULATOR, activate, deactivate
+from grok_local.ai_adapters.grok_browser_ai import GrokBrowserAI
+from grok_local.dom_discovery.html_fetcher import fetch_dynamic
+
+def _summarize(latencies, errors, extra=None):
+    cold, warm = (latencies[0], sorted(latencies[1:])) if latencies else (None, [])
+    result = {"calls": len(latencies) + errors, "errors": errors,
+              "cold_ms": round(cold, 2) if cold is not None else None}
+    if warm:
+        result.update({f"p{p}": round(percentile(warm, p), 2) for p in (50, 95, 99)})
+        result["mean_ms"] = round(sum(warm) / len(warm), 2)
+    result.update(extra or {})
+    return result
+
+def bench_delegate(iterations, backend, batch=1):
+    ai = GrokBrowserAI()
+    ai.backend = backend
+    expected = SIMULATOR["answer"].split("{question}")[0]
+    latencies, errors, complete = [], 0, 0
+    for i in range(iterations):
+        questions = [f"benchmark question {i}.{j}" for j in range(batch)]
+        started = time.perf_counter()
+        answers = ai.delegate_many(questions) if batch > 1 else [ai.delegate(questions[0])]
+        elapsed = (time.perf_counter() - started) * 1000
+        failed = [a for a in answers if not a.startswith(expected)]
+        if failed:
+            errors += 1
+            continue
+        latencies.append(elapsed)
+        # A truncated answer means the wait gave up before the simulator finished writing it.
+        complete += sum(a.endswith("is still being written.") for a in answers)
+    return _summarize(latencies, errors, {"complete_answers": complete, "batch": batch})
+
+def bench_fetch(iterations, backend, url):
+    latencies, errors, sizes = [], 0, []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        # No static fallback: it would hit the live site and be timed as a browser load.
+        html = fetch_dynamic(url, retries=1, backend=backend, static_fallback=False)
+        elapsed = (time.perf_counter() - started) * 1000
+        if not html:
+            errors += 1
+            continue
+        latencies.append(elapsed)
+        sizes.append(len(html))
+    return _summarize(latencies, errors, {"html_bytes": max(sizes) if sizes else 0})
+
+def _print_comparison(before, after):
+    print(f"Compared with {before.get('label') or 'previous run'}:")
+    for target, new in after["results"].items():
+        old = before.get("results", {}).get(target, {})
+        for key in ("cold_ms", "p50", "p95", "errors"):
+            if old.get(key) is None or new.get(key) is None:
+                continue
+            change = f" ({(new[key] - old[key]) / old[key] * 100:+.1f}%)" if old[key] else ""
+            print(f"  {target} {key}: {old[key]} -> {new[key]}{change}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the browser paths offline against recorded pages.")
+    parser.add_argument("--iterations", type=int, default=10, help="Calls per target (the first is the cold start)")
+    parser.add_argument("--backend", default=BROWSER_BACKEND, help="PLAYWRIGHT, PLAYWRIGHT_ASYNC, SELENIUM, ...")
+    parser.add_argument("--targets", default="delegate,fetch", help="Comma-separated: delegate, fetch")
+    parser.add_argument("--batch", type=int, default=1, help="Questions per delegate call (PLAYWRIGHT_ASYNC runs them on parallel tabs)")
+    parser.add_argument("--fetch-url", default="https://x.com/i/grok", help="Live URL whose recording fetch_dynamic loads")
+    parser.add_argument("--chunk-ms", type=int, default=SIMULATOR["chunk_ms"], help="Simulated delay between answer chunks")
+    parser.add_argument("--chunks", type=int, default=SIMULATOR["chunks"], help="Chunks the simulated answer arrives in")
+    parser.add_argument("--label", default="", help="Name stored with the results")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--compare", help="Previous results JSON to diff against")
+    args = parser.parse_args()
+
+    server = activate(ReplayServer(simulator={"chunk_ms": args.chunk_ms, "chunks": args.chunks}).start())
+    targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    results = {}
+    try:
+        if "delegate" in targets:
+            results["delegate"] = bench_delegate(args.iterations, args.backend, args.batch)
+        if "fetch" in targets:
+            if args.backend == "PLAYWRIGHT_ASYNC":
+                print("fetch_dynamic has no async backend; skipping it")
+            else:
+                results["fetch_dynamic"] = bench_fetch(args.iterations, args.backend, args.fetch_url)
+    finally:
+        replay_requests = server.requests
+        deactivate()
+
+    report = {"label": args.label, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "config": dict({k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+                             intercept=os.getenv("GROK_BROWSER_INTERCEPT", "1")),
+              "results": results, "replay_requests": replay_requests}
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            _print_comparison(json.load(f), report)
+
+if __name__ == "__main__":
+    main()
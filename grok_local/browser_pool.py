@@ -0,0 +1,174 @@
+# grok_local/browser_pool.py
+"""Long-lived browser sessions, checked out per task instead of launching a browser each time.
+
+Playwright's sync API is bound to the thread that started it, so pools are per thread: get_pool()
+returns the calling thread's pool for a given warm URL, and all of a thread's Playwright pools share
+one Chromium, with a fresh context per pooled page. Selenium and browser_use sessions are one driver each.
+"""
+import os
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+from grok_local.config import logger, BROWSER_BACKEND
+from grok_local.browser_adapter import BrowserAdapter, PLAYWRIGHT_AVAILABLE
+
+POOL_SIZE = int(os.getenv("GROK_BROWSER_POOL_SIZE", 2))  # Sessions per pool (per thread)
+MAX_USES = int(os.getenv("GROK_BROWSER_POOL_MAX_USES", 50))  # Recycle a session after this many checkouts
+
+if PLAYWRIGHT_AVAILABLE:
+    from playwright.sync_api import sync_playwright
+
+_local = threading.local()
+
+class _Session:
+    __slots__ = ("adapter", "uses", "created_at", "stale")
+
+    def __init__(self, adapter):
+        self.adapter = adapter
+        self.uses = 0
+        self.created_at = time.time()
+        self.stale = False  # Used since it was last on the warm URL
+
+class BrowserPool:
+    def __init__(self, backend=BROWSER_BACKEND, size=POOL_SIZE, warm_url=None, headless=True):
+        self.backend = backend
+        self.size = size
+        self.warm_url = warm_url
+        self.headless = headless
+        self._idle = []
+        self._count = 0
+        self._cond = threading.Condition()
+        self.stats = {"created": 0, "reused": 0, "recycled": 0}
+
+    def _new_session(self):
+        if self.backend == "PLAYWRIGHT" and PLAYWRIGHT_AVAILABLE:
+            adapter = BrowserAdapter(self.backend, self.headless, page=_thread_browser(self.headless).new_context().new_page())
+        else:
+            adapter = BrowserAdapter(self.backend, self.headless)
+        self.stats["created"] += 1
+        if self.warm_url:
+            adapter.goto(self.warm_url)
+        return _Session(adapter)
+
+    def _discard(self, session):
+        self.stats["recycled"] += 1
+        try:
+            session.adapter.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled {self.backend} session: {str(e)}")
+
+    def _take(self, deadline, timeout):
+        """An idle live session, or None once a slot for a new one is reserved; waits until deadline."""
+        with self._cond:
+            while True:
+                while self._idle:
+                    session = self._idle.pop()
+                    if session.adapter.is_alive():
+                        self.stats["reused"] += 1
+                        return session
+                    logger.warning(f"Recycling crashed {self.backend} session")
+                    self._count -= 1
+                    self._discard(session)
+                if self._count < self.size:
+                    self._count += 1
+                    return None
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise TimeoutError(f"No {self.backend} browser session free within {timeout}s")
+                self._cond.wait(remaining)
+
+    def _drop(self, session):
+        with self._cond:
+            self._count -= 1
+            self._discard(session)
+            self._cond.notify()
+
+    def acquire(self, timeout=30):
+        """Check out a healthy session on the warm URL, launching one if the pool has room; waits up to timeout seconds.
+
+        A used session is taken back to the warm URL here rather than on release, so callers get their
+        answer without waiting for the reload; the sync API cannot navigate from another thread.
+        """
+        deadline = time.time() + timeout
+        while True:
+            session = self._take(deadline, timeout)
+            if session is None:
+                try:
+                    return self._new_session()
+                except BaseException:
+                    with self._cond:
+                        self._count -= 1
+                        self._cond.notify()
+                    raise
+            if not session.stale:
+                return session
+            try:
+                session.adapter.goto(self.warm_url)
+                session.stale = False
+                return session
+            except Exception as e:
+                logger.warning(f"Re-warming pooled session failed: {str(e)}")
+                self._drop(session)
+
+    def release(self, session, healthy=True):
+        """Return a session, to be re-warmed at its next checkout; closed if broken or worn out."""
+        session.uses += 1
+        session.stale = bool(self.warm_url)
+        if healthy and session.uses < MAX_USES and session.adapter.is_alive():
+            with self._cond:
+                self._idle.append(session)
+                self._cond.notify()
+        else:
+            self._drop(session)
+
+    @contextmanager
+    def checkout(self, timeout=30):
+        """with pool.checkout() as browser: ... — browser is a BrowserAdapter; errors recycle the session."""
+        session = self.acquire(timeout)
+        healthy = False
+        try:
+            yield session.adapter
+            healthy = True
+        finally:
+            self.release(session, healthy)
+
+    def close(self):
+        with self._cond:
+            while self._idle:
+                self._count -= 1
+                self._discard(self._idle.pop())
+
+def _thread_browser(headless=True):
+    """The calling thread's shared Chromium, relaunched if it has died."""
+    browser = getattr(_local, "browser", None)
+    if browser is None or not browser.is_connected():
+        if getattr(_local, "playwright", None) is None:
+            _local.playwright = sync_playwright().start()
+        browser = _local.browser = _local.playwright.chromium.launch(headless=headless)
+    return browser
+
+def get_pool(warm_url=None, backend=BROWSER_BACKEND):
+    """The calling thread's pool of sessions kept on warm_url (None: blank pages for arbitrary navigation)."""
+    pools = getattr(_local, "pools", None)
+    if pools is None:
+        pools = _local.pools = {}
+        if threading.current_thread() is threading.main_thread():
+            atexit.register(close_pools)
+    key = (backend, warm_url)
+    if key not in pools:
+        pools[key] = BrowserPool(backend, warm_url=warm_url)
+    return pools[key]
+
+def close_pools():
+    """Close the calling thread's pools and its shared browser."""
+    for pool in getattr(_local, "pools", {}).values():
+        pool.close()
+    _local.pools = {}
+    if getattr(_local, "browser", None) is not None:
+        try:
+            _local.browser.close()
+            _local.playwright.stop()
+        except Exception as e:
+            logger.debug(f"Error stopping pooled browser: {str(e)}")
+        _local.browser = _local.playwright = None
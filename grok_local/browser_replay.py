@@ -0,0 +1,168 @@
+# grok_local/browser_replay.py
+"""Offline replay of recorded pages for the browser code paths.
+
+With GROK_BROWSER_REPLAY=html, BrowserAdapter and the async tabs send navigations to a local server that
+serves the saved pages in grok_local/html (grok_chat.html and its grok_chat_files). Each page gets a
+Content-Security-Policy that blocks every non-local request, plus a simulator script: submitting the
+question form makes a .response-output element appear and grow chunk by chunk, like a streaming answer.
+Pointing GROK_BROWSER_REPLAY at a .har file instead replays that recording through Playwright's route_from_har.
+"""
+import os
+import json
+import threading
+from urllib.parse import urlparse, quote
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from grok_local.config import logger
+
+REPLAY = os.getenv("GROK_BROWSER_REPLAY", "")  # "", "html" or a path to a .har recording
+REPLAY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "html")
+# Live URL prefix (host + path) -> recorded page under REPLAY_DIR; longest prefix wins.
+PAGES = {
+    "grok.com": "grok_chat.html",
+    "x.com/i/grok": "grok_chat.html",
+}
+SIMULATOR = {
+    "input": ".question-input",
+    "submit": ".submit-btn",
+    "output": ".response-output",
+    "answer": "This is a replayed answer to: {question}. It arrives in pieces so that waits on the "
+              "response text have to cope with an answer that is still being written.",
+    "chunks": 8,
+    "chunk_ms": 150,
+    "first_chunk_ms": 400,
+}
+
+_SIMULATOR_JS = """<script>
+(() => {
+  const cfg = %s;
+  const byClass = selector => selector.replace(/^\\./, "");
+  const setup = () => {
+    let input = document.querySelector(cfg.input), submit = document.querySelector(cfg.submit);
+    if (!input || !submit) {
+      const form = document.createElement("div");
+      form.id = "replay-form";
+      input = document.createElement("textarea");
+      input.className = byClass(cfg.input);
+      submit = document.createElement("button");
+      submit.className = byClass(cfg.submit);
+      submit.textContent = "Send";
+      form.append(input, submit);
+      document.body.prepend(form);
+    }
+    submit.addEventListener("click", event => {
+      event.preventDefault();
+      const answer = cfg.answer.replace("{question}", input.value);
+      const output = document.createElement("div");
+      output.className = byClass(cfg.output);
+      const size = Math.ceil(answer.length / cfg.chunks);
+      let shown = 0;
+      const step = () => {
+        shown = Math.min(answer.length, shown + size);
+        output.textContent = answer.slice(0, shown);
+        if (shown < answer.length) setTimeout(step, cfg.chunk_ms);
+      };
+      setTimeout(() => { document.body.append(output); step(); }, cfg.first_chunk_ms);
+    });
+  };
+  if (document.body) setup(); else document.addEventListener("DOMContentLoaded", setup);
+})();
+</script>"""
+_CSP = ('<meta http-equiv="Content-Security-Policy" content="default-src \'self\' \'unsafe-inline\' '
+        '\'unsafe-eval\' data: blob:">')
+
+class ReplayServer:
+    """Serves REPLAY_DIR on 127.0.0.1, rewriting HTML pages as described in the module docstring."""
+
+    def __init__(self, root=REPLAY_DIR, pages=None, simulator=None, port=0):
+        self.root = root
+        self.pages = dict(PAGES if pages is None else pages)
+        self.simulator = dict(SIMULATOR, **(simulator or {}))
+        self.requests = 0
+        server = self
+
+        class Handler(SimpleHTTPRequestHandler):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, directory=server.root, **kwargs)
+
+            def do_GET(self):
+                server.requests += 1
+                path = self.translate_path(self.path)
+                if path.endswith(".html") and os.path.isfile(path):
+                    with open(path, encoding="utf-8", errors="replace") as f:
+                        body = server.rewrite(f.read()).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                else:
+                    super().do_GET()
+
+            def log_message(self, format, *args):
+                logger.debug(f"Replay server: {format % args}")
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def rewrite(self, html):
+        head = html.lower().find("<head>")
+        if head >= 0:
+            html = html[:head + 6] + _CSP + html[head + 6:]
+        script = _SIMULATOR_JS % json.dumps(self.simulator)
+        end = html.lower().rfind("</body>")
+        return html[:end] + script + html[end:] if end >= 0 else html + script
+
+    def resolve(self, url):
+        """Local URL for a live one; unknown URLs map to a 404 on the replay server, never the network."""
+        parsed = urlparse(url)
+        if parsed.hostname in ("127.0.0.1", "localhost"):
+            return url
+        target = (parsed.hostname or "").removeprefix("www.") + parsed.path.rstrip("/")
+        matches = [prefix for prefix in self.pages if target.startswith(prefix)]
+        if not matches:
+            logger.warning(f"No recorded page for {url}; replay will 404")
+            return f"{self.base_url}/__missing__/{quote(target, safe='')}"
+        return f"{self.base_url}/{self.pages[max(matches, key=len)]}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="replay-server", daemon=True)
+        self._thread.start()
+        logger.info(f"Replaying recorded pages from {self.root} at {self.base_url}")
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+_active = None
+_active_lock = threading.Lock()
+
+def activate(server=None):
+    """Route every BrowserAdapter/AsyncTab navigation in this process through server (started if needed)."""
+    global _active
+    with _active_lock:
+        if _active is not None and _active is not server:
+            _active.stop()
+        _active = server or ReplayServer().start()
+        return _active
+
+def deactivate():
+    global _active
+    with _active_lock:
+        if _active is not None:
+            _active.stop()
+        _active = None
+
+def replay_url(url):
+    """The URL a browser should actually load: url itself unless HTML replay is on."""
+    if _active is None and REPLAY == "html":
+        activate()
+    return _active.resolve(url) if _active is not None else url
+
+def replay_har():
+    """Path of the HAR recording to replay, or None."""
+    return REPLAY if REPLAY.endswith(".har") else None
@@ -0,0 +1,165 @@
+# grok_local/checkpoint_store.py
+"""Checkpoints as an append-only JSONL log with an SQLite offset index.
+
+Saving a checkpoint appends one line to checkpoints/checkpoints.jsonl, so it costs the same however
+many came before, and the file stays diff-friendly for the git commit that follows a checkpoint. The
+index (checkpoints/checkpoints_index.sqlite, not versioned) maps each line's byte offset to its time,
+group and chat id. It catches up on lines it has not seen (appended by another process, or pulled with
+git) and is rebuilt from scratch if the log was replaced, so it never has to be trusted over the log.
+
+The first time the log is created, earlier checkpoints are migrated into it in time order: the single
+checkpoints/checkpoints.json list checkpoint_command used to write, and the single-checkpoint files
+(checkpoint.json and the checkpoint_*.json files grok_checkpoint.py used to write). Those files are left
+in place; both writers now append to the log.
+"""
+import os
+import json
+import sqlite3
+from datetime import datetime
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CHECKPOINT_DIR = os.getenv("GROK_CHECKPOINT_DIR", os.path.join(PROJECT_DIR, "checkpoints"))
+CHECKPOINT_LOG = "checkpoints.jsonl"
+CHECKPOINT_INDEX = "checkpoints_index.sqlite"
+LEGACY_LIST = "checkpoints.json"
+PAGE_SIZE = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value INTEGER);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    offset INTEGER PRIMARY KEY,
+    ts REAL,
+    chat_id TEXT,
+    chat_group TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS checkpoints_ts ON checkpoints (ts);
+CREATE INDEX IF NOT EXISTS checkpoints_group ON checkpoints (chat_group, offset);
+CREATE INDEX IF NOT EXISTS checkpoints_chat ON checkpoints (chat_id, offset);
+"""
+
+def parse_timestamp(text):
+    """Epoch seconds for the timestamps checkpoints have used (ISO, or 2025-03-09_054630), else None."""
+    for parse in (datetime.fromisoformat, lambda t: datetime.strptime(t, "%Y-%m-%d_%H%M%S")):
+        try:
+            return parse(text).timestamp()
+        except (TypeError, ValueError):
+            pass
+    return None
+
+def checkpoint_fields(checkpoint):
+    """(ts, chat_id, group, message) of a checkpoint in either format (description as dict or string)."""
+    description = checkpoint.get("description")
+    if isinstance(description, dict):
+        message = description.get("message", "")
+        chat_id = description.get("chat_id") or checkpoint.get("chat_address")
+        group = description.get("group") or checkpoint.get("chat_group")
+    else:
+        message = str(description or "").strip("'\"")
+        chat_id, group = checkpoint.get("chat_address"), checkpoint.get("chat_group")
+    return parse_timestamp(checkpoint.get("timestamp")), chat_id, group or "default", message
+
+class CheckpointStore:
+    def __init__(self, directory=CHECKPOINT_DIR):
+        self.directory = directory
+        self.log_path = os.path.join(directory, CHECKPOINT_LOG)
+        os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(self.log_path):
+            self._migrate()
+        self.conn = sqlite3.connect(os.path.join(directory, CHECKPOINT_INDEX))
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _migrate(self):
+        """Write the log from the legacy files; the log appears only once it is complete."""
+        checkpoints = []
+        legacy_list = os.path.join(self.directory, LEGACY_LIST)
+        try:
+            with open(legacy_list, encoding="utf-8") as f:
+                entries = json.load(f)
+            checkpoints.extend(entry for entry in entries if isinstance(entry, dict))
+        except (OSError, ValueError, TypeError):
+            pass
+        listed = {json.dumps(checkpoint, sort_keys=True) for checkpoint in checkpoints}
+        for name in sorted(os.listdir(self.directory)):
+            # checkpoint.json and checkpoint_*.json; the list and the log have their own names.
+            if name.startswith("checkpoint") and name.endswith(".json") and name not in (LEGACY_LIST, CHECKPOINT_LOG):
+                try:
+                    with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                        checkpoint = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                # Some checkpoints were saved both ways; keep one copy.
+                if isinstance(checkpoint, dict) and json.dumps(checkpoint, sort_keys=True) not in listed:
+                    checkpoints.append(dict(checkpoint, migrated_from=name))
+        # Stable sort: the list keeps its order, and undated checkpoints go last.
+        checkpoints.sort(key=lambda checkpoint: checkpoint_fields(checkpoint)[0] or float("inf"))
+        tmp = f"{self.log_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for checkpoint in checkpoints:
+                f.write(json.dumps(checkpoint) + "\n")
+        try:
+            os.link(tmp, self.log_path)  # Unlike a rename, never replaces a log another process created meanwhile
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp)
+
+    def _catch_up(self):
+        """Index log lines added since the last call; rebuild the index if the log was replaced."""
+        stat = os.stat(self.log_path)
+        state = dict(self.conn.execute("SELECT key, value FROM state"))
+        with self.conn:
+            offset = state.get("offset", 0)
+            if state.get("inode") != stat.st_ino or offset > stat.st_size:
+                self.conn.execute("DELETE FROM checkpoints")
+                offset = 0
+            if offset < stat.st_size:
+                with open(self.log_path, "rb") as f:
+                    f.seek(offset)
+                    for raw in f:
+                        if not raw.endswith(b"\n"):
+                            break  # Partial line still being written
+                        try:
+                            checkpoint = json.loads(raw)
+                        except ValueError:
+                            checkpoint = None
+                        if isinstance(checkpoint, dict):
+                            self.conn.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?)",
+                                              (offset,) + checkpoint_fields(checkpoint))
+                        offset += len(raw)
+            self.conn.executemany("INSERT OR REPLACE INTO state VALUES (?, ?)",
+                                  [("inode", stat.st_ino), ("offset", offset)])
+
+    def append(self, checkpoint):
+        """Add a checkpoint (one O_APPEND write, so concurrent writers do not interleave lines)."""
+        line = (json.dumps(checkpoint) + "\n").encode("utf-8")
+        fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        self._catch_up()
+
+    def query(self, group=None, chat_id=None, since=None, until=None, limit=PAGE_SIZE, page=1):
+        """(checkpoints, total) matching the filters, newest first; since/until are epoch seconds."""
+        self._catch_up()
+        where, params = [], []
+        for clause, value in (("chat_group = ?", group), ("chat_id = ?", chat_id), ("ts >= ?", since),
+                              ("ts < ?", until)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        condition = " WHERE " + " AND ".join(where) if where else ""
+        total = self.conn.execute(f"SELECT COUNT(*) FROM checkpoints{condition}", params).fetchone()[0]
+        offsets = [row[0] for row in self.conn.execute(
+            f"SELECT offset FROM checkpoints{condition} ORDER BY offset DESC LIMIT ? OFFSET ?",
+            params + [limit, (page - 1) * limit])]
+        checkpoints = []
+        with open(self.log_path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                checkpoints.append(json.loads(f.readline()))
+        return checkpoints, total
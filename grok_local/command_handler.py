@@ -1,6 +1,6 @@
 import argparse
 import sys
-from grok_local.commands import git_commands, file_commands, checkpoint_commands, bridge_commands, misc_commands
+from grok_local.commands import git_commands, file_commands, checkpoint_commands, bridge_commands, misc_commands, stats_commands
 from grok_local.tools import execute_command
 
 class CommandHandler:
@@ -40,9 +40,15 @@ class CommandHandler:
         elif command.startswith("checkpoint "):
             print(f"Debug: Routing to checkpoint_commands for '{command}'", file=sys.stderr)
             return checkpoint_commands.checkpoint_command(command, self.git_interface, use_git=True)
+        elif command == "list checkpoints" or command.startswith("list checkpoints "):
+            print(f"Debug: Routing to checkpoint_commands for '{command}'", file=sys.stderr)
+            return checkpoint_commands.list_checkpoints_command(command)
         elif command.startswith("bridge "):
             print(f"Debug: Routing to bridge_commands for '{command}'", file=sys.stderr)
             return bridge_commands.handle_bridge_command(command[7:], self.ai_adapter)
+        elif command == "stats" or command.startswith("stats "):
+            print(f"Debug: Routing to stats_commands for '{command}'", file=sys.stderr)
+            return stats_commands.stats_command(command)
         else:
             print(f"Debug: Fallback to execute_command for '{command}'", file=sys.stderr)
             return execute_command(command, self.git_interface, self.ai_adapter, model=parsed_args.model)
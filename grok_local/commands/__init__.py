@@ -3,6 +3,7 @@ from .file_commands import file_command
 from .checkpoint_commands import checkpoint_command, list_checkpoints_command
 from .bridge_commands import handle_bridge_command as send_to_grok
 from .misc_commands import misc_command
+from .stats_commands import stats_command
 
 __all__ = [
     "handle_git_command",
@@ -11,4 +12,5 @@ __all__ = [
     "list_checkpoints_command",
     "send_to_grok",
     "misc_command",
+    "stats_command",
 ]
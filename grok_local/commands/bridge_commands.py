@@ -1,23 +1,62 @@
+import json
+import time
 from ..tools.logging import log_conversation
-from ..grok_bridge import fetch_response
+from ..grok_bridge import BRIDGE_URL, MAX_WAIT
 import requests
 
+def wait_for_bridge_response(request_id, timeout=25):
+    """Long-poll /wait-response until the answer arrives; raises TimeoutError after timeout seconds."""
+    deadline = time.time() + timeout
+    while True:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise TimeoutError(f"No response for {request_id} within {timeout}s")
+        wait = min(remaining, MAX_WAIT)
+        resp = requests.get(f"{BRIDGE_URL}/wait-response", params={"id": request_id, "timeout": wait}, timeout=wait + 5)
+        if resp.status_code == 200:
+            return resp.json()["response"]
+        if resp.status_code == 410:
+            raise TimeoutError(f"Request {request_id} expired unanswered")
+        if resp.status_code != 202:
+            raise RuntimeError(f"Bridge error: {resp.text}")
+
+def stream_bridge_response(request_id, timeout=MAX_WAIT):
+    """Yield partial answer chunks from /stream-response as they arrive; returns the full response."""
+    with requests.get(f"{BRIDGE_URL}/stream-response", params={"id": request_id, "timeout": timeout},
+                      stream=True, timeout=timeout + 5) as resp:
+        if resp.status_code != 200:
+            raise RuntimeError(f"Bridge error: {resp.text}")
+        event = None
+        for line in resp.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: "):
+                data = json.loads(line[6:])
+                if event == "partial":
+                    yield data["text"]
+                elif event == "done":
+                    return data["response"]
+                elif event == "timeout":
+                    raise TimeoutError(f"No response for {request_id} within {timeout}s")
+    raise TimeoutError(f"Bridge stream for {request_id} closed without a response")
+
 def handle_bridge_command(command, ai_adapter):
     question = command.strip()
     if not question:
         return "No question provided for bridge."
-    
+
     try:
-        resp = requests.post("http://0.0.0.0:5000/ask", json={"question": question}, timeout=5)
+        resp = requests.post(f"{BRIDGE_URL}/ask", json={"question": question}, timeout=5)
         if resp.status_code != 200:
             return f"Bridge error: {resp.text}"
-        
+
         request_id = resp.json()['id']
         log_conversation(f"Bridge request posted with ID: {request_id}")
-        
-        response = fetch_response(request_id, timeout=25)
+
+        response = wait_for_bridge_response(request_id, timeout=25)
+        log_conversation(f"Fetched response for {request_id}: {response}")
         return f"Bridge response: {response}"
-    except requests.Timeout:
+    except (requests.Timeout, TimeoutError):
         return "Bridge request timed out."
     except Exception as e:
         return f"Bridge failed: {str(e)}"
@@ -1,13 +1,13 @@
-import json
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 import uuid
 import os
+from ..checkpoint_store import CheckpointStore, PAGE_SIZE, checkpoint_fields
+
+LIST_USAGE = "Usage: list checkpoints [group=<group>] [chat=<chat_id>] [since=YYYY-MM-DD] [until=YYYY-MM-DD] [page=<n>]"
 
 def checkpoint_command(command, git_interface=None, use_git=True):
     message = command.split("checkpoint ", 1)[1].strip("'\"")
-    checkpoint_file = "checkpoints/checkpoints.json"  # Single file
-    os.makedirs(os.path.dirname(checkpoint_file), exist_ok=True)
     chat_id = str(uuid.uuid4())
     timestamp = datetime.now().isoformat()
 
@@ -25,23 +25,14 @@ def checkpoint_command(command, git_interface=None, use_git=True):
         "chat_group": "default"
     }
 
-    # Load existing checkpoints
+    # Appended to the checkpoint log; earlier checkpoints are not read or rewritten.
+    store = CheckpointStore()
     try:
-        with open(checkpoint_file, "r") as f:
-            existing_checkpoints = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        existing_checkpoints = []
-    if not isinstance(existing_checkpoints, list):
-        existing_checkpoints = []
-
-    # Append new checkpoint
-    existing_checkpoints.append(checkpoint)
-
-    # Write back to single file
-    with open(checkpoint_file, "w") as f:
-        json.dump(existing_checkpoints, f, indent=4)
+        store.append(checkpoint)
+    finally:
+        store.close()
 
-    report = f"Checkpoint saved: \"{message}\" to {checkpoint_file}"
+    report = f"Checkpoint saved: \"{message}\" to {os.path.relpath(store.log_path)}"
 
     if use_git and git_interface:
         commit_message = f"Checkpoint: \"{message}\" (Chat: {chat_id}, Group: default)"
@@ -51,14 +42,39 @@ def checkpoint_command(command, git_interface=None, use_git=True):
     return report
 
 def list_checkpoints_command(command):
-    checkpoint_file = "checkpoints/checkpoints.json"
+    """One page of checkpoints, newest first, optionally filtered by group, chat id and date range."""
+    args, filters, page = command.split()[2:], {}, 1
+    try:
+        for arg in args:
+            key, _, value = arg.partition("=")
+            if key == "group":
+                filters["group"] = value
+            elif key == "chat":
+                filters["chat_id"] = value
+            elif key == "since":
+                filters["since"] = datetime.strptime(value, "%Y-%m-%d").timestamp()
+            elif key == "until":  # Inclusive: the whole day
+                filters["until"] = (datetime.strptime(value, "%Y-%m-%d") + timedelta(days=1)).timestamp()
+            elif key == "page" and value.isdigit() and int(value) > 0:
+                page = int(value)
+            else:
+                return LIST_USAGE
+    except ValueError:
+        return LIST_USAGE
+
+    store = CheckpointStore()
     try:
-        with open(checkpoint_file, "r") as f:
-            checkpoints = json.load(f)
-        if not checkpoints:
-            return "No checkpoints found."
-        return "\n".join([f"{cp['timestamp']}: {cp['description']['message']}" for cp in checkpoints])
-    except FileNotFoundError:
-        return "No checkpoints file found."
-    except json.JSONDecodeError as e:
-        return f"Error reading checkpoints: {e}"
+        checkpoints, total = store.query(page=page, **filters)
+    finally:
+        store.close()
+    if not total:
+        return "No checkpoints found."
+    if not checkpoints:
+        return f"No checkpoints on page {page} ({total} in total)."
+    first = (page - 1) * PAGE_SIZE + 1
+    lines = [f"Checkpoints {first}-{first + len(checkpoints) - 1} of {total}, newest first:"]
+    lines += [f"{cp.get('timestamp')}: {checkpoint_fields(cp)[3]}" for cp in checkpoints]
+    if first + len(checkpoints) - 1 < total:
+        more = [arg for arg in args if not arg.startswith("page=")] + [f"page={page + 1}"]
+        lines.append(f"More: list checkpoints {' '.join(more)}")
+    return "\n".join(lines)
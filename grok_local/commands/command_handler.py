@@ -2,10 +2,10 @@ import re
 import requests
 import time
 import subprocess
-import uuid
 from .commands import git_commands, file_commands, send_to_grok, checkpoint_commands, misc_commands
+from .bridge_commands import wait_for_bridge_response
+from ..grok_bridge import BRIDGE_URL
 
-BRIDGE_URL = "http://0.0.0.0:5000"
 BRIDGE_PROCESS = None
 
 def start_bridge():
@@ -29,27 +29,23 @@ def ask_local(command, ai_adapter, git_interface, debug=False, use_git=True):
         return send_to_grok(command, ai_adapter)
     elif re.match(r'^checkpoint\s+', command):
         return checkpoint_commands.checkpoint_command(command, git_interface, use_git)
-    elif command == "list checkpoints":
+    elif re.match(r'^list\s+checkpoints\b', command):
         return checkpoint_commands.list_checkpoints_command(command)
     elif re.match(r'^(what time is it|version|x login|clean repo|list files|create spaceship fuel script|create x login stub)', command.lower()):
         return misc_commands.misc_command(command, ai_adapter, git_interface)
     else:
         # Inference fallback: send unknown command to Grok via bridge
         start_bridge()
-        req_id = str(uuid.uuid4())
-        payload = {"input": f"Unknown command: {command}. Please interpret and respond.", "id": req_id}
+        payload = {"question": f"Unknown command: {command}. Please interpret and respond."}
         try:
-            resp = requests.post(f"{BRIDGE_URL}/channel", json=payload, timeout=5)
+            resp = requests.post(f"{BRIDGE_URL}/ask", json=payload, timeout=5)
             if resp.status_code != 200:
                 return f"Error sending to bridge: {resp.text}"
-            max_attempts, delay = 10, 2
-            for attempt in range(max_attempts):
-                resp = requests.get(f"{BRIDGE_URL}/get-response", params={"id": req_id}, timeout=5)
-                if resp.status_code == 200:
-                    return f"Grok inference: {resp.text}"
-                elif resp.status_code != 404:
-                    return f"Error fetching inference: {resp.text}"
-                time.sleep(delay)
+            req_id = resp.json()["id"]
+            return f"Grok inference: {wait_for_bridge_response(req_id, timeout=20)}"
+        except TimeoutError:
             return "No inference response from Grok within timeout"
+        except RuntimeError as e:
+            return f"Error fetching inference: {e}"
         except requests.RequestException as e:
             return f"Error connecting to bridge for inference: {e}"
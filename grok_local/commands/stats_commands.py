@@ -0,0 +1,23 @@
+from datetime import datetime, timedelta
+from ..tools.log_index import LogIndex, stats_report
+
+def stats_command(command):
+    """Ingest new log lines and report latency stats: 'stats', 'stats <days>' or 'stats since YYYY-MM-DD'."""
+    args = command.split()[1:]
+    since = None
+    try:
+        if len(args) == 1 and args[0].isdigit():
+            since = (datetime.now() - timedelta(days=int(args[0]))).timestamp()
+        elif len(args) == 2 and args[0] == "since":
+            since = datetime.strptime(args[1], "%Y-%m-%d").timestamp()
+        elif args:
+            return "Usage: stats [<days> | since YYYY-MM-DD]"
+    except ValueError:
+        return "Usage: stats [<days> | since YYYY-MM-DD]"
+
+    index = LogIndex()
+    try:
+        added = index.ingest()
+        return f"Indexed {added} new event(s)\n{stats_report(index, since)}"
+    finally:
+        index.close()
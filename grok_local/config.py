@@ -15,7 +15,8 @@ GROK_PASSWORD = os.getenv("GROK_PASSWORD")
 CHATGPT_API_KEY = os.getenv("CHATGPT_API_KEY")
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
 AI_BACKEND = os.getenv("AI_BACKEND", "STUB")  # Default to stub
-BROWSER_BACKEND = os.getenv("BROWSER_BACKEND", "PLAYWRIGHT")  # Default to Playwright
+BROWSER_BACKEND = os.getenv("BROWSER_BACKEND", "PLAYWRIGHT")  # Default to Playwright; PLAYWRIGHT_ASYNC shares one browser across tabs
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/api/generate")
 
 # Logger initialized here, but configured in main.py
 logger = logging.getLogger(__name__)
@@ -3,47 +3,86 @@
 import os
 import json  # Added missing import
 import logging
+from contextlib import nullcontext
 from grok_local.config import logger
 from .ollama_manager import ensure_ollama_running
 from .html_fetcher import fetch_static, fetch_dynamic
 from .element_parser import parse_elements
-from .agent_analyzer import get_agent_suggestions
+from .element_stream import extract_elements, iter_elements
+from .selector_engine import SelectorIndex, StructureHash, unique_selectors
+from .agent_analyzer import get_agent_suggestions, get_agent_suggestions_batch
+from .discovery_cache import DiscoveryCache, cache_key
+from .role_model import load_role_model
+from .bulk import discover_bulk
+from .snapshot_diff import SnapshotStore, take_snapshot, check_page
 
-def discover_dom(url, output_json, html_dir=None, use_browser=False, force=False, model="deepseek-r1", retries=3):
-    """Discover DOM elements from a directory or URL, with agent-suggested candidates."""
-    elements = []
+# Larger pages are not indexed: their elements keep simple selectors and no drift snapshot is saved,
+# so memory stays bounded (the index keeps a record per tag).
+MAX_INDEX_BYTES = int(os.getenv("GROK_DOM_MAX_INDEX_BYTES", 16 * 1024 * 1024))
+
+def discover_dom(url, output_json, html_dir=None, use_browser=False, force=False, model="deepseek-r1", retries=3,
+                 use_cache=True):
+    """Discover DOM elements from a directory or URL, with agent-suggested candidates.
+
+    The page is parsed once, streamed from the saved file when there is one; the same pass builds the
+    selector index (up to MAX_INDEX_BYTES; larger pages only get its fingerprint), and the structural
+    fingerprint keys the discovery cache (see discovery_cache), so an unchanged page reuses the model's
+    cached suggestions. The elements always come from this parse: the fingerprint ignores text, and their
+    snippets and roles depend on it. Asking the model streams the file again for the prompt's outline.
+    """
     html = None
     html_file = os.path.join(html_dir, "saved_resource.html") if html_dir else None
 
     if html_file and os.path.exists(html_file) and not force:
         logger.info(f"Using existing HTML file: {html_file}")
-        with open(html_file, 'r', encoding='utf-8') as f:
-            html = f.read()
     else:
         if use_browser:
             html = fetch_dynamic(url, retries)
         else:
             html = fetch_static(url)
         if not html:
+            logger.error("No HTML content available to process")
             return
-        if html and html_file:
+        if html_file:
             os.makedirs(os.path.dirname(html_file), exist_ok=True)
             with open(html_file, 'w', encoding='utf-8') as f:
                 f.write(html)
             logger.info(f"Saved HTML to {html_file}")
 
-    if not html:
-        logger.error("No HTML content available to process")
-        return
-
-    elements = parse_elements(html)
+    role_model = load_role_model()
+    size = os.path.getsize(html_file) if html is None else len(html)
+    index = SelectorIndex() if size <= MAX_INDEX_BYTES else None
+    structure = None if index else StructureHash()
+    if structure:
+        logger.info(f"Page is {size} bytes; skipping the selector index and drift snapshot")
+    with open(html_file, 'r', encoding='utf-8', errors='replace') if html is None else nullcontext(html) as source:
+        elements = extract_elements(source, index=index, role_model=role_model, structure=structure)
     logger.info(f"Found {len(elements)} elements")
 
-    if not ensure_ollama_running(model):
-        logger.error(f"Could not start Ollama with model {model}")
-        return
+    cache = DiscoveryCache() if use_cache else None
+    fingerprint = cache_key((index or structure).fingerprint(), role_model) if cache else None
+    cached = cache.get(fingerprint) if cache else None
+    if cache and index is not None:
+        # Baseline for snapshot_diff's drift checks
+        SnapshotStore(os.path.join(cache.root, "snapshots")).save(take_snapshot(url, index))
 
-    agent_suggestions = get_agent_suggestions(url, html, elements, model)
+    agent_suggestions = cached["suggestions"].get(model) if cached else None
+    if agent_suggestions is not None:
+        logger.info(f"Page structure unchanged ({fingerprint[:12]}); reusing cached {model} suggestions")
+        if url not in cached["urls"]:
+            cache.put(url, fingerprint)
+    else:
+        if not ensure_ollama_running(model):
+            logger.error(f"Could not start Ollama with model {model}")
+            return
+
+        if html is None:  # The prompt's outline is built from the file in chunks, not a second full read
+            with open(html_file, 'r', encoding='utf-8', errors='replace') as f:
+                agent_suggestions = get_agent_suggestions(url, f, elements, model)
+        else:
+            agent_suggestions = get_agent_suggestions(url, html, elements, model)
+        if cache and agent_suggestions.get("error") is None:
+            cache.put(url, fingerprint, model=model, suggestion=agent_suggestions)
 
     with open(output_json, 'w', encoding='utf-8') as f:
         json.dump({"url": url, "elements": elements, "agent_suggestions": agent_suggestions}, f, indent=2)
@@ -1,33 +1,29 @@
-import os
-from .html_fetcher import fetch_html
-from .element_parser import parse_dom_elements
-from .agent_analyzer import analyze_elements
+import sys
+import argparse
+from .bulk import discover_bulk, FETCH_CONCURRENCY, PARSE_WORKERS, SUGGESTION_BATCH
 
-def main():
-    """Run DOM discovery on a local HTML file."""
-    html_path = "grok_com.html"
-    if not os.path.exists(html_path):
-        print(f"Error: {html_path} not found. Please provide a valid HTML file.")
-        return
+def main(argv=None):
+    """Run DOM discovery over saved pages, URLs and manifests; one JSON line per page."""
+    parser = argparse.ArgumentParser(prog="python -m grok_local.dom_discovery", description=main.__doc__)
+    parser.add_argument("sources", nargs="+",
+                        help="Directory of saved pages, HTML file, URL, or .json/.jsonl manifest of URLs and files")
+    parser.add_argument("-o", "--output", default="dom_discovery.jsonl", help="JSONL results file")
+    parser.add_argument("--model", default="deepseek-r1", help="Ollama model for selector suggestions")
+    parser.add_argument("--no-suggest", action="store_true", help="Only parse; do not ask the model")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and do not update the discovery cache")
+    parser.add_argument("--browser", action="store_true", help="Fetch URLs with a browser instead of requests")
+    parser.add_argument("--force", action="store_true", help="Fetch pages again even if they are saved")
+    parser.add_argument("--fetch-concurrency", type=int, default=FETCH_CONCURRENCY)
+    parser.add_argument("--workers", type=int, default=PARSE_WORKERS, help="Parse processes")
+    parser.add_argument("--batch", type=int, default=SUGGESTION_BATCH, help="Pages per model request")
+    args = parser.parse_args(argv)
 
-    # Step 1: Fetch HTML
-    html_content = fetch_html(html_path)
-    if not html_content:
-        print("Failed to load HTML")
-        return
-
-    # Step 2: Parse elements
-    dom_elements = parse_dom_elements(html_content)
-    print(f"Parsed {sum(len(v) for v in dom_elements.values())} DOM elements")
-
-    # Step 3: Analyze with DeepSeekAI
-    analysis = analyze_elements(dom_elements, html_content, url="https://grok.com")
-    print(f"Raw AI Response: {analysis['raw_response']}")
-    if analysis['parsed']:
-        print("Parsed AI Suggestions:")
-        print(json.dumps(analysis['parsed'], indent=2))
-    if analysis['error']:
-        print(f"Analysis Error: {analysis['error']}")
+    summary = discover_bulk(args.sources, args.output, use_browser=args.browser, force=args.force, model=args.model,
+                            use_cache=not args.no_cache, suggest=not args.no_suggest,
+                            fetch_concurrency=args.fetch_concurrency, workers=args.workers, batch_size=args.batch)
+    print(f"Discovered {summary['pages']} pages ({summary['errors']} errors) in {summary['seconds']:.2f} seconds; "
+          f"results in {args.output}")
+    return 1 if summary["errors"] else 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,7 +1,120 @@
+import re
 import json
+import time
 import logging
-from grok_local.config import logger
+import requests
+from grok_local.config import logger, OLLAMA_URL
 from grok_local.ai_adapters.deepseek_ai import DeepSeekAI
+from .html_compactor import compact_html, PROMPT_TOKEN_BUDGET
+
+SUGGESTION_KEYS = ["prompt_input", "submit_button", "response_output"]
+OUTLINE_NOTE = "one element per line, nested by indentation; scripts, styles and hidden elements removed"
+
+def _build_prompt(url, html_content, top_elements, budget=PROMPT_TOKEN_BUDGET):
+    return (
+        f"Analyze this outline of the page at {url} ({OUTLINE_NOTE}):\n\n{compact_html(html_content, budget)}\n\n"
+        f"Here are the top detected elements:\n{json.dumps(top_elements, indent=2)}\n\n"
+        "Suggest the best candidates for:\n"
+        "- Prompt input (where to enter text)\n"
+        "- Submit button (to send the prompt)\n"
+        "- Response output (where the answer appears)\n"
+        "Provide selectors (e.g., '#id', '.class', or tag) and reasoning in JSON format like:\n"
+        "{\n"
+        "  \"prompt_input\": {\"selector\": \"#input-id\", \"reason\": \"...\"},\n"
+        "  \"submit_button\": {\"selector\": \".btn\", \"reason\": \"...\"},\n"
+        "  \"response_output\": {\"selector\": \"#output\", \"reason\": \"...\"}\n"
+        "}"
+    )
+
+def _top_elements(elements):
+    return sorted(elements, key=lambda e: e["candidate_role"]["confidence"], reverse=True)[:5]
+
+def _build_batch_prompt(pages, budget=PROMPT_TOKEN_BUDGET):
+    sections = []
+    for i, (url, html_content, top_elements) in enumerate(pages, 1):
+        # The pages share the budget, so a batch prompt is no longer than a single one.
+        sections.append(f"Page {i}: {url}\n\n{compact_html(html_content, budget // len(pages))}\n\n"
+                        f"Top detected elements:\n{json.dumps(top_elements, indent=2)}")
+    return (
+        f"Analyze these {len(pages)} page outlines ({OUTLINE_NOTE}).\n\n" + "\n\n".join(sections) + "\n\n"
+        "For each page, suggest the best candidates for:\n"
+        "- Prompt input (where to enter text)\n"
+        "- Submit button (to send the prompt)\n"
+        "- Response output (where the answer appears)\n"
+        "Provide selectors (e.g., '#id', '.class', or tag) and reasoning as one JSON object keyed by page number, like:\n"
+        "{\n"
+        "  \"1\": {\"prompt_input\": {\"selector\": \"#input-id\", \"reason\": \"...\"},\n"
+        "        \"submit_button\": {\"selector\": \".btn\", \"reason\": \"...\"},\n"
+        "        \"response_output\": {\"selector\": \"#output\", \"reason\": \"...\"}},\n"
+        "  \"2\": {...}\n"
+        "}"
+    )
+
+def _extract_json(raw_response):
+    """The JSON object in a model reply, or None; tolerates <think> blocks and prose around it."""
+    text = re.sub(r"<think>.*?</think>", "", raw_response, flags=re.S)
+    match = re.search(r"\{.*\}", text, re.S)
+    try:
+        return json.loads(match.group(0) if match else text)
+    except json.JSONDecodeError:
+        return None
+
+def _parse_suggestions(raw_response, model_name, suggestions=None):
+    """analyze_elements-style result for a model reply (or for suggestions already taken from it)."""
+    suggestions = _extract_json(raw_response) if suggestions is None else suggestions
+    if suggestions is None:
+        logger.warning(f"{model_name} response is not valid JSON")
+        return {"raw_response": raw_response, "parsed": None, "error": "Invalid JSON"}
+    if not isinstance(suggestions, dict) or not all(k in suggestions for k in SUGGESTION_KEYS):
+        logger.warning(f"Incomplete JSON response from {model_name}")
+        return {"raw_response": raw_response, "parsed": None, "error": "Incomplete JSON"}
+    return {"raw_response": raw_response, "parsed": suggestions, "error": None}
+
+def _generate(prompt, model):
+    logger.info(f"Asking {model} for selector suggestions")
+    start_time = time.time()
+    response = requests.post(OLLAMA_URL, json={"model": model, "prompt": prompt, "stream": False},
+                             timeout=600)
+    response.raise_for_status()
+    logger.info(f"{model} answered in {time.time() - start_time:.2f} seconds")
+    return response.json()["response"]
+
+def get_agent_suggestions(url, html, elements, model="deepseek-r1"):
+    """Ask the local Ollama model which parsed elements are the prompt input, submit button and response output.
+
+    html is the page as a string or a text file object (see compact_html).
+    """
+    try:
+        raw_response = _generate(_build_prompt(url, html, _top_elements(elements)), model)
+    except Exception as e:
+        logger.error(f"{model} suggestion request failed: {str(e)}")
+        return {"raw_response": None, "parsed": None, "error": str(e)}
+    return _parse_suggestions(raw_response, model)
+
+def get_agent_suggestions_batch(pages, model="deepseek-r1"):
+    """get_agent_suggestions for several (url, html, elements) pages with one model request.
+
+    Returns one result per page, in order. Pages the combined reply has no complete answer for are
+    asked again on their own, so a batch is never worse than separate requests.
+    """
+    if len(pages) == 1:
+        return [get_agent_suggestions(*pages[0], model=model)]
+    try:
+        raw_response = _generate(_build_batch_prompt([(url, html, _top_elements(elements))
+                                                      for url, html, elements in pages]), model)
+        answers = _extract_json(raw_response)
+    except Exception as e:
+        logger.error(f"{model} batch suggestion request failed: {str(e)}")
+        raw_response, answers = None, None
+    results = []
+    for i, page in enumerate(pages, 1):
+        answer = answers.get(str(i)) if isinstance(answers, dict) else None
+        result = _parse_suggestions(raw_response, model, answer) if isinstance(answer, dict) else None
+        if result is None or result["error"] is not None:
+            logger.info(f"No usable batched answer for {page[0]}; asking for it alone")
+            result = get_agent_suggestions(*page, model=model)
+        results.append(result)
+    return results
 
 def analyze_elements(dom_elements, html_content, url="unknown", model="deepseek-chat"):
     """Analyze DOM elements to identify navigation candidates and agent roles with DeepSeekAI."""
@@ -20,42 +133,14 @@ def analyze_elements(dom_elements, html_content, url="unknown", model="deepseek-
     
     # Step 3: Build prompt for DeepSeekAI
     deepseek = DeepSeekAI()
-    prompt = (
-        f"Analyze this HTML snippet from {url}:\n\n{html_content[:1000]}\n\n"
-        f"Here are the top detected elements:\n{json.dumps(top_elements, indent=2)}\n\n"
-        "Suggest the best candidates for:\n"
-        "- Prompt input (where to enter text)\n"
-        "- Submit button (to send the prompt)\n"
-        "- Response output (where the answer appears)\n"
-        "Provide selectors (e.g., '#id', '.class', or tag) and reasoning in JSON format like:\n"
-        "{\n"
-        "  \"prompt_input\": {\"selector\": \"#input-id\", \"reason\": \"...\"},\n"
-        "  \"submit_button\": {\"selector\": \".btn\", \"reason\": \"...\"},\n"
-        "  \"response_output\": {\"selector\": \"#output\", \"reason\": \"...\"}\n"
-        "}"
-    )
 
     # Step 4: Delegate to DeepSeekAI and parse response
     try:
+        prompt = _build_prompt(url, html_content, top_elements)
         logger.info("Sending prompt to DeepSeekAI")
         raw_response = deepseek.delegate(prompt)
         logger.info(f"DeepSeekAI response: {raw_response}")
-
-        # Attempt to parse JSON response
-        try:
-            suggestions = json.loads(raw_response)
-            if not all(k in suggestions for k in ["prompt_input", "submit_button", "response_output"]):
-                logger.warning("Incomplete JSON response from DeepSeekAI")
-                return {"raw_response": raw_response, "parsed": None, "error": "Incomplete JSON"}
-        except json.JSONDecodeError:
-            logger.warning("DeepSeekAI response is not valid JSON")
-            return {"raw_response": raw_response, "parsed": None, "error": "Invalid JSON"}
-
-        return {
-            "raw_response": raw_response,
-            "parsed": suggestions,
-            "error": None
-        }
+        return _parse_suggestions(raw_response, "DeepSeekAI")
     except Exception as e:
         logger.error(f"DeepSeekAI analysis failed: {str(e)}")
         return {"raw_response": None, "parsed": None, "error": str(e)}
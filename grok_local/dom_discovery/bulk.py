@@ -0,0 +1,252 @@
+# grok_local/dom_discovery/bulk.py
+"""discover_dom over many pages: saved snapshots, URLs, or a manifest of both.
+
+Pages go through three stages that overlap: URLs are fetched on a bounded thread pool, pages are parsed
+on a process pool (saved files are read by the worker itself, in chunks, so they are never copied between
+processes), and the model is asked for suggestions a batch of pages at a time on a thread of its own. One
+loop hands each page on as its stage finishes, so fetching and parsing go on while a batch is with the
+model. Pages whose structure is in the discovery cache, or was already asked about in this run, skip the
+model. Each page becomes one line of a JSONL file as soon as it is done, with the time it spent in each
+stage.
+"""
+import os
+import re
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from grok_local.config import logger
+from .ollama_manager import ensure_ollama_running
+from .html_fetcher import fetch_static, fetch_dynamic
+from .element_stream import extract_elements
+from .selector_engine import SelectorIndex
+from .agent_analyzer import get_agent_suggestions_batch
+from .discovery_cache import DiscoveryCache, cache_key
+from .role_model import load_role_model
+
+FETCH_CONCURRENCY = int(os.getenv("GROK_DOM_FETCH_CONCURRENCY", 8))
+PARSE_WORKERS = int(os.getenv("GROK_DOM_PARSE_WORKERS", os.cpu_count() or 1))
+SUGGESTION_BATCH = int(os.getenv("GROK_DOM_SUGGESTION_BATCH", 4))
+HTML_EXTENSIONS = (".html", ".htm")
+MANIFEST_EXTENSIONS = (".json", ".jsonl")
+
+# Browsers' "save page" comment, and the resource folder saved next to the page.
+_SAVED_FROM = re.compile(r"<!-- saved from url=\(\d+\)(\S+) -->")
+_RESOURCE_DIR_SUFFIX = "_files"
+
+def _saved_url(path):
+    """The URL a saved page came from, or a file:// URL for it."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        match = _SAVED_FROM.search(f.read(2048))
+    return match.group(1) if match else "file://" + os.path.abspath(path)
+
+def _manifest_pages(path):
+    """Pages of a manifest: a JSON list, or JSON lines, of URLs, paths or {"url", "html_file"/"html_dir"}."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    entries = json.loads(text) if path.endswith(".json") else [json.loads(line) for line in text.splitlines()
+                                                                if line.strip()]
+    base = os.path.dirname(os.path.abspath(path))
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"url": entry} if re.match(r"https?://", entry) else {"html_file": entry}
+        html_file = entry.get("html_file")
+        if entry.get("html_dir"):
+            html_file = os.path.join(entry["html_dir"], "saved_resource.html")  # discover_dom's layout
+        if html_file:
+            html_file = os.path.join(base, html_file)
+        if not entry.get("url") and not html_file:
+            logger.warning(f"Skipping manifest entry without url or html_file: {entry}")
+            continue
+        yield {"url": entry.get("url") or _saved_url(html_file), "html_file": html_file}
+
+def collect_pages(sources):
+    """{"url", "html_file"} for each page in sources: directory trees, manifests, HTML files and URLs."""
+    for source in sources:
+        if re.match(r"https?://", source):
+            yield {"url": source, "html_file": None}
+        elif os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs[:] = sorted(d for d in dirs if not d.endswith(_RESOURCE_DIR_SUFFIX))
+                for name in sorted(files):
+                    if name.lower().endswith(HTML_EXTENSIONS):
+                        path = os.path.join(root, name)
+                        yield {"url": _saved_url(path), "html_file": path}
+        elif source.lower().endswith(MANIFEST_EXTENSIONS):
+            yield from _manifest_pages(source)
+        elif os.path.isfile(source):
+            yield {"url": _saved_url(source), "html_file": source}
+        else:
+            logger.error(f"Not a URL, directory, manifest or HTML file: {source}")
+
+def _use_saved(page, force):
+    return bool(page["html_file"]) and os.path.exists(page["html_file"]) and not force
+
+def _fetch(page, use_browser, retries, force):
+    """(html, seconds) for a page; html is None when the worker should read page["html_file"] itself."""
+    if _use_saved(page, force):
+        return None, 0.0
+    start = time.perf_counter()
+    html = fetch_dynamic(page["url"], retries) if use_browser else fetch_static(page["url"])
+    if html and page["html_file"]:
+        os.makedirs(os.path.dirname(os.path.abspath(page["html_file"])), exist_ok=True)
+        with open(page["html_file"], "w", encoding="utf-8") as f:
+            f.write(html)
+    return html, time.perf_counter() - start
+
+def _cache_owner(record):
+    # Snapshots of one URL are separate pages here; keyed by URL they would evict each other's entries.
+    return os.path.abspath(record["html_file"]) if record["html_file"] else record["url"]
+
+_worker_model = None
+
+def _init_worker():
+    global _worker_model
+    _worker_model = load_role_model()
+
+def _parse_page(html, html_file):
+    """(elements, cache key, seconds) for a page, in a parse worker."""
+    start = time.perf_counter()
+    index = SelectorIndex()
+    if html is None:
+        with open(html_file, encoding="utf-8", errors="replace") as f:
+            elements = extract_elements(f, index=index, role_model=_worker_model)
+    else:
+        elements = extract_elements(html, index=index, role_model=_worker_model)
+    return elements, cache_key(index.fingerprint(), _worker_model), time.perf_counter() - start
+
+def discover_bulk(sources, output_jsonl, use_browser=False, force=False, model="deepseek-r1", retries=3,
+                  use_cache=True, suggest=True, fetch_concurrency=FETCH_CONCURRENCY, workers=PARSE_WORKERS,
+                  batch_size=SUGGESTION_BATCH):
+    """Discover every page in sources (see collect_pages) and write one JSON line per page to output_jsonl.
+
+    A line has discover_dom's url, elements and agent_suggestions, plus the page's html_file and cache
+    key ("fingerprint"), whether the suggestions came from the cache, the seconds spent fetching,
+    parsing and waiting on the model ("timings"; a batch's model time is shared by its pages), and an
+    error, or None. Returns {"pages", "errors", "seconds"}.
+    """
+    run_start = time.perf_counter()
+    pages = list(collect_pages(sources))
+    cache = DiscoveryCache() if use_cache else None
+    ollama_ready = []  # Checked once, by the first batch
+    pending, written, errors = [], 0, 0
+    waiting = {}   # Fingerprint being asked about -> other pages with that structure, which share the answer
+    answered = {}  # Fingerprint -> suggestions from an earlier batch of this run
+
+    def write(record):
+        nonlocal written, errors
+        timings = record["timings"]
+        timings["total"] = sum(timings.values())
+        record["timings"] = {key: round(value, 3) for key, value in timings.items()}
+        errors += record["error"] is not None
+        written += 1
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+
+    def ask(batch):
+        """(suggestions per page, seconds), on the model thread; None for suggestions if Ollama is down."""
+        if not ollama_ready:
+            ollama_ready.append(ensure_ollama_running(model))
+        if not ollama_ready[0]:
+            return None, 0.0
+        prompts = []
+        for record, html in batch:
+            if html is None:  # Saved files were parsed in the worker; the prompt's outline needs the page again.
+                with open(record["html_file"], encoding="utf-8", errors="replace") as f:
+                    html = f.read()
+            prompts.append((record["url"], html, record["elements"]))
+        start = time.perf_counter()
+        results = get_agent_suggestions_batch(prompts, model)
+        return results, time.perf_counter() - start
+
+    def answer(batch, results, seconds):
+        for index, (record, _) in enumerate(batch):
+            record["timings"]["suggest"] = seconds
+            result = results[index] if results is not None else None
+            if result is not None and result.get("error") is None:
+                answered[record["fingerprint"]] = result
+            for page_record in [record] + waiting.pop(record["fingerprint"]):
+                if result is None:
+                    page_record["error"] = f"Could not start Ollama with model {model}"
+                else:
+                    page_record["agent_suggestions"] = result
+                    page_record["cached"]["suggestions"] = page_record is not record
+                    if cache and result.get("error") is None:
+                        cache.put(_cache_owner(page_record), record["fingerprint"], model=model, suggestion=result)
+                write(page_record)
+
+    def parsed(i, html, future):
+        """Take a parsed page: write it, or queue it for the model."""
+        record = records[i]
+        try:
+            elements, record["fingerprint"], record["timings"]["parse"] = future.result()
+        except Exception as e:
+            record["error"] = f"Parse failed: {e}"
+            write(record)
+            return
+        # Always this page's own elements: the fingerprint ignores text, which their snippets and roles use.
+        record["elements"] = elements
+        cached = cache.get(record["fingerprint"]) if cache else None
+        suggestion = cached["suggestions"].get(model) if cached else None
+        if suggestion is not None:
+            record["agent_suggestions"] = suggestion
+            record["cached"]["suggestions"] = True
+            if _cache_owner(record) not in cached["urls"]:
+                cache.put(_cache_owner(record), record["fingerprint"])
+        elif suggest and record["fingerprint"] in answered:
+            record["agent_suggestions"] = answered[record["fingerprint"]]
+            record["cached"]["suggestions"] = True
+            suggestion = record["agent_suggestions"]
+        if suggestion is not None or not suggest:
+            write(record)
+        elif record["fingerprint"] in waiting:
+            waiting[record["fingerprint"]].append(record)
+        else:
+            waiting[record["fingerprint"]] = []
+            pending.append((record, html))
+
+    logger.info(f"Discovering {len(pages)} pages ({workers} parse workers, {fetch_concurrency} fetches at a time)")
+    with open(output_jsonl, "w", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=fetch_concurrency) as fetchers, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as parsers, \
+            ThreadPoolExecutor(max_workers=1) as asker:
+        records = [{"url": page["url"], "html_file": page["html_file"], "fingerprint": None, "elements": None,
+                    "agent_suggestions": None, "cached": {"suggestions": False},
+                    "timings": {"fetch": 0.0, "parse": 0.0, "suggest": 0.0}, "error": None} for page in pages]
+        # Future -> (stage, page index or batch, fetched html); every stage is driven from this one loop.
+        running = {fetchers.submit(_fetch, page, use_browser, retries, force): ("fetch", i, None)
+                   for i, page in enumerate(pages)}
+        in_flight = len(running)  # Fetches and parses not finished yet
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, item, html = running.pop(future)
+                if stage == "fetch":
+                    try:
+                        html, records[item]["timings"]["fetch"] = future.result()
+                    except Exception as e:
+                        html, records[item]["error"] = None, f"Fetch failed: {e}"
+                    if html is None and (records[item]["error"] or not _use_saved(pages[item], force)):
+                        records[item]["error"] = records[item]["error"] or "No HTML content available"
+                        write(records[item])
+                        in_flight -= 1
+                        continue
+                    running[parsers.submit(_parse_page, html, pages[item]["html_file"])] = ("parse", item, html)
+                elif stage == "parse":
+                    in_flight -= 1
+                    parsed(item, html, future)
+                else:
+                    try:
+                        results, seconds = future.result()
+                    except Exception as e:
+                        logger.error(f"{model} batch request failed: {e}")
+                        results, seconds = [{"raw_response": None, "parsed": None, "error": str(e)}] * len(item), 0.0
+                    answer(item, results, seconds)
+            # A full batch goes to the model at once; the rest waits for more pages, unless none are coming.
+            while len(pending) >= batch_size or (pending and not in_flight):
+                batch = pending[:batch_size]
+                del pending[:batch_size]
+                running[asker.submit(ask, batch)] = ("suggest", batch, None)
+
+    seconds = time.perf_counter() - run_start
+    logger.info(f"Discovered {written} pages ({errors} errors) in {seconds:.2f} seconds; results in {output_jsonl}")
+    return {"pages": written, "errors": errors, "seconds": round(seconds, 3)}
@@ -0,0 +1,77 @@
+# grok_local/dom_discovery/discovery_cache.py
+"""Cache of discover_dom's model suggestions keyed by the page's structural fingerprint.
+
+An entry (entries/ab/<fingerprint>.json) holds the agent suggestions per model. The fingerprint
+(SelectorIndex.fingerprint) ignores text, nonces and generated class names, so saving the same page
+again, or a re-render with new content, is rediscovered without calling the model. Elements are not
+reused: their text and text-dependent roles change with the content, so every page is still parsed.
+Each URL also has a pointer to its latest fingerprint (urls/<sha1 of url>.json): when a page's structure
+changes, the entry it used to point to is dropped unless another URL still uses it.
+"""
+import os
+import json
+import time
+import hashlib
+import tempfile
+from grok_local.config import logger
+
+DISCOVERY_CACHE_DIR = os.getenv("GROK_DOM_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache"))
+
+def cache_key(fingerprint, role_model=None):
+    """Entry key for a page fingerprint; retrained role weights change the elements, so they are part of it."""
+    scorer = role_model.signature() if role_model else "rules"
+    return hashlib.sha256(f"{fingerprint}:{scorer}".encode()).hexdigest()
+
+class DiscoveryCache:
+    def __init__(self, root=DISCOVERY_CACHE_DIR):
+        self.root = root
+
+    def _entry_path(self, fingerprint):
+        return os.path.join(self.root, "entries", fingerprint[:2], fingerprint + ".json")
+
+    def _url_path(self, url):
+        return os.path.join(self.root, "urls", hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _read(self, path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def get(self, fingerprint):
+        """The cached entry ({"suggestions": {model: result}, "urls"}) or None."""
+        return self._read(self._entry_path(fingerprint))
+
+    def put(self, url, fingerprint, model=None, suggestion=None):
+        """Store one model's suggestion for fingerprint, if given, and point url at it."""
+        entry = self.get(fingerprint) or {"fingerprint": fingerprint, "suggestions": {}, "urls": [],
+                                          "created": time.time()}
+        if model is not None and suggestion is not None:
+            entry["suggestions"][model] = suggestion
+        if url not in entry["urls"]:
+            entry["urls"].append(url)
+        self._write(self._entry_path(fingerprint), entry)
+        previous = (self._read(self._url_path(url)) or {}).get("fingerprint")
+        if previous and previous != fingerprint:
+            self.invalidate(url, previous)
+        self._write(self._url_path(url), {"url": url, "fingerprint": fingerprint})
+
+    def invalidate(self, url, fingerprint):
+        """Detach url from an entry, deleting the entry once no URL uses it."""
+        entry = self.get(fingerprint)
+        if entry is None:
+            return
+        entry["urls"] = [u for u in entry["urls"] if u != url]
+        if entry["urls"]:
+            self._write(self._entry_path(fingerprint), entry)
+        else:
+            os.remove(self._entry_path(fingerprint))
+            logger.info(f"Structure of {url} changed; dropped cached discovery {fingerprint[:12]}")
@@ -1,37 +1,280 @@
 # grok_local/dom_discovery/element_parser.py
-from bs4 import BeautifulSoup
+"""Candidate elements (inputs, buttons, text blocks) from a page's HTML.
+
+Two backends produce the same output. "fast" (the default) is one pass of the standard library's
+HTMLParser: each open tag carries its text length and a 50-character snippet, which are folded into the
+parent when the tag closes, so no tree is built and no subtree is walked twice. "bs4" is the original
+BeautifulSoup version, kept as the reference implementation (GROK_DOM_PARSER=bs4).
+"""
+import os
+import re
 import logging
+from html.parser import HTMLParser
+from html.entities import html5
 from grok_local.config import logger
 
-def parse_elements(html):
-    """Parse HTML for relevant DOM elements."""
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+PARSER_BACKEND = os.getenv("GROK_DOM_PARSER", "fast")  # "fast" or "bs4"
+CANDIDATE_TAGS = ('input', 'textarea', 'button', 'form', 'div', 'p', 'span')
+TEXT_SNIPPET = 50
+ROLE_BATCH = 4096  # Elements per vectorized role_model pass
+
+# Tree-building rules of BeautifulSoup's html.parser builder that affect the output, mirrored by the
+# fast backend: void elements close at once, multi-valued attributes become lists, and strings inside
+# these containers are not part of an ancestor's get_text().
+VOID_TAGS = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+                       'menuitem', 'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound',
+                       'command', 'frame', 'image', 'isindex', 'nextid', 'spacer'])
+LIST_ATTRIBUTES = {'*': {'class', 'accesskey', 'dropzone'}, 'a': {'rel', 'rev'}, 'link': {'rel', 'rev'},
+                   'td': {'headers'}, 'th': {'headers'}, 'form': {'accept-charset'},
+                   'object': {'archive'}, 'area': {'rel'}, 'icon': {'sizes'}, 'iframe': {'sandbox'},
+                   'output': {'for'}}
+STRING_CONTAINERS = frozenset(['style', 'script', 'template', 'rt', 'rp'])
+_WORDS = re.compile(r"\S+")
+_NUMERIC_PREFIX = {10: re.compile(r"^([0-9]+)(.*)", re.S), 16: re.compile(r"^([0-9a-f]+)(.*)", re.S)}
+
+def parse_elements(html, backend=PARSER_BACKEND, role_model=None):
+    """Parse HTML for relevant DOM elements; roles come from role_model if given, else the rules below."""
+    if backend == "bs4" and role_model is None:
+        if BeautifulSoup is not None:
+            return _parse_elements_bs4(html)
+        logger.warning("beautifulsoup4 is not installed; using the fast parser")
+    logger.info("Parsing HTML in a single pass")
+    collector = ElementCollector(role_model)
+    collector.feed(html)
+    collector.close()
+    return collector.elements
+
+def _parse_elements_bs4(html):
     soup = BeautifulSoup(html, 'html.parser')
     logger.info("Parsing HTML with BeautifulSoup")
     elements = []
-    for tag in soup.find_all(['input', 'textarea', 'button', 'form', 'div', 'p', 'span']):
+    for tag in soup.find_all(list(CANDIDATE_TAGS)):
+        text = tag.get_text(strip=True)
         element = {
             "tag": tag.name,
-            "text": tag.get_text(strip=True)[:50],
+            "text": text[:TEXT_SNIPPET],
             "attributes": dict(tag.attrs),
-            "selector": _generate_selector(tag),
-            "candidate_role": _identify_candidate_role(tag)
+            "selector": _generate_selector(tag.name, tag.attrs),
+            "candidate_role": _identify_candidate_role(tag.name, tag.attrs, text.lower())
         }
         if element["text"] or element["attributes"]:
             elements.append(element)
     return elements
 
-def _generate_selector(tag):
-    if tag.get('id'):
-        return f"#{tag['id']}"
-    elif tag.get('class'):
-        return f"{tag.name}.{'.'.join(tag['class'])}"
+def _charref(name):
+    """Text for a numeric character reference, as BeautifulSoup resolves it: (character, trailing data)."""
+    base, digits = (16, name[1:]) if name[:1] in ("x", "X") else (10, name)
+    extra = ""
+    try:
+        number = int(digits, base)
+    except ValueError:
+        match = _NUMERIC_PREFIX[base].search(digits)
+        if match is None:
+            return "", name
+        number, extra = int(match.group(1), base), match.group(2)
+    if number == 0 or number > 0x10ffff or 0xd800 <= number <= 0xdfff:
+        return "�", extra
+    if 0x80 <= number <= 0x9f:
+        try:
+            return bytes([number]).decode("cp1252"), extra
+        except UnicodeDecodeError:
+            pass
+    return chr(number), extra
+
+class _Frame:
+    __slots__ = ("name", "attributes", "order", "length", "snippet", "full", "depth", "position", "children")
+
+    def __init__(self, name, attributes, order, full, depth, position):
+        self.name = name
+        self.attributes = attributes
+        self.order = order      # Document position among candidate tags, or None for other tags
+        self.length = 0         # Length of the lowercased get_text(strip=True)
+        self.snippet = ""       # Its first TEXT_SNIPPET characters
+        self.full = full        # Whole text, kept only inside buttons (their role reads it); else None
+        self.depth = depth      # Open ancestors
+        self.position = position  # Earlier siblings
+        self.children = 0
+
+class ElementCollector(HTMLParser):
+    """HTMLParser that builds parse_elements' output in document order without keeping a tree.
+
+    Each candidate is finished when its tag closes and handed to _emit(); subclasses override _reserve()
+    and _emit() to consume elements as they are parsed instead of collecting them. With a role_model
+    (role_model.RoleModel), candidate roles come from the model, scored in batches of ROLE_BATCH.
+    """
+    full_text_limit = None  # Cap on the button text kept for role scoring (None keeps all of it)
+
+    def __init__(self, role_model=None):
+        super().__init__(convert_charrefs=False)
+        self.role_model = role_model
+        self.elements = []
+        self._batch = []
+        self._stack = []
+        self._open = {}           # Tag name -> number of open tags with that name
+        self._closed_void = {}    # Void tag name -> explicit end tags still to ignore
+        self._containers = 0      # Open STRING_CONTAINERS tags
+        self._data = []
+
+    def close(self):
+        super().close()
+        self._flush()
+        while self._stack:
+            self._pop()
+        self._score_batch()
+        self.elements = [element for element in self.elements if element is not None]
+
+    def _reserve(self):
+        self.elements.append(None)
+        return len(self.elements) - 1
+
+    def _emit(self, order, element):
+        self.elements[order] = element
+
+    def _add_text(self, frame, length, snippet, full):
+        frame.length += length
+        if len(frame.snippet) < TEXT_SNIPPET:
+            frame.snippet += snippet[:TEXT_SNIPPET - len(frame.snippet)]
+        if frame.full is not None and (self.full_text_limit is None or len(frame.full) < self.full_text_limit):
+            frame.full = (frame.full + full)[:self.full_text_limit]
+
+    def _flush(self, cdata=False):
+        """End the current string (BeautifulSoup merges adjacent data into one) and add it to the open tag."""
+        if not self._data:
+            return
+        text = "".join(self._data).strip()
+        self._data = []
+        # Script, style etc. text is skipped; CDATA sections count even inside those.
+        if not text or not self._stack or (self._containers and not cdata):
+            return
+        self._text(self._stack[-1], text)
+
+    def _text(self, frame, text):
+        """A string directly inside frame's tag (subclasses can keep where it occurs)."""
+        self._add_text(frame, len(text) if text.isascii() else len(text.lower()), text, text)
+
+    def _push(self, tag, attrs):
+        attributes = {}
+        for key, value in attrs:
+            attributes[key] = "" if value is None else value
+        listed = LIST_ATTRIBUTES['*'] | LIST_ATTRIBUTES.get(tag, set())
+        for key in listed.intersection(attributes):
+            attributes[key] = _WORDS.findall(attributes[key])
+        order = self._reserve() if tag in CANDIDATE_TAGS else None
+        parent = self._stack[-1] if self._stack else None
+        in_button = tag == 'button' or (parent is not None and parent.full is not None)
+        position = 0
+        if parent is not None:
+            position, parent.children = parent.children, parent.children + 1
+        self._stack.append(_Frame(tag, attributes, order, "" if in_button else None, len(self._stack), position))
+        self._open[tag] = self._open.get(tag, 0) + 1
+        if tag in STRING_CONTAINERS:
+            self._containers += 1
+
+    def _pop(self):
+        frame = self._stack.pop()
+        self._open[frame.name] -= 1
+        if frame.name in STRING_CONTAINERS:
+            self._containers -= 1
+        if self._stack:
+            self._add_text(self._stack[-1], frame.length, frame.snippet, frame.full or "")
+        if frame.order is not None:
+            text = (frame.full if frame.full is not None else frame.snippet).lower()
+            element = {
+                "tag": frame.name,
+                "text": frame.snippet,
+                "attributes": frame.attributes,
+                "selector": _generate_selector(frame.name, frame.attributes),
+                "candidate_role": None
+            }
+            if not (element["text"] or element["attributes"]):
+                self._emit(frame.order, None)
+            elif self.role_model is None:
+                element["candidate_role"] = _identify_candidate_role(frame.name, frame.attributes, text, frame.length)
+                self._emit(frame.order, element)
+            else:
+                features = self.role_model.features(frame.name, frame.attributes, text, frame.length, frame.depth,
+                                                    frame.position, frame.children)
+                self._batch.append((frame.order, element, features))
+                if len(self._batch) >= ROLE_BATCH:
+                    self._score_batch()
+
+    def _score_batch(self):
+        if not self._batch:
+            return
+        roles = self.role_model.predict([features for _, _, features in self._batch])
+        for (order, element, _), role in zip(self._batch, roles):
+            element["candidate_role"] = role
+            self._emit(order, element)
+        self._batch = []
+
+    def _pop_to(self, tag):
+        if not self._open.get(tag):
+            return
+        while self._stack[-1].name != tag:
+            self._pop()
+        self._pop()
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        self._push(tag, attrs)
+        if tag in VOID_TAGS:
+            self._pop_to(tag)
+            self._closed_void[tag] = self._closed_void.get(tag, 0) + 1
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush()
+        self._push(tag, attrs)
+        self._pop_to(tag)
+
+    def handle_endtag(self, tag):
+        if self._closed_void.get(tag):
+            self._closed_void[tag] -= 1
+            return
+        self._flush()
+        self._pop_to(tag)
+
+    def handle_data(self, data):
+        self._data.append(data)
+
+    def handle_charref(self, name):
+        self._data.extend(_charref(name))
+
+    def handle_entityref(self, name):
+        self._data.append(html5.get(name + ";", "&" + name))
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        self._flush()
+        if data.upper().startswith("CDATA["):
+            self._data.append(data[len("CDATA["):])
+            self._flush(cdata=True)
+
+def _generate_selector(tag_name, attrs):
+    if attrs.get('id'):
+        return f"#{attrs['id']}"
+    elif attrs.get('class'):
+        return f"{tag_name}.{'.'.join(attrs['class'])}"
     else:
-        return tag.name
+        return tag_name
 
-def _identify_candidate_role(tag):
-    text = tag.get_text(strip=True).lower()
-    attrs = {k.lower(): v.lower() if isinstance(v, str) else v for k, v in tag.attrs.items()}
-    tag_name = tag.name.lower()
+def _identify_candidate_role(tag_name, attrs, text, text_length=None):
+    """Role guess from the tag, its attributes and its lowercased text (text_length if only a prefix is given)."""
+    text_length = len(text) if text_length is None else text_length
+    attrs = {k.lower(): v.lower() if isinstance(v, str) else v for k, v in attrs.items()}
+    tag_name = tag_name.lower()
 
     if tag_name in ['textarea', 'input']:
         score = 0
@@ -57,7 +300,7 @@ def _identify_candidate_role(tag):
 
     if tag_name in ['div', 'p', 'span']:
         score = 0
-        if len(text) > 20:
+        if text_length > 20:
             score += 0.6
         if 'response' in attrs.get('class', []) or 'output' in attrs.get('class', []):
             score += 0.5
@@ -0,0 +1,122 @@
+# grok_local/dom_discovery/element_stream.py
+"""Bounded-memory element extraction for large pages.
+
+The page is fed to element_parser's single-pass collector in chunks, from a file or a string, and each
+candidate element comes out as soon as its tag closes. Attribute values are truncated (inline styles and
+data blobs can be most of a single-page-app dump), and extract_elements keeps only the top TOP_K elements
+per candidate role, so memory depends on those limits and the nesting depth, not on the page size. The
+exception is the selector index, when one is asked for: it keeps a small record of every tag (name,
+selector attributes, parent) until the page is done, so its memory grows with the number of tags. A
+selector_engine.StructureHash gives the same fingerprint in bounded memory, without the selectors.
+"""
+import os
+import heapq
+from collections import deque
+from grok_local.config import logger
+from .element_parser import ElementCollector
+
+CHUNK_SIZE = 64 * 1024
+TOP_K = int(os.getenv("GROK_DOM_TOP_K", 50))
+MAX_ATTRIBUTE_LENGTH = int(os.getenv("GROK_DOM_MAX_ATTRIBUTE", 200))
+BUTTON_TEXT_LIMIT = 1000  # Button text kept for role scoring
+
+def truncate_attributes(attributes, limit=MAX_ATTRIBUTE_LENGTH):
+    """Copy of attributes with string values cut to limit characters and list values to limit characters in total."""
+    truncated = {}
+    for key, value in attributes.items():
+        if isinstance(value, list):
+            kept, size = [], 0
+            for item in value:
+                size += len(item)
+                if size > limit:
+                    break
+                kept.append(item)
+            truncated[key] = kept
+        else:
+            truncated[key] = value if len(value) <= limit else value[:limit] + "…"
+    return truncated
+
+class _StreamingCollector(ElementCollector):
+    full_text_limit = BUTTON_TEXT_LIMIT
+
+    def __init__(self, max_attribute_length, role_model=None, trees=()):
+        super().__init__(role_model)
+        self.max_attribute_length = max_attribute_length
+        self.trees = trees
+        self.ready = deque()
+        self._count = 0
+
+    # An index or structure hash records the tree from this parse instead of parsing the page again.
+    def _push(self, tag, attrs):
+        super()._push(tag, attrs)
+        for tree in self.trees:
+            tree.open_node(self._stack[-1])
+
+    def _pop(self):
+        super()._pop()
+        for tree in self.trees:
+            tree.close_node()
+
+    def _reserve(self):
+        self._count += 1
+        return self._count - 1
+
+    def _emit(self, order, element):
+        if element is not None:
+            # Selector and role were computed from the full values; only the stored copy is cut.
+            element["attributes"] = truncate_attributes(element["attributes"], self.max_attribute_length)
+            self.ready.append((order, element))
+
+def iter_chunks(source, chunk_size=CHUNK_SIZE):
+    """An HTML string or text file object in pieces of chunk_size characters."""
+    if isinstance(source, str):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size]
+    else:
+        for chunk in iter(lambda: source.read(chunk_size), ""):
+            yield chunk
+
+def iter_elements(source, chunk_size=CHUNK_SIZE, max_attribute_length=MAX_ATTRIBUTE_LENGTH, index=None,
+                  role_model=None, structure=None):
+    """Yield (document position, element) for each candidate as its closing tag is parsed.
+
+    source is an HTML string or a text file object; elements have parse_elements' format. An index
+    (selector_engine.SelectorIndex) is built from the same parse, for selectors once the page is done,
+    as is a structure (selector_engine.StructureHash); a role_model (role_model.RoleModel) scores roles
+    in batches instead of the rules.
+    """
+    trees = tuple(tree for tree in (index, structure) if tree is not None)
+    collector = _StreamingCollector(max_attribute_length, role_model, trees)
+    for chunk in iter_chunks(source, chunk_size):
+        collector.feed(chunk)
+        while collector.ready:
+            yield collector.ready.popleft()
+    collector.close()
+    while collector.ready:
+        yield collector.ready.popleft()
+
+def extract_elements(source, top_k=TOP_K, chunk_size=CHUNK_SIZE, max_attribute_length=MAX_ATTRIBUTE_LENGTH,
+                     index=None, role_model=None, keep=None, structure=None):
+    """The top_k most confident elements per candidate role (role None included), in document order.
+
+    With an index, each kept element's selector is replaced by a unique one and gets a "robustness" score.
+    keep, a predicate on document position, limits the candidates to part of the page.
+    """
+    heaps, seen = {}, 0
+    for order, element in iter_elements(source, chunk_size, max_attribute_length, index, role_model, structure):
+        if keep is not None and not keep(order):
+            continue
+        seen += 1
+        heap = heaps.setdefault(element["candidate_role"]["role"], [])
+        # Ties keep the earlier element: the heap root is the least confident, latest one.
+        entry = (element["candidate_role"]["confidence"], -order, element)
+        if len(heap) < top_k:
+            heapq.heappush(heap, entry)
+        else:
+            heapq.heappushpop(heap, entry)
+    kept = sorted((entry for heap in heaps.values() for entry in heap), key=lambda entry: -entry[1])
+    if index is not None:
+        for _, negative_order, element in kept:
+            element["selector"], element["robustness"] = index.selector_for_element(-negative_order)
+    logger.info(f"Extracted {len(kept)} of {seen} elements (top {top_k} per role)")
+    return [element for _, _, element in kept]
@@ -0,0 +1,204 @@
+# grok_local/dom_discovery/html_compactor.py
+"""A page's HTML cut down to what a model needs to pick selectors, within a token budget.
+
+compact_html parses the page (same tree rules as element_parser) and renders an outline: one element per
+line, nesting shown by indentation, no closing tags. Scripts, styles, SVG and hidden elements are dropped,
+as are elements with neither text nor anything interactive inside. Attribute-less wrappers around a single
+child are unwrapped, only the attributes selectors are built from are kept, and runs of identically shaped
+siblings (list items, chat messages) are shown twice followed by a count. If the outline is still over
+budget, text entry fields are kept first, then other interactive elements, then elements with text,
+each with its ancestors.
+
+The output depends only on the page and the limits, so prompts (and cached suggestions) are stable.
+"""
+import os
+import re
+from .element_parser import ElementCollector
+from .element_stream import iter_chunks
+from .selector_engine import STABLE_ATTRIBUTES, looks_generated
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("GROK_DOM_PROMPT_TOKENS", 1000))
+DROPPED_TAGS = frozenset(['script', 'style', 'svg', 'noscript', 'template', 'iframe', 'canvas', 'object',
+                          'embed', 'link', 'meta', 'base'])
+INTERACTIVE_TAGS = frozenset(['a', 'button', 'input', 'textarea', 'select', 'label', 'form', 'summary'])
+ENTRY_TAGS = frozenset(['input', 'textarea'])  # Where a prompt can go: kept first when over budget
+INTERACTIVE_ROLES = frozenset(['button', 'link', 'textbox', 'searchbox', 'combobox', 'checkbox', 'radio',
+                               'switch', 'tab', 'menuitem', 'option'])
+KEY_ATTRIBUTES = ('id', 'class') + tuple(STABLE_ATTRIBUTES) + ('contenteditable', 'href', 'title', 'for')
+MAX_CLASSES = 3
+ATTRIBUTE_LIMIT = 60
+TEXT_LIMITS = (80, 30)  # Text kept per element: the first that fits the budget, or the last
+REPEAT_KEEP = 2         # Identically shaped siblings shown before the rest are counted
+
+_SPACE = re.compile(r"\s+")
+_HIDING_STYLE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.I)
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token), so no model tokenizer is needed."""
+    return (len(text) + 3) // 4
+
+def _clip(text, limit):
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+def _hidden(tag, attributes):
+    return ("hidden" in attributes or attributes.get("aria-hidden") == "true"
+            or (tag == "input" and attributes.get("type", "").lower() == "hidden")
+            or bool(_HIDING_STYLE.search(attributes.get("style", ""))))
+
+class _Node:
+    __slots__ = ("tag", "attributes", "children", "text", "interactive", "signature")
+
+    def __init__(self, tag, attributes):
+        self.tag = tag
+        self.attributes = attributes  # Only KEY_ATTRIBUTES, clipped; class is a list
+        self.children = []
+        self.text = []                # Strings directly inside the element
+        self.interactive = (tag in INTERACTIVE_TAGS or attributes.get("role") in INTERACTIVE_ROLES
+                            or "contenteditable" in attributes)
+        self.signature = None
+
+class _TreeBuilder(ElementCollector):
+    """Visible elements of a page as _Nodes; a None entry on the stack is a dropped subtree."""
+
+    def __init__(self):
+        super().__init__()
+        self.root = _Node("#document", {})
+        self._nodes = [self.root]
+
+    def _reserve(self):
+        return None  # No candidate elements are built
+
+    def _push(self, tag, attrs):
+        super()._push(tag, attrs)
+        parent = self._nodes[-1]
+        attributes = self._stack[-1].attributes
+        if parent is None or tag in DROPPED_TAGS or _hidden(tag, attributes):
+            self._nodes.append(None)
+            return
+        kept = {}
+        for key in KEY_ATTRIBUTES:
+            if key == "class":
+                classes = [cls for cls in attributes.get("class", []) if not looks_generated(cls)][:MAX_CLASSES]
+                if classes:
+                    kept[key] = classes
+            elif key in attributes:
+                kept[key] = _clip(attributes[key], ATTRIBUTE_LIMIT)
+        node = _Node(tag, kept)
+        parent.children.append(node)
+        self._nodes.append(node)
+
+    def _pop(self):
+        super()._pop()
+        self._nodes.pop()
+
+    def _text(self, frame, text):
+        super()._text(frame, text)
+        if self._nodes[-1] is not None:
+            self._nodes[-1].text.append(_SPACE.sub(" ", text))
+
+def _subtree(node, descend=lambda child: True):
+    """node and its descendants (through the children descend accepts), parents before children.
+
+    The traversals here use an explicit stack: pages can nest deeper than Python's recursion limit.
+    """
+    order, stack = [], [node]
+    while stack:
+        current = stack.pop()
+        order.append(current)
+        stack.extend(child for child in current.children if descend(child))
+    return order
+
+def _prune(node):
+    """Drop empty, non-interactive subtrees and unwrap bare single-child wrappers; the node, or None."""
+    pruned = {}  # id(node) -> what replaces it
+    for current in reversed(_subtree(node)):  # Children before their parent
+        children = [pruned[id(child)] for child in current.children if pruned[id(child)] is not None]
+        current.children = children
+        if not (current.interactive or current.text or children):
+            pruned[id(current)] = None
+        elif (not (current.interactive or current.text or current.attributes) and len(children) == 1
+              and current.tag != "#document"):
+            pruned[id(current)] = children[0]
+        else:
+            pruned[id(current)] = current
+    return pruned[id(node)]
+
+def _signature(node):
+    """Shape of a subtree (tags, classes and attribute names; not text or values), for spotting repeats."""
+    if node.signature is None:
+        for current in reversed(_subtree(node, lambda child: child.signature is None)):
+            current.signature = hash((current.tag, tuple(current.attributes.get("class", ())),
+                                      tuple(sorted(key for key in current.attributes if key not in ("class", "id"))),
+                                      tuple(child.signature for child in current.children)))
+    return node.signature
+
+def _render_line(node, text_limit):
+    parts = [node.tag]
+    for key, value in node.attributes.items():
+        value = " ".join(value) if key == "class" else value
+        parts.append(f'{key}="{value}"' if value else key)
+    line = "<" + " ".join(parts) + ">"
+    if node.text:
+        line += " " + _clip(" ".join(node.text), text_limit)
+    return line
+
+def _lines(root, text_limit):
+    """(indented line, priority, parent line index) for the outline, in document order."""
+    lines = []
+    stack = [(root, 0, None)]  # (node, or the line ending a run of repeats; depth; parent line index)
+    while stack:
+        node, depth, parent = stack.pop()
+        if isinstance(node, str):
+            lines.append((node, 0, parent))
+            continue
+        index = parent
+        if node.tag != "#document":
+            entry = (node.tag in ENTRY_TAGS or node.attributes.get("role") == "textbox"
+                     or "contenteditable" in node.attributes)
+            priority = 3 if entry else 2 if node.interactive else 1 if node.text else 0
+            lines.append(("  " * depth + _render_line(node, text_limit), priority, parent))
+            index, depth = len(lines) - 1, depth + 1
+        run, shown = 0, []
+        for i, child in enumerate(node.children):
+            run = run + 1 if i and _signature(child) == _signature(node.children[i - 1]) else 1
+            if run <= REPEAT_KEEP:
+                shown.append((child, depth, index))
+            end = i + 1 == len(node.children) or _signature(node.children[i + 1]) != _signature(child)
+            if end and run > REPEAT_KEEP:
+                classes = "".join("." + cls for cls in child.attributes.get("class", ()))
+                shown.append(("  " * depth + f"… {run - REPEAT_KEEP} more <{child.tag}{classes}>", depth, index))
+        stack.extend(reversed(shown))
+    return lines
+
+def _fit(lines, budget):
+    """Indexes of the lines to keep: by priority, then document order, each with its ancestors."""
+    kept, used = set(), 0
+    for i in sorted(range(len(lines)), key=lambda i: (-lines[i][1], i)):
+        needed, j = [], i
+        while j is not None and j not in kept:
+            needed.append(j)
+            j = lines[j][2]
+        cost = sum(estimate_tokens(lines[j][0]) + 1 for j in needed)
+        if used + cost <= budget:
+            kept.update(needed)
+            used += cost
+    return sorted(kept)
+
+def compact_html(html, budget=PROMPT_TOKEN_BUDGET):
+    """Outline of the page's visible structure in at most about budget tokens (see estimate_tokens).
+
+    html is a string or a text file object, which is read in chunks.
+    """
+    builder = _TreeBuilder()
+    for chunk in iter_chunks(html):
+        builder.feed(chunk)
+    builder.close()
+    root = _prune(builder.root) or builder.root
+    for text_limit in TEXT_LIMITS:
+        lines = _lines(root, text_limit)
+        outline = "\n".join(line for line, _, _ in lines)
+        if estimate_tokens(outline) <= budget:
+            return outline
+    omitted_note = "… {} more elements omitted"
+    kept = _fit(lines, budget - estimate_tokens(omitted_note.format(len(lines))) - 1)
+    return "\n".join([lines[i][0] for i in kept] + [omitted_note.format(len(lines) - len(kept))])
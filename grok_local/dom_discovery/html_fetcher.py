@@ -3,7 +3,7 @@ import requests
 import time
 import logging
 from grok_local.config import logger, BROWSER_BACKEND
-from grok_local.browser_adapter import BrowserAdapter
+from grok_local.browser_pool import get_pool
 
 def fetch_static(url):
     """Fetch HTML statically using requests."""
@@ -16,26 +16,27 @@ def fetch_static(url):
         logger.error(f"Static DOM fetch failed: {str(e)}")
         return None
 
-def fetch_dynamic(url, retries):
-    """Fetch HTML dynamically using a browser."""
+def fetch_dynamic(url, retries, backend=BROWSER_BACKEND, static_fallback=True):
+    """Fetch HTML dynamically using a browser.
+
+    When every attempt fails the page is fetched statically instead, unless static_fallback is False,
+    in which case None is returned.
+    """
     for attempt in range(retries):
         try:
-            browser = BrowserAdapter(BROWSER_BACKEND)
-            logger.info(f"Attempt {attempt + 1}/{retries}: Loading {url} dynamically with {BROWSER_BACKEND}")
-            browser.goto(url)
-            time.sleep(5)
-            if BROWSER_BACKEND == "PLAYWRIGHT":
-                html = browser.driver.content()
-            elif BROWSER_BACKEND == "SELENIUM":
-                html = browser.driver.page_source
-            else:
-                html = browser.driver.page_source if hasattr(browser.driver, 'page_source') else browser.driver.content()
-            browser.close()
-            return html
+            # Retries reuse the pooled browser; a failed attempt only recycles its page.
+            with get_pool(backend=backend).checkout() as browser:
+                logger.info(f"Attempt {attempt + 1}/{retries}: Loading {url} dynamically with {backend}")
+                browser.goto(url)
+                browser.wait_for_network_idle(timeout=15)
+                return browser.content()
         except Exception as e:
             logger.error(f"Attempt {attempt + 1} failed: {str(e)}")
             if attempt == retries - 1:
+                if not static_fallback:
+                    logger.error("All retries failed")
+                    return None
                 logger.error("All retries failed; falling back to static fetch")
                 return fetch_static(url)
-            time.sleep(2)
+            time.sleep(0.5 * 2 ** attempt)  # Short backoff; the page load itself is no longer padded
     return None
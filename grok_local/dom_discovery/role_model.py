@@ -0,0 +1,275 @@
+# grok_local/dom_discovery/role_model.py
+"""Trainable candidate-role scoring: one logistic model per role over a NumPy feature matrix.
+
+element_parser's collector hands over each candidate's raw inputs; a batch becomes one feature matrix
+(tag one-hot, attribute and text token hits, text length, depth, sibling position, child count) built
+with column-wise NumPy operations and is scored with one matrix product. The default weights encode the same hints as element_parser._identify_candidate_role; `fit`
+learns new ones from labeled pages and writes ROLE_WEIGHTS, which is loaded from then on.
+
+    python -m grok_local.dom_discovery.role_model fit grok_local/html/grok_elements.json:grok_local/html/grok_com.html
+    python -m grok_local.dom_discovery.role_model score grok_local/html/grok_chat.html
+
+A labeled page is a discover_dom output JSON (its agent_suggestions selectors, or a "labels" object of
+role -> selector) plus the HTML it describes, given as LABELS.json:PAGE.html or via "html_file" in the JSON.
+"""
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+from grok_local.config import logger
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ROLE_WEIGHTS = os.getenv("GROK_DOM_ROLE_WEIGHTS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "role_weights.json"))
+ROLE_SCORER = os.getenv("GROK_DOM_SCORER", "model")  # "model" (when NumPy is installed) or "rules"
+ROLES = ["prompt_input", "submit_button", "response_output"]
+THRESHOLD = 0.5
+TAGS = ['input', 'textarea', 'button', 'form', 'div', 'p', 'span']
+ATTRIBUTE_TOKENS = ['prompt', 'input', 'query', 'search', 'message', 'chat', 'submit', 'send', 'btn', 'button',
+                    'response', 'output', 'answer', 'content', 'result', 'markdown', 'hidden']
+TEXT_TOKENS = ['submit', 'send', 'ask']
+SCORED_ATTRIBUTES = ('id', 'name', 'class', 'aria-label', 'placeholder', 'role', 'type', 'data-testid')
+FEATURES = ([f"tag:{t}" for t in TAGS] + [f"attr:{t}" for t in ATTRIBUTE_TOKENS] + [f"text:{t}" for t in TEXT_TOKENS]
+            + ["type:none", "type:text", "type:submit", "type:hidden", "editable", "text:long", "text:log_length",
+               "depth:log", "position:log", "children:log"])
+
+# Logit contributions per role ("bias" is the intercept); features not listed weigh 0.
+DEFAULT_WEIGHTS = {
+    "prompt_input": {"bias": -4.0, "tag:textarea": 3.0, "tag:input": 2.0, "attr:prompt": 3.0, "attr:input": 1.5,
+                     "attr:query": 1.5, "attr:search": 1.0, "attr:message": 1.0, "attr:chat": 1.0, "type:none": 1.0,
+                     "type:text": 1.0, "type:submit": -3.0, "type:hidden": -6.0, "editable": 4.5},
+    "submit_button": {"bias": -4.0, "tag:button": 2.5, "text:submit": 3.0, "text:send": 3.0, "text:ask": 2.0,
+                      "attr:submit": 2.5, "attr:send": 2.5, "attr:btn": 1.0, "attr:button": 0.5, "type:submit": 2.5,
+                      "type:hidden": -6.0},
+    "response_output": {"bias": -4.5, "tag:div": 1.0, "tag:p": 1.0, "tag:span": 0.5, "text:long": 2.0,
+                        "text:log_length": 0.3, "attr:response": 3.0, "attr:output": 2.5, "attr:answer": 2.5,
+                        "attr:content": 1.5, "attr:result": 2.0, "attr:markdown": 2.5, "attr:message": 1.5,
+                        "attr:hidden": -2.0, "children:log": -0.2},
+}
+
+class RoleModel:
+    """Weights (features x roles) plus bias; predict() scores a batch of feature rows at once."""
+
+    def __init__(self, weights, bias, roles=ROLES, threshold=THRESHOLD):
+        if np is None:
+            raise RuntimeError("NumPy is required for role_model scoring: pip install numpy")
+        self.roles = list(roles)
+        self.weights = np.asarray(weights, dtype=np.float64).reshape(len(FEATURES), len(self.roles))
+        self.bias = np.asarray(bias, dtype=np.float64).reshape(len(self.roles))
+        self.threshold = threshold
+
+    @classmethod
+    def from_table(cls, table, threshold=THRESHOLD):
+        roles = list(table)
+        weights = [[table[role].get(name, 0.0) for role in roles] for name in FEATURES]
+        return cls(weights, [table[role].get("bias", 0.0) for role in roles], roles, threshold)
+
+    @classmethod
+    def default(cls):
+        return cls.from_table(DEFAULT_WEIGHTS)
+
+    @classmethod
+    def load(cls, path=ROLE_WEIGHTS):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls.from_table(data["weights"], data.get("threshold", THRESHOLD))
+
+    def save(self, path=ROLE_WEIGHTS, meta=None):
+        table = {role: dict({"bias": round(float(self.bias[j]), 4)},
+                            **{name: round(float(self.weights[i, j]), 4) for i, name in enumerate(FEATURES)
+                               if abs(self.weights[i, j]) >= 1e-4})
+                 for j, role in enumerate(self.roles)}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(dict({"threshold": self.threshold, "weights": table}, **(meta or {})), f, indent=2)
+
+    def signature(self):
+        """Short hash of the weights, for caches of scored elements."""
+        return hashlib.sha256(self.weights.tobytes() + self.bias.tobytes()).hexdigest()[:16]
+
+    @staticmethod
+    def features(tag, attributes, text, text_length, depth, position, children):
+        """Raw inputs for one element's feature row (see matrix); text is lowercased, whole for buttons."""
+        values = " ".join(" ".join(v) if isinstance(v, list) else v
+                          for k, v in attributes.items() if k in SCORED_ATTRIBUTES).lower()
+        input_type = attributes.get('type', '').lower()
+        hidden = input_type == 'hidden' or 'hidden' in attributes
+        editable = attributes.get('contenteditable', 'false') != 'false' or attributes.get('role') == 'textbox'
+        return (tag, values, text, input_type, hidden, editable, text_length, depth, position, children)
+
+    @staticmethod
+    def matrix(rows):
+        """Feature matrix (len(rows) x len(FEATURES)) built column by column with vectorized string tests."""
+        tags, values, texts, types, hidden, editable, lengths, depths, positions, children = (
+            np.array(column) for column in zip(*rows))
+        lengths = lengths.astype(np.float64)
+        columns = [tags == t for t in TAGS]
+        columns += [np.char.find(values, t) >= 0 for t in ATTRIBUTE_TOKENS]
+        columns += [np.char.find(texts, t) >= 0 for t in TEXT_TOKENS]
+        columns += [types == "", (types == "text") | (types == "search"), types == "submit", hidden, editable,
+                    lengths > 20, np.log1p(lengths), np.log1p(depths.astype(np.float64)),
+                    np.log1p(positions.astype(np.float64)), np.log1p(children.astype(np.float64))]
+        return np.column_stack(columns).astype(np.float64)
+
+    def probabilities(self, rows):
+        matrix = rows if isinstance(rows, np.ndarray) else self.matrix(rows)
+        return 1.0 / (1.0 + np.exp(-(matrix @ self.weights + self.bias)))
+
+    def predict(self, rows):
+        """candidate_role dicts for a batch of feature rows, in one vectorized pass."""
+        probabilities = self.probabilities(rows)
+        best = probabilities.argmax(axis=1)
+        confidence = probabilities[np.arange(len(best)), best]
+        return [{"role": self.roles[b], "confidence": round(float(c), 3)} if c >= self.threshold
+                else {"role": None, "confidence": 0.0} for b, c in zip(best, confidence)]
+
+    def fit(self, rows, labels, epochs=500, learning_rate=0.5, l2=0.01):
+        """Full-batch gradient descent on one-vs-rest log loss, starting from the current weights.
+
+        labels holds each row's role name or None. L2 pulls towards the starting weights, so a handful
+        of labeled pages adjusts the defaults rather than replacing them.
+        """
+        matrix = self.matrix(rows)
+        targets = np.array([[float(label == role) for role in self.roles] for label in labels])
+        # Positives are rare (one per role per page); weight them up to balance the loss.
+        positive = targets.sum(axis=0)
+        sample_weight = np.where(targets == 1, (len(targets) - positive) / np.maximum(positive, 1), 1.0)
+        prior_weights, prior_bias = self.weights.copy(), self.bias.copy()
+        for _ in range(epochs):
+            error = (self.probabilities(matrix) - targets) * sample_weight / len(matrix)
+            self.weights -= learning_rate * (matrix.T @ error + l2 * (self.weights - prior_weights))
+            self.bias -= learning_rate * (error.sum(axis=0) + l2 * (self.bias - prior_bias))
+        return self
+
+def load_role_model():
+    """The model discovery should score roles with, or None for the rule-based scorer."""
+    if ROLE_SCORER != "model":
+        return None
+    if np is None:
+        logger.info("NumPy is not installed; scoring candidate roles with the rules")
+        return None
+    if os.path.exists(ROLE_WEIGHTS):
+        return RoleModel.load(ROLE_WEIGHTS)
+    return RoleModel.default()
+
+_TAG = re.compile(r"^[a-zA-Z][\w-]*")
+_PART = re.compile(r"""([#.])((?:\\.|[^.#\[\\])+)|\[([\w-]+)(?:=["']?([^"'\]]*)["']?)?\]""")
+
+def selector_matches(selector, tag, attributes):
+    """Whether an element matches the last compound of a simple CSS selector (tag, #id, .class, [attr=v])."""
+    compound = re.split(r"\s*[\s>+~]\s*", selector.strip())[-1]
+    tag_match = _TAG.match(compound)
+    if tag_match and tag_match.group(0).lower() != tag:
+        return False
+    rest, position = compound[tag_match.end() if tag_match else 0:], 0
+    if not rest and not tag_match:
+        return False
+    for part in _PART.finditer(rest):
+        if part.start() != position:
+            return False
+        position = part.end()
+        kind, name, attribute, value = part.groups()
+        name = re.sub(r"\\(.)", r"\1", name) if name else name
+        if kind == "#" and attributes.get("id") != name:
+            return False
+        if kind == "." and name not in attributes.get("class", []):
+            return False
+        if attribute and (attribute not in attributes or (value and attributes[attribute] != value)):
+            return False
+    return position == len(rest)
+
+def page_labels(labels_json):
+    """role -> selector from a labeled page (explicit "labels", else the agent suggestions)."""
+    if labels_json.get("labels"):
+        return {role: selector for role, selector in labels_json["labels"].items() if selector}
+    from .agent_analyzer import _parse_suggestions
+    suggestions = labels_json.get("agent_suggestions") or {}
+    parsed = suggestions.get("parsed")
+    if parsed is None and suggestions.get("raw_response"):
+        parsed = _parse_suggestions(suggestions["raw_response"], "labels")["parsed"]
+    return {role: (parsed.get(role) or {}).get("selector") for role in ROLES
+            if isinstance(parsed, dict) and isinstance(parsed.get(role), dict) and parsed[role].get("selector")}
+
+class _FeatureRecorder:
+    """Stands in for a RoleModel in ElementCollector to capture every element's features."""
+
+    def __init__(self):
+        self.rows = []
+
+    def features(self, tag, attributes, *rest):
+        row = RoleModel.features(tag, attributes, *rest)
+        self.rows.append((tag, attributes, row))
+        return row
+
+    def predict(self, rows):
+        return [{"role": None, "confidence": 0.0} for _ in rows]
+
+def labeled_rows(spec):
+    """Feature rows and role labels for one LABELS.json[:PAGE.html] spec."""
+    from .element_parser import ElementCollector
+    labels_path, _, html_path = spec.partition(":")
+    with open(labels_path, encoding="utf-8") as f:
+        labels_json = json.load(f)
+    html_path = html_path or labels_json.get("html_file")
+    labels = page_labels(labels_json)
+    if not labels or not html_path:
+        logger.warning(f"{labels_path}: no role labels{'' if html_path else ' and no HTML page'}; skipping")
+        return [], []
+
+    recorder = _FeatureRecorder()
+    collector = ElementCollector(recorder)
+    with open(html_path, encoding="utf-8") as f:
+        collector.feed(f.read())
+    collector.close()
+    rows, targets = [], []
+    for tag, attributes, row in recorder.rows:
+        rows.append(row)
+        targets.append(next((role for role, selector in labels.items()
+                             if selector_matches(selector, tag, attributes)), None))
+    logger.info(f"{labels_path}: {len(rows)} elements, {sum(t is not None for t in targets)} labeled")
+    return rows, targets
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit or apply the candidate-role model.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    fit = sub.add_parser("fit", help="Learn weights from labeled pages")
+    fit.add_argument("pages", nargs="+", help="LABELS.json[:PAGE.html]")
+    fit.add_argument("--output", default=ROLE_WEIGHTS)
+    fit.add_argument("--epochs", type=int, default=500)
+    score = sub.add_parser("score", help="Print the roles found on a saved page")
+    score.add_argument("html")
+    args = parser.parse_args()
+
+    if args.command == "score":
+        from .element_parser import parse_elements
+        with open(args.html, encoding="utf-8") as f:
+            for element in parse_elements(f.read(), role_model=load_role_model() or RoleModel.default()):
+                if element["candidate_role"]["role"]:
+                    print(f"{element['candidate_role']['role']:16} {element['candidate_role']['confidence']:.3f} "
+                          f"{element['selector']}")
+        return
+
+    rows, targets = [], []
+    for spec in args.pages:
+        page_rows, page_targets = labeled_rows(spec)
+        rows += page_rows
+        targets += page_targets
+    if not any(t is not None for t in targets):
+        print("No labeled elements found; weights unchanged.")
+        sys.exit(1)
+    model = (RoleModel.load(args.output) if os.path.exists(args.output) else RoleModel.default())
+    model.fit(rows, targets, epochs=args.epochs)
+    predicted = [p["role"] for p in model.predict(rows)]
+    for role in ROLES:
+        hits = sum(p == role and t == role for p, t in zip(predicted, targets))
+        print(f"{role}: {sum(t == role for t in targets)} labeled, {sum(p == role for p in predicted)} predicted, "
+              f"{hits} correct")
+    model.save(args.output, {"trained_on": args.pages, "elements": len(rows)})
+    print(f"Saved weights to {args.output}")
+
+if __name__ == "__main__":
+    main()
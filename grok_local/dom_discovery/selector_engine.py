@@ -0,0 +1,261 @@
+# grok_local/dom_discovery/selector_engine.py
+"""Unique, robust CSS selectors for parsed elements.
+
+SelectorIndex records every tag of a page (name, selector-relevant attributes, parent, position among
+same-name siblings) and indexes the simple selectors each tag matches, so "how many elements does this
+match" is a dict lookup. For an element it tries simple selectors from the most stable attribute down
+(data-testid, aria-label, name, role, id, classes, tag) and returns the first that matches exactly one
+element; failing that, the shortest path from the nearest uniquely selectable ancestor. Every selector
+comes with a robustness score between 0 and 1: how likely it is to survive a site update.
+
+The tree follows the same html.parser rules as element_parser, which can differ from a browser's DOM
+on malformed markup; attribute selectors are preferred partly because they do not depend on structure.
+"""
+import re
+import hashlib
+from bisect import bisect_right
+from .element_parser import ElementCollector
+
+# Attribute -> robustness of a selector on it; order is preference order among equal scores.
+STABLE_ATTRIBUTES = {
+    "data-testid": 1.0,
+    "data-test": 0.95,
+    "data-qa": 0.95,
+    "aria-label": 0.85,
+    "name": 0.8,
+    "placeholder": 0.7,
+    "role": 0.6,
+    "type": 0.4,
+}
+ID_SCORE = 0.9
+CLASS_SCORE = 0.5
+TAG_SCORE = 0.3
+VOLATILE_SCORE = 0.15     # Ids and classes that look generated (CSS-in-JS hashes, counters)
+PATH_FACTOR = 0.9         # An anchored path is a bit less robust than its weakest part
+POSITION_SCORE = 0.1      # :nth-of-type steps break whenever a sibling is added
+MAX_ATTRIBUTE_VALUE = 100  # Longer values (generated labels, blobs) are not used in selectors
+
+_VOLATILE_SEGMENT = re.compile(r"^(?=[^-_]*\d)(?=[^-_]*[a-z])[a-z0-9]{5,}$|\d{4,}", re.I)
+_IDENTIFIER = re.compile(r"^-?[_a-zA-Z][-_a-zA-Z0-9]*$")
+
+def looks_generated(token):
+    """True for ids/classes like "css-175oi2r" or "item-20240101" that change between builds."""
+    return any(_VOLATILE_SEGMENT.search(segment) for segment in re.split(r"[-_]", token) if segment)
+
+def css_identifier(value):
+    """value escaped for use after # or . in a selector."""
+    if _IDENTIFIER.match(value):
+        return value
+    escaped = "".join(c if c.isalnum() or c in "-_" or ord(c) > 127 else "\\" + c for c in value)
+    return "\\3" + escaped[0] + " " + escaped[1:] if escaped[0].isdigit() else escaped
+
+def css_string(value):
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def selector_attributes(attributes):
+    """The attributes an index keeps: id, class and STABLE_ATTRIBUTES."""
+    return {key: value for key, value in attributes.items() if key in ("id", "class") or key in STABLE_ATTRIBUTES}
+
+def _structure(tag, attributes):
+    attributes = dict(attributes)
+    if attributes.get("id") and looks_generated(attributes["id"]):
+        del attributes["id"]
+    attributes["class"] = [cls for cls in attributes.get("class", []) if not looks_generated(cls)]
+    return f"<{tag}{sorted(attributes.items())}"
+
+class StructureHash:
+    """SelectorIndex.fingerprint without the index, for pages too big to index.
+
+    Fed open_node/close_node like an index (see element_stream), it keeps only the ids of the open tags,
+    so its memory depends on the nesting depth, not on the page size.
+    """
+
+    def __init__(self):
+        self._digest = hashlib.sha256()
+        self._open = []
+        self._count = 0
+
+    def open_node(self, frame):
+        self.add(frame.name, selector_attributes(frame.attributes))
+
+    def add(self, tag, attributes):
+        """Hash a tag (with attributes as selector_attributes returns them) opened inside the innermost open one."""
+        parent = self._open[-1] if self._open else None
+        self._digest.update(f"{parent}{_structure(tag, attributes)}\n".encode("utf-8"))
+        self._open.append(self._count)
+        self._count += 1
+
+    def close_node(self):
+        self._open.pop()
+
+    def fingerprint(self):
+        return self._digest.hexdigest()
+
+class _Node:
+    __slots__ = ("tag", "attributes", "parent", "position", "order", "children", "last")
+
+    def __init__(self, tag, attributes, parent, position, order):
+        self.tag = tag
+        self.attributes = attributes  # Only id, class and STABLE_ATTRIBUTES
+        self.parent = parent          # Index in SelectorIndex.nodes, or None at the top level
+        self.position = position      # 1-based :nth-of-type position
+        self.order = order            # Position among candidate elements (see ElementCollector), or None
+        self.children = {}            # Tag name -> number of children with that name
+        self.last = None              # Index of the last node in its subtree (nodes are in document order)
+
+class SelectorIndex(ElementCollector):
+    """Feed it a page (feed/close, or SelectorIndex.build) and ask for selectors.
+
+    Another collector's parse can build it instead, by calling open_node and close_node from its own
+    _push and _pop (as element_stream does). Either way it keeps a small record per tag of the page.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.nodes = []
+        self.by_order = {}        # Candidate position -> node index
+        self._keys = {}           # Simple selector -> node indexes it matches, in document order
+        self._node_stack = []
+        self._orders = 0
+        self._top_level = {}
+        self._hash = StructureHash()
+
+    @classmethod
+    def build(cls, html):
+        index = cls()
+        index.feed(html)
+        index.close()
+        return index
+
+    # ElementCollector hooks: only the tree is kept, not the elements.
+    def _reserve(self):
+        self._orders += 1
+        return self._orders - 1
+
+    def _emit(self, order, element):
+        pass
+
+    def _push(self, tag, attrs):
+        super()._push(tag, attrs)
+        self.open_node(self._stack[-1])
+
+    def _pop(self):
+        super()._pop()
+        self.close_node()
+
+    def open_node(self, frame):
+        """Record the tag just opened (an ElementCollector frame) as a child of the innermost open one."""
+        tag = frame.name
+        attributes = selector_attributes(frame.attributes)
+        self._hash.add(tag, attributes)
+        parent = self._node_stack[-1] if self._node_stack else None
+        siblings = self.nodes[parent].children if parent is not None else self._top_level
+        siblings[tag] = siblings.get(tag, 0) + 1
+        node_id = len(self.nodes)
+        self.nodes.append(_Node(tag, attributes, parent, siblings[tag], frame.order))
+        if frame.order is not None:
+            self.by_order[frame.order] = node_id
+        for key, _ in self._simple_selectors(self.nodes[-1]):
+            self._keys.setdefault(key, []).append(node_id)
+        self._node_stack.append(node_id)
+
+    def close_node(self):
+        self.nodes[self._node_stack.pop()].last = len(self.nodes) - 1
+        self._hash.close_node()
+
+    def _simple_selectors(self, node):
+        """(selector, robustness) for each indexed simple selector the node matches."""
+        tag, attributes = node.tag, node.attributes
+        selectors = []
+        for name, score in STABLE_ATTRIBUTES.items():
+            value = attributes.get(name)
+            if value and len(value) <= MAX_ATTRIBUTE_VALUE:
+                selectors.append((f"{tag}[{name}={css_string(value)}]", score))
+        if attributes.get("id"):
+            score = VOLATILE_SCORE if looks_generated(attributes["id"]) else ID_SCORE
+            selectors.append(("#" + css_identifier(attributes["id"]), score))
+        for cls in attributes.get("class", []):
+            score = VOLATILE_SCORE if looks_generated(cls) else CLASS_SCORE
+            selectors.append((f"{tag}.{css_identifier(cls)}", score))
+        selectors.append((tag, TAG_SCORE))
+        return selectors
+
+    def count(self, selector):
+        """Elements matching one of the page's simple selectors (as produced by this index)."""
+        return len(self._keys.get(selector, ()))
+
+    def is_unique(self, selector):
+        return self.count(selector) == 1
+
+    def _ranked(self, node):
+        # Stable sort: preference order breaks ties between equal scores.
+        return sorted(self._simple_selectors(node), key=lambda item: -item[1])
+
+    def _unique_simple(self, node_id):
+        for selector, score in self._ranked(self.nodes[node_id]):
+            if self.is_unique(selector):
+                return selector, score
+        return None
+
+    def count_below(self, selector, ancestor_id):
+        """Elements matching selector inside nodes[ancestor_id]: a range count, as subtrees are contiguous."""
+        matches = self._keys.get(selector, [])
+        return bisect_right(matches, self.nodes[ancestor_id].last) - bisect_right(matches, ancestor_id)
+
+    def selector_for(self, node_id):
+        """(selector, robustness) matching only nodes[node_id]."""
+        unique = self._unique_simple(node_id)
+        if unique and unique[1] >= CLASS_SCORE:
+            return unique
+        path = self._anchored_path(node_id)
+        return unique if unique and unique[1] >= path[1] else path
+
+    def _anchored_path(self, node_id):
+        ranked = self._ranked(self.nodes[node_id])
+        # Nearest ancestor that a simple selector pins down, then the most robust of the node's own
+        # selectors that is unique below it; positional steps if none is.
+        steps, ancestor = [], node_id
+        while self.nodes[ancestor].parent is not None:
+            child, ancestor = ancestor, self.nodes[ancestor].parent
+            steps.append(child)
+            anchor = self._unique_simple(ancestor)
+            if not anchor:
+                continue
+            for selector, score in ranked:
+                if self.count_below(selector, ancestor) == 1:
+                    return f"{anchor[0]} {selector}", round(min(anchor[1], score) * PATH_FACTOR, 3)
+            return self._positional(anchor[0], steps), POSITION_SCORE
+        steps.append(ancestor)
+        return self._positional(None, steps), POSITION_SCORE
+
+    def _positional(self, anchor, steps):
+        parts = [anchor] if anchor else []
+        for i, node_id in enumerate(reversed(steps)):
+            node = self.nodes[node_id]
+            if i or anchor:
+                parts.append(">")
+            parts.append(f"{node.tag}:nth-of-type({node.position})")
+        return " ".join(parts)
+
+    def fingerprint(self):
+        """Hash of the page structure: tags, nesting and the selector-relevant attributes.
+
+        Text, scripts and every other attribute (nonces, tokens, asset URLs) are left out, as are ids and
+        classes that look generated, so rebuilding or re-rendering the same page gives the same hash.
+        """
+        return self._hash.fingerprint()
+
+    @staticmethod
+    def structure(node):
+        """A node's tag and selector-relevant attributes, minus generated ids and classes (see fingerprint)."""
+        return _structure(node.tag, node.attributes)
+
+    def selector_for_element(self, order):
+        """Selector for the candidate element at this position (the order iter_elements yields)."""
+        return self.selector_for(self.by_order[order])
+
+def unique_selectors(html, orders=None):
+    """{candidate position: (selector, robustness)} for a page, for all candidates or just orders."""
+    index = SelectorIndex.build(html)
+    orders = index.by_order if orders is None else orders
+    return {order: index.selector_for_element(order) for order in orders}
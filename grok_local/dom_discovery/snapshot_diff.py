@@ -0,0 +1,276 @@
+# grok_local/dom_discovery/snapshot_diff.py
+"""Selector drift checks: what changed in a page's structure since the last look, and what it broke.
+
+A snapshot is a compact record of a page's tree: per element its parent, tag, :nth-of-type position, a
+hash of its structure (SelectorIndex.structure: tag and selector-relevant attributes, no text) and a
+hash of its whole subtree. diff_snapshots walks both trees top-down and only descends where subtree
+hashes differ, so an unchanged page costs one comparison and a changed one only its changed regions.
+
+check_page diffs a page against the stored snapshot for its URL and re-runs candidate extraction on the
+changed regions only, then counts the selectors our adapters rely on (KNOWN_SELECTORS): one that matched
+before and matches nothing now is broken, and the best candidate for its role in the changed regions is
+offered as a replacement (from the whole page, if it did not change). The snapshot keeps each selector's
+last good count, so a broken selector stays broken on every later check until it matches again. No model
+is asked; discover_dom (or bulk) does the full pass when needed.
+
+    python -m grok_local.dom_discovery.snapshot_diff https://grok.com --browser --interval 600
+    python -m grok_local.dom_discovery.snapshot_diff grok_local/html/grok_chat.html --url https://grok.com
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from bisect import bisect_right
+from difflib import SequenceMatcher
+from urllib.parse import urlparse
+from grok_local.config import logger
+from .html_fetcher import fetch_static, fetch_dynamic
+from .element_stream import extract_elements
+from .selector_engine import SelectorIndex
+from .discovery_cache import DISCOVERY_CACHE_DIR
+from .role_model import load_role_model, selector_matches
+
+SNAPSHOT_DIR = os.path.join(DISCOVERY_CACHE_DIR, "snapshots")  # Next to the cache, as discover_dom writes them
+HASH_LENGTH = 12
+# Selectors hardcoded in the adapters, by URL prefix (host + path; longest wins) -> selector -> role.
+# Only tags, ids, classes and SelectorIndex's stable attributes can be matched.
+KNOWN_SELECTORS = {
+    "grok.com": {  # ai_adapters.grok_browser_ai.GrokBrowserAI
+        ".question-input": "prompt_input",
+        ".submit-btn": "submit_button",
+        ".response-output": "response_output",
+    },
+    "x.com/i/grok": {  # x_poller.ask_grok
+        ".grok-input-field": "prompt_input",
+        ".grok-response": "response_output",
+    },
+}
+
+# Snapshot node fields
+PARENT, TAG, POSITION, OWN, SUBTREE = range(5)
+
+def _hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:HASH_LENGTH]
+
+def known_selectors(url, known=None):
+    """selector -> role for the page at url."""
+    known = KNOWN_SELECTORS if known is None else known
+    parsed = urlparse(url if "//" in url else "//" + url)
+    page = (parsed.netloc.lower().removeprefix("www.") + parsed.path).rstrip("/")
+    matches = [prefix for prefix in known if page == prefix or page.startswith(prefix.rstrip("/") + "/")]
+    return dict(known[max(matches, key=len)]) if matches else {}
+
+def _children(nodes):
+    children, roots = [[] for _ in nodes], []
+    for i, node in enumerate(nodes):
+        (roots if node[PARENT] is None else children[node[PARENT]]).append(i)
+    return children, roots
+
+def take_snapshot(url, index, selectors=None):
+    """Snapshot of a built SelectorIndex, with match counts for selectors (default: the page's known ones)."""
+    selectors = known_selectors(url) if selectors is None else selectors
+    nodes = [[node.parent, node.tag, node.position, _hash(index.structure(node)), None] for node in index.nodes]
+    children, roots = _children(nodes)
+    for i in reversed(range(len(nodes))):  # Children come after their parent
+        nodes[i][SUBTREE] = _hash(nodes[i][OWN] + "(" + ",".join(nodes[c][SUBTREE] for c in children[i]) + ")")
+    counts = {selector: 0 for selector in selectors}
+    for node in index.nodes:
+        for selector in counts:
+            counts[selector] += selector_matches(selector, node.tag, node.attributes)
+    return {"url": url, "fingerprint": _hash(",".join(nodes[r][SUBTREE] for r in roots)), "created": time.time(),
+            "nodes": nodes, "selectors": counts}
+
+def node_path(nodes, i):
+    """Positional CSS path of snapshot node i, e.g. "html:nth-of-type(1) > body:nth-of-type(1)"."""
+    steps = []
+    while i is not None:
+        steps.append(f"{nodes[i][TAG]}:nth-of-type({nodes[i][POSITION]})")
+        i = nodes[i][PARENT]
+    return " > ".join(reversed(steps))
+
+def _pairs(old_ids, new_ids, old_nodes, new_nodes, field):
+    """Matching runs between two sibling lists by a node field: (old ids, new ids, equal?) blocks."""
+    matcher = SequenceMatcher(None, [old_nodes[i][field] for i in old_ids], [new_nodes[j][field] for j in new_ids],
+                              autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        yield old_ids[i1:i2], new_ids[j1:j2], op == "equal"
+
+def diff_snapshots(old, new):
+    """Changes from old to new snapshot: {"change", "path", "node"}, in no particular order.
+
+    "added" and "changed" (same tag, different structure) name new-tree nodes; "removed" has the old
+    node's path and, as node, its parent in the new tree (None at the top level). A subtree that moved
+    among its siblings shows up as removed and added.
+    """
+    old_nodes, new_nodes = old["nodes"], new["nodes"]
+    old_children, old_roots = _children(old_nodes)
+    new_children, new_roots = _children(new_nodes)
+    changes = []
+    work = [(old_roots, new_roots, None)]
+    while work:
+        old_ids, new_ids, parent = work.pop()
+        for olds, news, equal in _pairs(old_ids, new_ids, old_nodes, new_nodes, SUBTREE):
+            if equal:
+                continue
+            # Same structure, different subtree: look inside. Same tag: the element itself changed too.
+            for same_olds, same_news, same in _pairs(olds, news, old_nodes, new_nodes, OWN):
+                if same:
+                    work.extend((old_children[i], new_children[j], j) for i, j in zip(same_olds, same_news))
+                    continue
+                for tag_olds, tag_news, same_tag in _pairs(same_olds, same_news, old_nodes, new_nodes, TAG):
+                    if same_tag:
+                        for i, j in zip(tag_olds, tag_news):
+                            changes.append({"change": "changed", "path": node_path(new_nodes, j), "node": j})
+                            work.append((old_children[i], new_children[j], j))
+                        continue
+                    changes.extend({"change": "removed", "path": node_path(old_nodes, i), "node": parent}
+                                   for i in tag_olds)
+                    changes.extend({"change": "added", "path": node_path(new_nodes, j), "node": j} for j in tag_news)
+    return changes
+
+def _regions(index, changes):
+    """Merged (first, last) node ranges of the new tree whose candidates need rediscovery."""
+    ranges = []
+    for change in changes:
+        node = change["node"]
+        if node is None:
+            continue
+        # An added subtree is new throughout; elsewhere only the element itself (its text or attributes) changed.
+        ranges.append((node, index.nodes[node].last if change["change"] == "added" else node))
+    merged = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+class SnapshotStore:
+    """The latest snapshot per URL, one JSON file each (<sha1 of url>.json)."""
+
+    def __init__(self, root=SNAPSHOT_DIR):
+        self.root = root
+
+    def _path(self, url):
+        return os.path.join(self.root, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url):
+        try:
+            with open(self._path(url), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, snapshot):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = self._path(snapshot["url"]) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp, self._path(snapshot["url"]))
+
+def _status(before, after):
+    if after == 1 or (after and before != 1):
+        return "ok"
+    if after:
+        return "ambiguous"  # Matched one element, now several
+    return "broken" if before else "missing"
+
+def check_page(url, html, store=None, known=None, role_model=None):
+    """Diff html against the stored snapshot for url, rediscover the changed regions, store the new snapshot.
+
+    Returns {"url", "fingerprint", "previous" (fingerprint, or None on the first check), "changes",
+    "elements" (candidates in the changed regions; the whole page on the first check, or when the page
+    is unchanged but a selector is not ok), "selectors" (selector -> {"role", "before", "after", "status",
+    "replacement"}), "seconds"}. before is the selector's last good count. status is "ok", "broken"
+    (matched before, nothing now), "ambiguous" (one match before, several now) or "missing" (matches
+    nothing and never did, or there is no earlier snapshot).
+    """
+    start = time.perf_counter()
+    store = SnapshotStore() if store is None else store
+    selectors = known_selectors(url, known)
+    index = SelectorIndex.build(html)
+    snapshot = take_snapshot(url, index, selectors)
+    previous = store.get(url)
+    # Last good count per selector; snapshots without one (from discover_dom) count as all good.
+    last_good = (previous.get("last_good") or previous["selectors"]) if previous else {}
+    statuses = {selector: _status(last_good.get(selector, 0), snapshot["selectors"][selector])
+                for selector in selectors}
+    if previous is None:
+        changes, keep = [], None
+    elif previous["fingerprint"] == snapshot["fingerprint"]:
+        # Nothing to rediscover, unless a selector needs a replacement: then look at the whole page.
+        changes = []
+        keep = None if any(status != "ok" for status in statuses.values()) else (lambda order: False)
+    else:
+        changes = diff_snapshots(previous, snapshot)
+        regions = _regions(index, changes)
+        starts = [first for first, _ in regions]
+
+        def keep(order):
+            node = index.by_order[order]
+            i = bisect_right(starts, node) - 1
+            return i >= 0 and node <= regions[i][1]
+
+    elements = []
+    if keep is None or changes:
+        role_model = load_role_model() if role_model is None else role_model
+        elements = extract_elements(html, index=SelectorIndex(), role_model=role_model, keep=keep)
+
+    report = {}
+    snapshot["last_good"] = {}
+    for selector, role in selectors.items():
+        before, after, status = last_good.get(selector, 0), snapshot["selectors"][selector], statuses[selector]
+        snapshot["last_good"][selector] = after if status == "ok" else before
+        replacement = None
+        if status != "ok":
+            candidates = [e for e in elements if e["candidate_role"]["role"] == role]
+            if candidates:
+                best = max(candidates, key=lambda e: (e["candidate_role"]["confidence"], e.get("robustness", 0)))
+                replacement = {"selector": best["selector"], "robustness": best.get("robustness"),
+                               "confidence": best["candidate_role"]["confidence"]}
+        report[selector] = {"role": role, "before": before, "after": after, "status": status,
+                            "replacement": replacement}
+        if status == "broken":
+            logger.warning(f"Selector {selector} ({role}) no longer matches on {url}"
+                           + (f"; candidate: {replacement['selector']}" if replacement else ""))
+    store.save(snapshot)
+    seconds = time.perf_counter() - start
+    logger.info(f"Checked {url}: {len(changes)} structural changes, {len(elements)} candidates rediscovered "
+                f"in {seconds:.2f} seconds")
+    return {"url": url, "fingerprint": snapshot["fingerprint"], "previous": previous["fingerprint"] if previous else None,
+            "changes": changes, "elements": elements, "selectors": report, "seconds": round(seconds, 3)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m grok_local.dom_discovery.snapshot_diff",
+                                     description="Report structural changes and broken known selectors for a page.")
+    parser.add_argument("page", help="URL to fetch, or a saved HTML file")
+    parser.add_argument("--url", help="URL a saved file stands for (default: the file's own path)")
+    parser.add_argument("--browser", action="store_true", help="Fetch with a browser instead of requests")
+    parser.add_argument("--interval", type=float, help="Check again every INTERVAL seconds")
+    parser.add_argument("--store", default=SNAPSHOT_DIR, help="Snapshot directory")
+    args = parser.parse_args(argv)
+    store = SnapshotStore(args.store)
+    while True:
+        if os.path.isfile(args.page):
+            with open(args.page, encoding="utf-8", errors="replace") as f:
+                html = f.read()
+            url = args.url or os.path.abspath(args.page)
+        else:
+            html = fetch_dynamic(args.page, 3) if args.browser else fetch_static(args.page)
+            url = args.url or args.page
+        if html:
+            result = check_page(url, html, store)
+            result["elements"] = len(result["elements"])
+            print(json.dumps(result, indent=2))
+            broken = [s for s, r in result["selectors"].items() if r["status"] != "ok"]
+        else:
+            logger.error(f"Could not load {args.page}")
+            broken = None
+        if not args.interval:
+            return 1 if broken or broken is None else 0
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -40,9 +40,11 @@ class Orchestrator:
         with open(script_path, "w") as f:
             f.write(code)
         if "fix" in initial_task.lower():
+            iterations = 0
             for _ in range(max_iterations):
                 debug_result = debug_script(script_path, debug)
                 if "Error:" in debug_result:
+                    iterations += 1
                     task = Task(description=f"Fix code: {code}", input_data=debug_result, agent_role="debugger")
                     code = self.agents["debugger"].run(task, self.memory)
                     code = code.strip().replace("", "").strip()
@@ -50,5 +52,7 @@ class Orchestrator:
                         f.write(code)
                 else:
                     break
+            log_conversation(f"Orchestrator: Debug loop finished after {iterations} iteration(s)",
+                             event="debug_loop", iterations=iterations, model=effective_model)
         debug_result = debug_script(script_path, debug)
         return code, debug_result
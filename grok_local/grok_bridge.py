@@ -1,11 +1,86 @@
+import sys
 import requests
 import time
-from flask import Flask, request, jsonify
+import json
+import threading
+from flask import Flask, Response, request, jsonify, stream_with_context
 from grok_local.tools import log_conversation
+from grok_local.bridge_store import RequestStore
+from grok_local.bridge_dispatch import Dispatcher, parse_backends, BRIDGE_BACKENDS, DEFAULT_PRIORITY
 
 app = Flask(__name__)
-BRIDGE_URL = "http://0.0.0.0:5000"
-responses = {}  # Store responses for simplicity in testing
+PORT = 5000
+BRIDGE_URL = f"http://0.0.0.0:{PORT}"
+MAX_WAIT = 60  # Upper bound for a single /wait-response or /stream-response call
+HEARTBEAT = 15  # Seconds between SSE keep-alive comments
+STORE_POLL = 0.1  # How often waiters re-read the store for answers posted to another bridge process
+EVICT_INTERVAL = 60
+store = None  # RequestStore, opened on first use (see get_store) so importing this module touches no files
+_store_lock = threading.Lock()
+# request_id -> [Condition, waiter count], only while a waiter in this process is blocked on it
+_conditions = {}
+_conditions_lock = threading.Lock()
+_last_evict = 0.0
+dispatcher = None  # Set by start_dispatcher() when GROK_BRIDGE_BACKENDS is configured
+
+def get_store():
+    global store
+    if store is None:
+        with _store_lock:
+            if store is None:
+                store = RequestStore()
+    return store
+
+def _acquire_condition(request_id):
+    with _conditions_lock:
+        entry = _conditions.setdefault(request_id, [threading.Condition(), 0])
+        entry[1] += 1
+        return entry[0]
+
+def _release_condition(request_id):
+    with _conditions_lock:
+        entry = _conditions.get(request_id)
+        if entry:
+            entry[1] -= 1
+            if not entry[1]:
+                del _conditions[request_id]
+
+def _notify(request_id):
+    """Wake this process's waiters on request_id, if any; call after the store write."""
+    with _conditions_lock:
+        entry = _conditions.get(request_id)
+    if entry:
+        with entry[0]:
+            entry[0].notify_all()
+
+def _evict_expired():
+    global _last_evict
+    if time.time() - _last_evict >= EVICT_INTERVAL:
+        _last_evict = time.time()
+        for request_id in get_store().expire():
+            _notify(request_id)
+        get_store().evict()
+
+def _on_dispatched(request_id, response):
+    _notify(request_id)
+    entry = get_store().get(request_id)
+    log_conversation(f"Response received for {request_id}: {entry['response']}", event="bridge_wait",
+                     duration=entry["completed_at"] - entry["created_at"], request_id=request_id)
+
+def _on_chunk(request_id, delta):
+    _notify(request_id)
+
+def start_dispatcher(backends=BRIDGE_BACKENDS):
+    global dispatcher
+    if backends and dispatcher is None:
+        dispatcher = Dispatcher(get_store(), parse_backends(backends), on_complete=_on_dispatched, on_chunk=_on_chunk).start()
+    return dispatcher
+
+def _timeout_arg(default=25):
+    try:
+        return max(0.0, min(float(request.args.get('timeout', default)), MAX_WAIT))
+    except ValueError:
+        return default
 
 @app.route('/ask', methods=['POST'])
 def ask_grok():
@@ -13,34 +88,132 @@ def ask_grok():
     question = data.get('question')
     if not question:
         return jsonify({"error": "No question provided"}), 400
-    
-    request_id = f"{time.time():.0f}-{hash(question) % 10000:04d}"
-    responses[request_id] = {"status": "pending", "question": question}
-    log_conversation(f"Posted request: {request_id}")
-    return jsonify({"id": request_id, "status": "pending"}), 200
 
-@app.route('/response', methods=['GET'])
+    try:
+        priority = int(data.get('priority', DEFAULT_PRIORITY))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid priority"}), 400
+    _evict_expired()
+    request_id, coalesced = get_store().submit(question)
+    if coalesced:
+        log_conversation(f"Coalesced request: {request_id}")
+    else:
+        log_conversation(f"Posted request: {request_id}")
+        if dispatcher:
+            dispatcher.submit(request_id, question, priority, data.get('backend'))
+    return jsonify({"id": request_id, "status": "pending", "coalesced": coalesced}), 200
+
+@app.route('/response', methods=['GET', 'POST'])
 def post_response():
-    request_id = request.args.get('id')
-    response = request.args.get('response')
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}  # JSON body: no URL length cap on long answers
+        partial = bool(data.get('partial'))
+    else:
+        data = request.args
+        partial = data.get('partial', '').lower() in ('1', 'true', 'yes')
+    request_id, response = data.get('id'), data.get('response')
     if not request_id or not response:
         return jsonify({"error": "Missing id or response"}), 400
-    if request_id not in responses:
+    entry = get_store().get(request_id)
+    if entry is None:
         return jsonify({"error": "Invalid request ID"}), 404
-    
-    responses[request_id] = {"status": "completed", "response": response}
-    log_conversation(f"Response received for {request_id}: {response}")
+
+    if partial:
+        answered = get_store().add_chunk(request_id, response)  # Dropped once the request is answered
+    else:
+        answered = get_store().complete(request_id, response, only_pending=True)  # First answer wins
+    _notify(request_id)
+    if not answered:
+        return jsonify({"id": request_id, "status": "Already answered"}), 409
+    if partial:
+        return jsonify({"id": request_id, "status": "Partial response received"}), 200
+    log_conversation(f"Response received for {request_id}: {response}", event="bridge_wait",
+                     duration=time.time() - entry["created_at"], request_id=request_id)
     return jsonify({"id": request_id, "response": response, "status": "Response received"}), 200
 
+@app.route('/wait-response', methods=['GET'])
+def wait_response():
+    """Long-poll: block until the response for id arrives or timeout (seconds) passes."""
+    request_id = request.args.get('id')
+    if not request_id or get_store().get(request_id) is None:
+        return jsonify({"error": "Invalid request ID"}), 404
+    entry = _wait_for_change(request_id, lambda e: e["status"] != "pending", _timeout_arg())
+    if entry is not None and entry["status"] == "expired":
+        return jsonify({"id": request_id, "status": "expired"}), 410
+    if entry is None or entry["status"] != "completed":
+        return jsonify({"id": request_id, "status": "pending"}), 202
+    return jsonify({"id": request_id, "response": entry["response"], "status": "completed"}), 200
+
+@app.route('/stream-response', methods=['GET'])
+def stream_response():
+    """Server-sent events: 'partial' per chunk posted with partial=1, then 'done' (or 'timeout')."""
+    request_id = request.args.get('id')
+    if not request_id or get_store().get(request_id) is None:
+        return jsonify({"error": "Invalid request ID"}), 404
+    events = _sse_events(request_id, _timeout_arg(MAX_WAIT))
+    return Response(stream_with_context(events), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def _wait_for_change(request_id, ready, timeout):
+    """Wait until ready(entry) holds: woken at once by this process, or within STORE_POLL for other processes."""
+    cond = _acquire_condition(request_id)
+    deadline = time.time() + timeout
+    try:
+        while True:
+            with cond:
+                entry = get_store().get(request_id)
+                remaining = deadline - time.time()
+                if entry is None or ready(entry) or remaining <= 0:
+                    return entry
+                cond.wait(min(STORE_POLL, remaining))
+    finally:
+        _release_condition(request_id)
+
+def _sse_events(request_id, timeout):
+    deadline = time.time() + timeout
+    sent = 0
+    while True:
+        entry = _wait_for_change(request_id, lambda e: len(e["chunks"]) > sent or e["status"] != "pending",
+                                 max(0.0, min(HEARTBEAT, deadline - time.time())))
+        if entry is None:
+            yield f"event: timeout\ndata: {json.dumps({'id': request_id})}\n\n"
+            return
+        chunks = entry["chunks"][sent:]
+        for chunk in chunks:
+            yield f"event: partial\ndata: {json.dumps({'id': request_id, 'text': chunk})}\n\n"
+        sent += len(chunks)
+        if entry["status"] == "completed":
+            yield f"event: done\ndata: {json.dumps({'id': request_id, 'response': entry['response']})}\n\n"
+            return
+        if entry["status"] == "expired" or time.time() >= deadline:
+            yield f"event: timeout\ndata: {json.dumps({'id': request_id, 'expired': entry['status'] == 'expired'})}\n\n"
+            return
+        if not chunks:
+            yield ": keep-alive\n\n"
+
+@app.route('/status', methods=['GET'])
+def status():
+    return jsonify({"store": get_store().counts(), "coalescing": get_store().coalesce_stats(),
+                    "dispatch": dispatcher.snapshot() if dispatcher else None}), 200
+
+def wait_for_response(request_id, timeout=25):
+    """Block until the request completes; returns None on timeout or unknown id."""
+    entry = _wait_for_change(request_id, lambda e: e["status"] != "pending", timeout)
+    if entry is None or entry["status"] != "completed":
+        return None
+    return entry["response"]
+
 def fetch_response(request_id, timeout=25):
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        if request_id in responses and responses[request_id]["status"] == "completed":
-            response = responses[request_id]["response"]
-            log_conversation(f"Fetched response for {request_id}: {response}")
-            return response
-        time.sleep(1)
-    raise TimeoutError(f"No response for {request_id} within {timeout}s")
+    response = wait_for_response(request_id, timeout)
+    if response is None:
+        raise TimeoutError(f"No response for {request_id} within {timeout}s")
+    log_conversation(f"Fetched response for {request_id}: {response}")
+    return response
+
+def main(port=PORT):
+    get_store()
+    start_dispatcher()
+    app.run(host="0.0.0.0", port=port, threaded=True)
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000)
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else PORT)
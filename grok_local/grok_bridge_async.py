@@ -0,0 +1,416 @@
+# grok_local/grok_bridge_async.py
+"""asyncio (aiohttp) bridge: same /ask and /response contract as grok_bridge, but idle waiters cost
+a coroutine instead of a server thread. Run with `python -m grok_local.grok_bridge_async`."""
+import os
+import sys
+import json
+import time
+import signal
+import asyncio
+from collections import OrderedDict
+from aiohttp import web, WSMsgType
+from grok_local.tools import log_conversation
+from grok_local.bridge_store import RequestStore
+from grok_local.bridge_dispatch import Dispatcher, parse_backends, BRIDGE_BACKENDS, DEFAULT_PRIORITY
+
+HOST = "0.0.0.0"
+PORT = 5000
+MAX_PENDING = int(os.getenv("GROK_BRIDGE_MAX_PENDING", 10000))  # Unanswered requests before /ask returns 503
+MAX_WAIT = 60
+HEARTBEAT = 15
+STORE_POLL = 0.1  # Interval for picking up answers written by other bridge processes
+EVICT_INTERVAL = 60
+RESPONDER_BACKLOG = 100  # Pending questions replayed to a responder when it (re)connects
+DISPATCHER = "dispatcher"  # Owner of questions handed to the backend dispatcher
+
+class BridgeState:
+    def __init__(self, store, max_pending=MAX_PENDING):
+        self.store = store
+        self.max_pending = max_pending
+        self.pending = OrderedDict()  # Ids asked through this process with no answer yet -> time asked, oldest first
+        self.conditions = {}  # id -> asyncio.Condition for waiters in this process
+        self.waiters = {}  # id -> number of coroutines currently waiting on it
+        self.waiting = 0
+        self.dispatcher = None
+        self.responders = {}  # Open /ws/responder socket -> {id: question} it was given and has not answered
+        self.owners = {}  # Unanswered id -> the socket (or DISPATCHER) answering it; nobody else may
+        self.tasks = set()  # Sends started where the caller can't await them
+        self.closing = asyncio.Event()
+        self.stopped = asyncio.Event()
+
+    def live_pending(self):
+        """Unanswered requests that have not expired; only these count against max_pending."""
+        cutoff = time.time() - self.store.pending_ttl
+        while self.pending and next(iter(self.pending.values())) < cutoff:
+            self.pending.popitem(last=False)  # Expired; the store watcher marks it so in the store
+        return len(self.pending)
+
+    def condition(self, request_id):
+        cond = self.conditions.get(request_id)
+        if cond is None:
+            cond = self.conditions[request_id] = asyncio.Condition()
+        return cond
+
+    async def notify(self, request_id):
+        cond = self.conditions.get(request_id)
+        if cond is not None:
+            async with cond:
+                cond.notify_all()
+
+    async def get(self, request_id):
+        return await asyncio.to_thread(self.store.get, request_id)
+
+    async def wait_for(self, request_id, ready, timeout, poll=None):
+        """Wait until ready(entry) holds, the timeout passes or the bridge starts shutting down.
+
+        Same-process answers and the store watcher wake waiters through the condition; poll
+        (seconds) additionally re-reads the store, for changes the watcher doesn't track (chunks).
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        cond = self.condition(request_id)
+        self.waiters[request_id] = self.waiters.get(request_id, 0) + 1
+        self.waiting += 1
+        try:
+            async with cond:
+                while True:
+                    entry = await self.get(request_id)
+                    remaining = deadline - loop.time()
+                    if entry is None or ready(entry) or remaining <= 0 or self.closing.is_set():
+                        return entry
+                    try:
+                        await asyncio.wait_for(cond.wait(), min(remaining, poll) if poll else remaining)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            self.waiting -= 1
+            self.waiters[request_id] -= 1
+            if not self.waiters[request_id]:
+                del self.waiters[request_id]
+                self.conditions.pop(request_id, None)
+
+def _timeout_arg(request, default=25):
+    try:
+        return max(0.0, min(float(request.query.get('timeout', default)), MAX_WAIT))
+    except ValueError:
+        return default
+
+async def ask_grok(request):
+    state = request.app["state"]
+    if state.closing.is_set():
+        return web.json_response({"error": "Bridge shutting down"}, status=503)
+    try:
+        data = await request.json()
+    except ValueError:
+        data = {}
+    question = data.get('question')
+    if not question:
+        return web.json_response({"error": "No question provided"}, status=400)
+    try:
+        priority = int(data.get('priority', DEFAULT_PRIORITY))
+    except (TypeError, ValueError):
+        return web.json_response({"error": "Invalid priority"}, status=400)
+    if state.live_pending() >= state.max_pending:
+        return web.json_response({"error": "Bridge busy"}, status=503, headers={"Retry-After": "1"})
+
+    request_id, coalesced = await asyncio.to_thread(state.store.submit, question)
+    if coalesced:
+        log_conversation(f"Coalesced request: {request_id}")
+    else:
+        state.pending[request_id] = time.time()
+        log_conversation(f"Posted request: {request_id}")
+        if state.dispatcher:
+            state.owners[request_id] = DISPATCHER
+            state.dispatcher.submit(request_id, question, priority, data.get('backend'))
+        else:
+            await _offer(state, request_id, question, priority)
+    return web.json_response({"id": request_id, "status": "pending", "coalesced": coalesced})
+
+async def _record_chunk(state, request_id, text):
+    """Append a partial answer; returns False (and drops it) once the request is no longer pending."""
+    if not await asyncio.to_thread(state.store.add_chunk, request_id, text):
+        return False
+    await state.notify(request_id)
+    return True
+
+async def _record_answer(state, request_id, response, entry):
+    """Complete a request; the first answer wins when several responders race. Returns False if too late."""
+    if not await asyncio.to_thread(state.store.complete, request_id, response, True):
+        return False
+    state.pending.pop(request_id, None)
+    await state.notify(request_id)
+    await _answered(state, request_id)
+    log_conversation(f"Response received for {request_id}: {response}", event="bridge_wait",
+                     duration=time.time() - entry["created_at"], request_id=request_id)
+    return True
+
+async def post_response(request):
+    """GET /response?id=&response=[&partial=1], or POST /response with the same fields as JSON (no size cap)."""
+    state = request.app["state"]
+    if request.method == "POST":
+        try:
+            data = await request.json()
+        except ValueError:
+            data = {}
+        partial = bool(data.get('partial'))
+    else:
+        data = request.query
+        partial = data.get('partial', '').lower() in ('1', 'true', 'yes')
+    request_id, response = data.get('id'), data.get('response')
+    if not request_id or not response:
+        return web.json_response({"error": "Missing id or response"}, status=400)
+    entry = await state.get(request_id)
+    if entry is None:
+        return web.json_response({"error": "Invalid request ID"}, status=404)
+
+    if partial:
+        if not await _record_chunk(state, request_id, response):
+            return web.json_response({"id": request_id, "status": "Already answered"}, status=409)
+        return web.json_response({"id": request_id, "status": "Partial response received"})
+    if not await _record_answer(state, request_id, response, entry):
+        return web.json_response({"id": request_id, "status": "Already answered"}, status=409)
+    return web.json_response({"id": request_id, "response": response, "status": "Response received"})
+
+async def _send(ws, message):
+    try:
+        await ws.send_json(message)
+    except (ConnectionError, RuntimeError):
+        pass  # Closing; its handler hands the socket's questions to other responders
+
+def _assign(state, ws, request_id, question, priority=None):
+    """Make ws the owner of a question; returns the message that hands it over."""
+    state.owners[request_id] = ws
+    state.responders[ws][request_id] = question
+    message = {"type": "question", "id": request_id, "question": question}
+    if priority is not None:
+        message["priority"] = priority
+    return message
+
+def _least_busy(state):
+    candidates = [ws for ws in state.responders if not ws.closed]
+    return min(candidates, key=lambda ws: len(state.responders[ws])) if candidates else None
+
+async def _offer(state, request_id, question, priority=None):
+    """Give a question to the open responder with the fewest unanswered ones; it stays queued if there is none."""
+    ws = _least_busy(state)
+    if ws is not None:
+        # Claimed before the first await, so no other path can hand it out again.
+        await _send(ws, _assign(state, ws, request_id, question, priority))
+
+def _hand_on(state, questions):
+    """Reassign a closed responder's questions. Runs in its handler's cleanup, which may be cancelled
+    (the client went away), so ownership changes at once and the sends are separate tasks."""
+    for request_id, question in questions.items():
+        ws = _least_busy(state)
+        if ws is None:
+            return  # The next responder to connect gets them from the store
+        task = asyncio.ensure_future(_send(ws, _assign(state, ws, request_id, question)))
+        state.tasks.add(task)
+        task.add_done_callback(state.tasks.discard)
+
+async def _answered(state, request_id):
+    """Forget who owned a request that is answered (or expired) and tell that responder to stop."""
+    owner = state.owners.pop(request_id, None)
+    if owner in state.responders:
+        del state.responders[owner][request_id]
+        await _send(owner, {"type": "answered", "id": request_id})
+
+async def responder_socket(request):
+    """WebSocket for browser-side responders.
+
+    Server -> responder: {"type": "question", "id", "question", "priority"}, {"type": "answered", "id"},
+    {"type": "pong"}, {"type": "error", "error"}. Responder -> server: {"type": "chunk", "id", "text"},
+    {"type": "answer", "id", "response"} (response may be omitted to use the chunks sent so far),
+    {"type": "ping"}.
+
+    Each question goes to one responder (the least busy), and only that responder's chunks and answer are
+    accepted; questions handed to the dispatcher go to no responder. On connect the socket is registered
+    first, then given the pending questions nobody owns, so one posted meanwhile is not missed; when it
+    disconnects, its unanswered questions go to the other responders.
+    """
+    state = request.app["state"]
+    ws = web.WebSocketResponse(heartbeat=HEARTBEAT, max_msg_size=0)
+    await ws.prepare(request)
+    state.responders[ws] = {}
+    try:
+        for entry in await asyncio.to_thread(state.store.pending, RESPONDER_BACKLOG):
+            if entry["id"] not in state.owners:  # Not already offered while the store was being read
+                await _send(ws, _assign(state, ws, entry["id"], entry["question"]))
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            try:
+                data = json.loads(msg.data)
+            except ValueError:
+                await ws.send_json({"type": "error", "error": "Invalid JSON"})
+                continue
+            kind, request_id = data.get("type"), data.get("id")
+            if kind == "ping":
+                await ws.send_json({"type": "pong"})
+                continue
+            if kind not in ("chunk", "answer"):
+                await ws.send_json({"type": "error", "error": f"Unknown message type: {kind}"})
+                continue
+            entry = await state.get(request_id) if request_id else None
+            if entry is None:
+                await ws.send_json({"type": "error", "id": request_id, "error": "Invalid request ID"})
+            elif state.owners.get(request_id) is not ws:
+                # Answered already, or given to another responder or the dispatcher: keep its output whole.
+                await ws.send_json({"type": "error", "id": request_id, "error": "Question not assigned to you"})
+            elif kind == "chunk":
+                await _record_chunk(state, request_id, data.get("text", ""))
+            else:
+                response = data.get("response") or "".join(entry["chunks"])
+                await _record_answer(state, request_id, response, entry)
+    finally:
+        orphans = state.responders.pop(ws, {})
+        for request_id in orphans:
+            state.owners.pop(request_id, None)
+        if not state.closing.is_set():
+            _hand_on(state, orphans)
+    return ws
+
+async def wait_response(request):
+    state = request.app["state"]
+    request_id = request.query.get('id')
+    entry = await state.get(request_id) if request_id else None
+    if entry is None:
+        return web.json_response({"error": "Invalid request ID"}, status=404)
+    entry = await state.wait_for(request_id, lambda e: e["status"] != "pending", _timeout_arg(request))
+    if entry is not None and entry["status"] == "expired":
+        return web.json_response({"id": request_id, "status": "expired"}, status=410)
+    if entry is None or entry["status"] != "completed":
+        return web.json_response({"id": request_id, "status": "pending"}, status=202)
+    return web.json_response({"id": request_id, "response": entry["response"], "status": "completed"})
+
+async def stream_response(request):
+    state = request.app["state"]
+    request_id = request.query.get('id')
+    if not request_id or await state.get(request_id) is None:
+        return web.json_response({"error": "Invalid request ID"}, status=404)
+    resp = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache",
+                                       "X-Accel-Buffering": "no"})
+    await resp.prepare(request)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + _timeout_arg(request, MAX_WAIT)
+    sent = 0
+    while True:
+        entry = await state.wait_for(request_id, lambda e: len(e["chunks"]) > sent or e["status"] != "pending",
+                                     max(0.0, min(HEARTBEAT, deadline - loop.time())), poll=STORE_POLL)
+        chunks = entry["chunks"][sent:] if entry else []
+        for chunk in chunks:
+            await resp.write(f"event: partial\ndata: {json.dumps({'id': request_id, 'text': chunk})}\n\n".encode())
+        sent += len(chunks)
+        if entry and entry["status"] == "completed":
+            await resp.write(f"event: done\ndata: {json.dumps({'id': request_id, 'response': entry['response']})}\n\n".encode())
+            break
+        if entry is None or entry["status"] == "expired" or loop.time() >= deadline or state.closing.is_set():
+            expired = entry is not None and entry["status"] == "expired"
+            await resp.write(f"event: timeout\ndata: {json.dumps({'id': request_id, 'expired': expired})}\n\n".encode())
+            break
+        if not chunks:
+            await resp.write(b": keep-alive\n\n")
+    await resp.write_eof()
+    return resp
+
+async def status(request):
+    state = request.app["state"]
+    counts = await asyncio.to_thread(state.store.counts)
+    coalescing = await asyncio.to_thread(state.store.coalesce_stats)
+    return web.json_response({"pending": state.live_pending(), "max_pending": state.max_pending,
+                              "waiting": state.waiting, "responders": len(state.responders), "closing": state.closing.is_set(), "store": counts,
+                              "coalescing": coalescing,
+                              "dispatch": state.dispatcher.snapshot() if state.dispatcher else None})
+
+async def shutdown(request):
+    if request.remote not in ("127.0.0.1", "::1"):
+        return web.json_response({"error": "Shutdown only allowed from localhost"}, status=403)
+    request.app["state"].stopped.set()
+    return web.json_response({"status": "Shutting down"})
+
+async def _watch_store(app):
+    """Wake local waiters for requests answered through another bridge process; evict old entries."""
+    state = app["state"]
+    since, last_evict = time.time(), time.time()
+    while not state.closing.is_set():
+        await asyncio.sleep(STORE_POLL)
+        now = time.time()
+        if state.conditions or state.pending or state.owners:
+            # A little overlap, so commits racing the previous query aren't missed; double wakeups are harmless.
+            for request_id in await asyncio.to_thread(state.store.completed_since, since - 1.0):
+                state.pending.pop(request_id, None)
+                await state.notify(request_id)
+                await _answered(state, request_id)
+        since = now
+        if now - last_evict >= EVICT_INTERVAL:
+            last_evict = now
+            # Expired ids get completed_at now, so the next completed_since pass wakes their waiters.
+            await asyncio.to_thread(state.store.expire)
+            await asyncio.to_thread(state.store.evict)
+
+async def _dispatched(state, request_id):
+    state.pending.pop(request_id, None)
+    await state.notify(request_id)
+    await _answered(state, request_id)
+    entry = await state.get(request_id)
+    log_conversation(f"Response received for {request_id}: {entry['response']}", event="bridge_wait",
+                     duration=entry["completed_at"] - entry["created_at"], request_id=request_id)
+
+async def _on_startup(app):
+    state = app["state"]
+    app["watcher"] = asyncio.create_task(_watch_store(app))
+    if app["backends"]:
+        loop = asyncio.get_running_loop()
+        # Dispatcher workers are threads; hand completions back to the event loop.
+        on_complete = lambda request_id, response: asyncio.run_coroutine_threadsafe(_dispatched(state, request_id), loop)
+        on_chunk = lambda request_id, delta: asyncio.run_coroutine_threadsafe(state.notify(request_id), loop)
+        state.dispatcher = Dispatcher(state.store, parse_backends(app["backends"]), on_complete=on_complete,
+                                      on_chunk=on_chunk).start()
+
+async def _on_shutdown(app):
+    state = app["state"]
+    state.closing.set()
+    for request_id in list(state.conditions):
+        await state.notify(request_id)
+    app["watcher"].cancel()
+    for ws in list(state.responders):
+        await ws.close(code=1001, message=b"Bridge shutting down")  # Going away: responders reconnect
+    if state.dispatcher:
+        await asyncio.to_thread(state.dispatcher.stop, 1)
+
+def create_app(store=None, max_pending=MAX_PENDING, backends=BRIDGE_BACKENDS):
+    app = web.Application()
+    app["state"] = BridgeState(store or RequestStore(), max_pending)
+    app["backends"] = backends
+    app.router.add_post('/ask', ask_grok)
+    app.router.add_get('/response', post_response)
+    app.router.add_post('/response', post_response)
+    app.router.add_get('/ws/responder', responder_socket)
+    app.router.add_get('/wait-response', wait_response)
+    app.router.add_get('/stream-response', stream_response)
+    app.router.add_get('/status', status)
+    app.router.add_post('/shutdown', shutdown)
+    app.on_startup.append(_on_startup)
+    app.on_shutdown.append(_on_shutdown)
+    return app
+
+async def serve(host=HOST, port=PORT, app=None):
+    """Run until POST /shutdown, SIGTERM or SIGINT, then drain waiters and close."""
+    app = app or create_app()
+    runner = web.AppRunner(app, handle_signals=False)
+    await runner.setup()
+    await web.TCPSite(runner, host, port, backlog=1024).start()
+    log_conversation(f"Async bridge listening on http://{host}:{port}")
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, app["state"].stopped.set)
+        except NotImplementedError:
+            pass
+    await app["state"].stopped.wait()
+    await runner.cleanup()
+    log_conversation("Async bridge stopped")
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    asyncio.run(serve(port=port))
@@ -0,0 +1,10 @@
+# grok_local/percentiles.py
+"""Latency percentiles, kept free of imports so benchmarks and load tests can use them on their own."""
+import math
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(values)))
+    return values[min(rank, len(values)) - 1]
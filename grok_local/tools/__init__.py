@@ -1,7 +1,7 @@
-from .logging import log_conversation
+from .logging import log_conversation, flush_logs
 from .clipboard import copy_files_to_clipboard
 from .command_executor import execute_command
 from .script_runner import debug_script
 from .config import OLLAMA_URL, PROJECTS_DIR
 
-__all__ = ["log_conversation", "copy_files_to_clipboard", "execute_command", "debug_script", "OLLAMA_URL", "PROJECTS_DIR"]
+__all__ = ["log_conversation", "flush_logs", "copy_files_to_clipboard", "execute_command", "debug_script", "OLLAMA_URL", "PROJECTS_DIR"]
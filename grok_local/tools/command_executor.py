@@ -4,7 +4,7 @@ import os
 from .config import OLLAMA_URL, PROJECTS_DIR
 from .logging import log_conversation
 from .script_runner import debug_script
-from ..commands import git_commands, file_commands, checkpoint_commands, bridge_commands, misc_commands
+from ..commands import git_commands, file_commands, checkpoint_commands, bridge_commands, misc_commands, stats_commands
 from ..framework.orchestrator import Orchestrator
 
 def assess_complexity(command, debug=False):
@@ -46,6 +46,8 @@ def execute_command(command, git_interface, ai_adapter, use_git=True, model=None
         return bridge_commands.handle_bridge_command(command[7:], ai_adapter)
     elif command in ["what time is it", "version", "clean repo", "list files", "tree"] or          command.startswith(("create spaceship fuel script", "create x login stub", "copy ")):
         return misc_commands.misc_command(command, ai_adapter, git_interface)
+    elif command == "stats" or command.startswith("stats "):
+        return stats_commands.stats_command(command)
     elif command.startswith("debug script "):
         script_path = command.split("debug script ", 1)[1].strip()
         return debug_script(script_path, debug)
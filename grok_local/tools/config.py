@@ -1,4 +1,13 @@
 import os
+from ..config import OLLAMA_URL
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
 PROJECTS_DIR = os.path.join(os.path.dirname(__file__), "..", "projects")
+
+# Conversation log writer (see tools/logging.py)
+LOG_MAX_BYTES = int(os.getenv("GROK_LOG_MAX_BYTES", 1 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.getenv("GROK_LOG_BACKUP_COUNT", 3))
+LOG_ROTATE_SECONDS = int(os.getenv("GROK_LOG_ROTATE_SECONDS", 24 * 60 * 60))  # 0 disables time rotation
+LOG_QUEUE_SIZE = int(os.getenv("GROK_LOG_QUEUE_SIZE", 10000))
+LOG_BATCH_SIZE = int(os.getenv("GROK_LOG_BATCH_SIZE", 256))
+LOG_FLUSH_INTERVAL = float(os.getenv("GROK_LOG_FLUSH_INTERVAL", 0.5))
+LOG_JSONL = os.getenv("GROK_LOG_JSONL", "0").lower() in ("1", "true", "yes")
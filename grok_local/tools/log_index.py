@@ -0,0 +1,246 @@
+import os
+import re
+import json
+import sqlite3
+from datetime import datetime
+from .config import LOG_JSONL
+from .logging import LOG_FILE, JSONL_FILE, flush_logs
+from ..percentiles import percentile
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+INDEX_DB = os.path.join(os.path.dirname(LOG_FILE), "log_index.sqlite")
+PENDING_TTL = 24 * 60 * 60  # Forget unanswered bridge requests a day older than the newest one
+
+def default_sources():
+    """Log files worth indexing: the log_conversation log (JSONL when enabled), script logs and x_poller.log."""
+    return [
+        JSONL_FILE if LOG_JSONL else LOG_FILE,
+        os.path.join(PROJECT_DIR, "grok_local.log"),
+        os.path.join(PROJECT_DIR, "x_poller.log"),
+    ]
+
+# [2025-03-10 12:00:00] message                   (log_conversation)
+CONVERSATION_LINE = re.compile(r"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] (.*)$")
+# 2025-03-10 12:00:00,123 - INFO - message          (logging handlers)
+HANDLER_LINE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),(\d{3}) - (\w+) - (.*)$")
+
+AT_TIME = r"at (\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)?)"
+MODEL_CALL_START = re.compile(rf"^(\w+): (?:Starting model call|Sending prompt) {AT_TIME}")
+MODEL_CALL_END = re.compile(rf"^(\w+): (?:Model call completed|Received response) {AT_TIME}")
+USING_MODEL = re.compile(r"^Orchestrator: Using model (\S+)")
+LOCAL_MODEL_TOOK = re.compile(r"^Local (\S+) took ([\d.]+) seconds")
+DEBUGGER_TASK = re.compile(r"^Debugger: Received task")
+DEBUG_LOOP_DONE = re.compile(r"^Orchestrator: Debug loop finished after (\d+) iteration")
+BRIDGE_POSTED = re.compile(r"^Posted request: (\S+)")
+BRIDGE_ANSWERED = re.compile(r"^Response received for (\S+?):")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (path TEXT PRIMARY KEY, inode INTEGER, offset INTEGER);
+CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    agent TEXT,
+    model TEXT,
+    request_id TEXT,
+    value REAL NOT NULL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS events_kind_ts ON events (kind, ts);
+CREATE INDEX IF NOT EXISTS events_kind_model_agent ON events (kind, model, agent);
+"""
+
+def _parse_time(text):
+    fmt = "%Y-%m-%d %H:%M:%S.%f" if "." in text else "%Y-%m-%d %H:%M:%S"
+    return datetime.strptime(text, fmt).timestamp()
+
+class LogIndex:
+    """Incremental SQLite index of timing events scraped from the grok_local logs."""
+
+    def __init__(self, db_path=INDEX_DB):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(SCHEMA)
+        self._pending = None
+
+    def close(self):
+        self.conn.close()
+
+    # --- ingestion ---
+
+    def ingest(self, paths=None):
+        """Parse new lines from each log file since the last recorded offset; returns events added."""
+        flush_logs(timeout=2)
+        self._pending = self._load_state()
+        added = 0
+        with self.conn:
+            for path in paths or default_sources():
+                added += self._ingest_file(path)
+            cutoff = max(self._pending["bridge"].values(), default=0) - PENDING_TTL
+            self._pending["bridge"] = {rid: ts for rid, ts in self._pending["bridge"].items() if ts >= cutoff}
+            self.conn.execute("INSERT OR REPLACE INTO state VALUES ('pending', ?)", (json.dumps(self._pending),))
+        return added
+
+    def _load_state(self):
+        row = self.conn.execute("SELECT value FROM state WHERE key = 'pending'").fetchone()
+        return json.loads(row[0]) if row else {"calls": {}, "bridge": {}, "model": None, "debug_tasks": 0}
+
+    def _ingest_file(self, path):
+        if not os.path.exists(path):
+            return 0
+        stat = os.stat(path)
+        row = self.conn.execute("SELECT inode, offset FROM sources WHERE path = ?", (path,)).fetchone()
+        added = 0
+        if row and (row[0] != stat.st_ino or row[1] > stat.st_size):
+            # Rotated since the last run: finish the old file (now path.1) before starting over.
+            rotated = path + ".1"
+            if os.path.exists(rotated) and os.stat(rotated).st_ino == row[0]:
+                added += self._read_from(rotated, row[1])[0]
+            row = None
+        count, offset = self._read_from(path, row[1] if row else 0)
+        self.conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?)", (path, stat.st_ino, offset))
+        return added + count
+
+    def _read_from(self, path, offset):
+        is_jsonl = ".jsonl" in os.path.basename(path)
+        source = os.path.basename(path[:-2] if path.endswith(".1") else path)
+        added = 0
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # Partial line still being written; pick it up next run.
+                offset += len(raw)
+                line = raw.decode("utf-8", errors="replace").rstrip("\n")
+                for event in self._parse_line(line, is_jsonl):
+                    self.conn.execute(
+                        "INSERT INTO events (ts, kind, agent, model, request_id, value, source) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        event + (source,))
+                    added += 1
+        return added, offset
+
+    def _parse_line(self, line, is_jsonl):
+        fields = {}
+        if is_jsonl:
+            try:
+                record = json.loads(line)
+                ts = datetime.fromisoformat(record["ts"]).timestamp()
+            except (ValueError, TypeError, KeyError):
+                return []  # Not a log_conversation record
+            message, fields = record.get("message", ""), record
+        else:
+            match = CONVERSATION_LINE.match(line)
+            if match:
+                ts, message = _parse_time(match.group(1)), match.group(2)
+            else:
+                match = HANDLER_LINE.match(line)
+                if not match:
+                    return []  # Continuation of a multi-line message.
+                ts, message = _parse_time(match.group(1)) + int(match.group(2)) / 1000.0, match.group(4)
+        return self._parse_message(ts, message, fields)
+
+    def _parse_message(self, ts, message, fields):
+        pending = self._pending
+        event = fields.get("event")
+        if event == "model_call" and fields.get("duration") is not None:
+            pending["calls"].pop(fields.get("agent") or "", None)
+            return [(ts, "model_call", fields.get("agent"), fields.get("model") or pending["model"], None,
+                     float(fields["duration"]))]
+        if event == "bridge_wait" and fields.get("duration") is not None:
+            pending["bridge"].pop(fields.get("request_id") or "", None)
+            return [(ts, "bridge_wait", None, None, fields.get("request_id"), float(fields["duration"]))]
+        if event == "debug_loop" and fields.get("iterations") is not None:
+            pending["debug_tasks"] = 0
+            return [(ts, "debug_loop", None, pending["model"], None, float(fields["iterations"]))]
+
+        match = USING_MODEL.match(message)
+        if match:
+            pending["model"] = match.group(1)
+            return []
+        match = MODEL_CALL_START.match(message)
+        if match:
+            agent = match.group(1)
+            events = []
+            if agent == "Developer" and pending["debug_tasks"]:
+                # Older logs have no explicit end-of-loop line; a new task closes the previous loop.
+                events.append((ts, "debug_loop", None, pending["model"], None, float(pending["debug_tasks"])))
+                pending["debug_tasks"] = 0
+            pending["calls"][agent] = _parse_time(match.group(2))
+            return events
+        match = MODEL_CALL_END.match(message)
+        if match:
+            start = pending["calls"].pop(match.group(1), None)
+            if start is None:
+                return []
+            return [(ts, "model_call", match.group(1), pending["model"], None, _parse_time(match.group(2)) - start)]
+        match = LOCAL_MODEL_TOOK.match(message)
+        if match:
+            return [(ts, "model_call", "LocalDeepSeekAI", match.group(1), None, float(match.group(2)))]
+        if DEBUGGER_TASK.match(message):
+            pending["debug_tasks"] += 1
+            return []
+        match = DEBUG_LOOP_DONE.match(message)
+        if match:
+            pending["debug_tasks"] = 0
+            return [(ts, "debug_loop", None, pending["model"], None, float(match.group(1)))]
+        match = BRIDGE_POSTED.match(message)
+        if match:
+            pending["bridge"][match.group(1)] = ts
+            return []
+        match = BRIDGE_ANSWERED.match(message)
+        if match:
+            posted = pending["bridge"].pop(match.group(1), None)
+            if posted is None:
+                return []
+            return [(ts, "bridge_wait", None, None, match.group(1), ts - posted)]
+        return []
+
+    # --- queries ---
+
+    def values(self, kind, since=None, group_by=()):
+        """Sorted values of one event kind, grouped by the given columns."""
+        columns = ", ".join(group_by)
+        query = f"SELECT {columns + ', ' if columns else ''}value FROM events WHERE kind = ?"
+        params = [kind]
+        if since is not None:
+            query += " AND ts >= ?"
+            params.append(since)
+        groups = {}
+        for row in self.conn.execute(query, params):
+            groups.setdefault(tuple(row[:-1]), []).append(row[-1])
+        for values in groups.values():
+            values.sort()
+        return groups
+
+    def pending_bridge_requests(self):
+        return len(self._load_state()["bridge"])
+
+def _summary(values, unit="s"):
+    return (f"n={len(values)} p50={percentile(values, 50):.2f}{unit} p95={percentile(values, 95):.2f}{unit} "
+            f"p99={percentile(values, 99):.2f}{unit} max={values[-1]:.2f}{unit}")
+
+def stats_report(index, since=None):
+    """Human-readable latency and iteration report built from the index."""
+    lines = ["Model call latency (per model / agent):"]
+    calls = index.values("model_call", since, group_by=("model", "agent"))
+    if not calls:
+        lines.append("  no model calls logged")
+    for (model, agent), values in sorted(calls.items(), key=lambda item: (str(item[0][0]), str(item[0][1]))):
+        lines.append(f"  {model or 'unknown'} / {agent or 'unknown'}: {_summary(values)}")
+
+    lines.append("Debug loop iterations:")
+    loops = index.values("debug_loop", since).get((), [])
+    if loops:
+        histogram = ", ".join(f"{int(n)}x{loops.count(n)}" for n in sorted(set(loops)))
+        lines.append(f"  tasks={len(loops)} mean={sum(loops) / len(loops):.2f} max={int(loops[-1])} ({histogram})")
+    else:
+        lines.append("  no debug loops logged")
+
+    lines.append("Bridge wait time:")
+    waits = index.values("bridge_wait", since).get((), [])
+    lines.append(f"  {_summary(waits)}" if waits else "  no bridge responses logged")
+    pending = index.pending_bridge_requests()
+    if pending:
+        lines.append(f"  {pending} request(s) still unanswered")
+    return "\n".join(lines)
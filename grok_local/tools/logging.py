@@ -1,15 +1,171 @@
 import os
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
 from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from .config import (LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_ROTATE_SECONDS, LOG_QUEUE_SIZE,
+                     LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL, LOG_JSONL)
 
 LOG_FILE = os.path.join(os.path.dirname(__file__), "..", "grok_local.log")
+JSONL_FILE = os.path.splitext(LOG_FILE)[0] + ".jsonl"
+CLOSE_TIMEOUT = 5  # Seconds close() waits for the writer, so a stuck disk cannot hang interpreter exit
 
-def log_conversation(message):
-    """Log a message to the specified log file with a timestamp."""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_entry = f"[{timestamp}] {message}\n"
+class _RotatingLogFile(RotatingFileHandler):
+    """RotatingFileHandler that also rolls over every rotate_seconds and writes lines in batches."""
+
+    def __init__(self, filename, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT, rotate_seconds=LOG_ROTATE_SECONDS):
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.rotate_seconds = rotate_seconds
+        start = os.stat(filename).st_mtime if os.path.exists(filename) else time.time()
+        self.rollover_at = start + rotate_seconds if rotate_seconds else None
+
+    def shouldRollover(self, record):
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return 1
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        if self.rotate_seconds:
+            self.rollover_at = time.time() + self.rotate_seconds
+
+    def write_batch(self, lines):
+        for line in lines:
+            if self.shouldRollover(logging.makeLogRecord({"msg": line})):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(line + self.terminator)
+        if self.stream:
+            self.stream.flush()
+
+class LogWriter:
+    """Background writer: callers enqueue entries, one thread formats, batches and rotates them."""
+
+    def __init__(self, log_file=LOG_FILE, jsonl_file=None, queue_size=LOG_QUEUE_SIZE,
+                 batch_size=LOG_BATCH_SIZE, flush_interval=LOG_FLUSH_INTERVAL):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.text_file = _RotatingLogFile(log_file)
+        self.jsonl_file = _RotatingLogFile(jsonl_file) if jsonl_file else None
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()  # put() callers count drops, the writer takes the count
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="grok-log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, entry):
+        """Enqueue an entry without blocking; entries are dropped (and counted) if the queue is full."""
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            try:
+                self._write([entry for entry in batch if entry is not None])
+            except Exception as e:
+                print(f"Failed to log message: {str(e)}", file=sys.stderr)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+            if stop:
+                return
+
+    def _write(self, entries):
+        lines, records = [], []
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            entries.append((time.time(), f"Log queue full: dropped {dropped} message(s)", "log_dropped", None, {}))
+        for ts, message, event, duration, fields in entries:
+            stamp = datetime.fromtimestamp(ts)
+            lines.append(f"[{stamp.strftime('%Y-%m-%d %H:%M:%S')}] {message}")
+            if self.jsonl_file:
+                record = {"ts": stamp.isoformat(timespec="milliseconds"), "event": event or "message",
+                          "duration": duration, "message": message}
+                record.update(fields)
+                records.append(json.dumps(record, default=str))
+        self.text_file.write_batch(lines)
+        if records:
+            self.jsonl_file.write_batch(records)
+
+    def flush(self, timeout=None):
+        """Block until everything enqueued so far has been written, or timeout seconds have passed."""
+        if self._closed:
+            return
+        deadline = None if timeout is None else time.time() + timeout
+        # Polled rather than queue.join(), which would wait forever on a writer thread that died.
+        while self.queue.unfinished_tasks and self._thread.is_alive():
+            if deadline is not None and time.time() >= deadline:
+                return
+            time.sleep(0.005)
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        if self._closed:
+            return
+        deadline = time.time() + timeout
+        self.flush(timeout)
+        self._closed = True
+        try:
+            self.queue.put(None, timeout=max(0, deadline - time.time()))
+        except queue.Full:
+            pass
+        self._thread.join(timeout=max(0, deadline - time.time()))
+        if self._thread.is_alive():
+            return  # Still writing; its files go with the (daemon) thread
+        self.text_file.close()
+        if self.jsonl_file:
+            self.jsonl_file.close()
+
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+def _get_writer():
+    global _writer, _writer_pid
+    if _writer is None or _writer_pid != os.getpid():
+        with _writer_lock:
+            if _writer is None or _writer_pid != os.getpid():
+                _writer = LogWriter(jsonl_file=JSONL_FILE if LOG_JSONL else None)
+                _writer_pid = os.getpid()
+    return _writer
+
+def log_conversation(message, event=None, duration=None, **fields):
+    """Log a message with a timestamp; writing happens on a background thread.
+
+    event, duration (seconds) and any extra fields are kept in the JSONL log when GROK_LOG_JSONL is set.
+    """
     try:
-        os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(log_entry)
+        _get_writer().put((time.time(), message, event, duration, fields))
     except Exception as e:
         print(f"Failed to log message: {str(e)}", file=sys.stderr)
+
+def flush_logs(timeout=None):
+    """Wait until all queued log entries are on disk."""
+    if _writer is not None and _writer_pid == os.getpid():
+        _writer.flush(timeout)
+
+@atexit.register
+def _close_writer():
+    if _writer is not None and _writer_pid == os.getpid():
+        _writer.close()
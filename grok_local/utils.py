@@ -1,5 +1,7 @@
 # grok_local/utils.py
+import json
 import datetime
+import requests
 from grok_local.config import logger
 
 def what_time_is_it():
@@ -10,3 +12,31 @@ def what_time_is_it():
 
 def report(response):
     return response  # Simple passthrough for now; could add formatting later
+
+def drain_stream(stream, on_delta=None):
+    """Consume a streaming generator (yields text deltas, returns the full text); returns the full text."""
+    while True:
+        try:
+            delta = next(stream)
+        except StopIteration as done:
+            return done.value
+        if on_delta:
+            on_delta(delta)
+
+def stream_ollama(url, payload, timeout=600):
+    """Generator over Ollama's NDJSON stream: yields each response fragment, returns the joined text."""
+    parts = []
+    with requests.post(url, json=payload, stream=True, timeout=timeout) as resp:
+        resp.raise_for_status()
+        for line in resp.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if chunk.get("error"):
+                raise RuntimeError(chunk["error"])
+            if chunk.get("response"):
+                parts.append(chunk["response"])
+                yield chunk["response"]
+            if chunk.get("done"):
+                break
+    return "".join(parts)
@@ -0,0 +1,138 @@
+const puppeteer = require("puppeteer");
+const WebSocket = require("ws");
+
+// Answers grok_bridge_async questions from a logged-in Brave tab over one persistent WebSocket,
+// streaming the answer back as it renders instead of polling the bridge over HTTP.
+//   node memory/bridge_responder.js
+const BRIDGE_WS = process.env.BRIDGE_WS || "ws://127.0.0.1:5000/ws/responder";
+const BROWSER_URL = process.env.BROWSER_URL || "http://localhost:9222";
+const GROK_URL = process.env.GROK_URL || "https://x.com/i/grok";
+const INPUT = process.env.GROK_INPUT_SELECTOR || ".question-input";
+const SUBMIT = process.env.GROK_SUBMIT_SELECTOR || ".submit-btn";
+const OUTPUT = process.env.GROK_OUTPUT_SELECTOR || ".response-output";
+const STABLE_MS = Number(process.env.GROK_STABLE_MS || 1500); // Answer is done once unchanged this long
+const ANSWER_TIMEOUT_MS = Number(process.env.GROK_ANSWER_TIMEOUT_MS || 120000);
+const PING_MS = 15000;
+
+let page;
+let socket;
+let backoff = 500;
+const queue = [];
+const answered = new Set();
+let busy = false;
+let onDelta = null; // Set while a question is in flight; fed by the in-page MutationObserver
+
+function send(message) {
+  if (socket && socket.readyState === WebSocket.OPEN) socket.send(JSON.stringify(message));
+}
+
+async function preparePage() {
+  const browser = await puppeteer.connect({ browserURL: BROWSER_URL });
+  page = await browser.newPage();
+  await page.goto(GROK_URL, { waitUntil: "networkidle2", timeout: 60000 });
+  await page.exposeFunction("bridgeDelta", text => onDelta && onDelta(text));
+  console.log("Responder page ready:", page.url());
+}
+
+async function ask(question) {
+  await page.waitForSelector(INPUT, { timeout: 15000 });
+  const before = await page.$$eval(OUTPUT, nodes => nodes.length);
+  let text = "";
+  let lastChange = Date.now();
+  onDelta = current => {
+    if (current.startsWith(text)) {
+      const delta = current.slice(text.length);
+      if (delta) send({ type: "chunk", id: ask.id, text: delta });
+    }
+    text = current;
+    lastChange = Date.now();
+  };
+  // Watch only the answer node that appears for this question; report its full text on every change.
+  await page.evaluate((selector, before) => {
+    if (window.__bridgeObserver) window.__bridgeObserver.disconnect();
+    const report = () => {
+      const nodes = document.querySelectorAll(selector);
+      if (nodes.length > before) window.bridgeDelta(nodes[nodes.length - 1].innerText);
+    };
+    window.__bridgeObserver = new MutationObserver(report);
+    window.__bridgeObserver.observe(document.body, { childList: true, subtree: true, characterData: true });
+  }, OUTPUT, before);
+  await page.click(INPUT, { clickCount: 3 });
+  await page.type(INPUT, question);
+  await page.click(SUBMIT);
+
+  const started = Date.now();
+  while (!text || Date.now() - lastChange < STABLE_MS) {
+    if (Date.now() - started > ANSWER_TIMEOUT_MS) throw new Error("Timed out waiting for answer");
+    if (answered.has(ask.id)) break; // Someone else answered first
+    await new Promise(resolve => setTimeout(resolve, 100));
+  }
+  await page.evaluate(() => window.__bridgeObserver && window.__bridgeObserver.disconnect());
+  onDelta = null;
+  return text;
+}
+
+async function drain() {
+  if (busy) return;
+  busy = true;
+  while (queue.length) {
+    const { id, question } = queue.shift();
+    if (answered.has(id)) continue;
+    ask.id = id;
+    try {
+      const response = await ask(question);
+      if (!answered.has(id)) send({ type: "answer", id, response });
+    } catch (e) {
+      console.log(`Failed on ${id}:`, e.message);
+      send({ type: "answer", id, response: `Error: ${e.message}` });
+    }
+  }
+  busy = false;
+}
+
+function connect() {
+  socket = new WebSocket(BRIDGE_WS);
+  let awaitingPong = false;
+  let pinger;
+
+  socket.on("open", () => {
+    console.log("Connected to bridge:", BRIDGE_WS);
+    backoff = 500;
+    pinger = setInterval(() => {
+      if (awaitingPong) return socket.terminate(); // Half-open connection: drop it and reconnect
+      awaitingPong = true;
+      send({ type: "ping" });
+    }, PING_MS);
+  });
+
+  socket.on("message", raw => {
+    const message = JSON.parse(raw);
+    if (message.type === "pong") {
+      awaitingPong = false;
+    } else if (message.type === "question") {
+      if (!answered.has(message.id) && !queue.some(q => q.id === message.id)) queue.push(message);
+      drain();
+    } else if (message.type === "answered") {
+      answered.add(message.id);
+    } else if (message.type === "error") {
+      console.log("Bridge error:", message.error);
+    }
+  });
+
+  socket.on("close", code => {
+    clearInterval(pinger);
+    console.log(`Bridge connection closed (${code}); reconnecting in ${backoff}ms`);
+    setTimeout(connect, backoff);
+    backoff = Math.min(backoff * 2, 30000);
+  });
+
+  socket.on("error", e => console.log("Bridge socket error:", e.message));
+}
+
+(async () => {
+  await preparePage();
+  connect();
+})().catch(e => {
+  console.error("Responder failed:", e.message);
+  process.exit(1);
+});
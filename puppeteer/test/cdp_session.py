@@ -0,0 +1,144 @@
+"""One persistent Chrome DevTools Protocol connection to Brave, used in-process by chat_manager.py.
+
+Replaces spawning `node brave_face.js` per action: the browser-level websocket from /json/version is
+opened once, page targets are attached with flattened sessions, and commands that do not depend on
+each other's results are written back to back and awaited together (one round trip).
+"""
+import json
+import time
+import itertools
+import urllib.request
+from collections import deque
+
+try:
+    import websocket  # websocket-client
+except ImportError:
+    websocket = None
+
+def browser_version(port=9222, host="127.0.0.1", timeout=1.0):
+    """Parsed /json/version of the debugging endpoint, or None if nothing is listening yet."""
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}/json/version", timeout=timeout) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+    except (OSError, ValueError):
+        return None
+
+def wait_until_ready(port=9222, host="127.0.0.1", timeout=20.0, interval=0.1, process=None):
+    """Poll /json/version until the browser answers; returns its version info, or None on timeout/exit."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        version = browser_version(port, host)
+        if version:
+            return version
+        if process is not None and process.poll() is not None:
+            return None
+        time.sleep(interval)
+    return None
+
+class CDPError(RuntimeError):
+    pass
+
+class CDPSession:
+    def __init__(self, port=9222, host="127.0.0.1", timeout=15.0):
+        if websocket is None:
+            raise RuntimeError("websocket-client is required: pip install websocket-client")
+        version = browser_version(port, host)
+        if not version:
+            raise CDPError(f"No browser debugging endpoint on {host}:{port}")
+        self.browser = version.get("Browser", "")
+        self.timeout = timeout
+        self._ws = websocket.create_connection(version["webSocketDebuggerUrl"], timeout=timeout,
+                                               suppress_origin=True)
+        self._ids = itertools.count(1)
+        self._replies = {}
+        self.events = deque(maxlen=500)  # Recent protocol events, for debugging
+        self._sessions = {}  # targetId -> sessionId
+
+    def _post(self, method, params=None, session_id=None):
+        message = {"id": next(self._ids), "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        self._ws.send(json.dumps(message))
+        return message["id"]
+
+    def _reply(self, message_id, timeout=None):
+        timeout = timeout or self.timeout
+        deadline = time.monotonic() + timeout
+        while message_id not in self._replies:
+            if time.monotonic() > deadline:
+                raise CDPError(f"No reply to CDP command {message_id} within {timeout}s")
+            message = json.loads(self._ws.recv())
+            if "id" in message:
+                self._replies[message["id"]] = message
+            else:
+                self.events.append(message)
+        message = self._replies.pop(message_id)
+        if "error" in message:
+            raise CDPError(message["error"].get("message", str(message["error"])))
+        return message.get("result", {})
+
+    def send(self, method, params=None, session_id=None, timeout=None):
+        return self._reply(self._post(method, params, session_id), timeout)
+
+    def send_batch(self, commands, session_id=None):
+        """Pipeline [(method, params), ...]: write all, then collect the results in order."""
+        ids = [self._post(method, params, session_id) for method, params in commands]
+        return [self._reply(message_id) for message_id in ids]
+
+    def tabs(self):
+        targets = self.send("Target.getTargets")["targetInfos"]
+        return [t for t in targets if t["type"] == "page"]
+
+    def find_tab(self, url_part):
+        return next((t for t in self.tabs() if url_part in t["url"]), None)
+
+    def open_tab(self, url):
+        return self.send("Target.createTarget", {"url": url})["targetId"]
+
+    def attach(self, target_id):
+        if target_id not in self._sessions:
+            result = self.send("Target.attachToTarget", {"targetId": target_id, "flatten": True})
+            self._sessions[target_id] = result["sessionId"]
+        return self._sessions[target_id]
+
+    def evaluate(self, target_id, expression, await_promise=False, timeout=None):
+        result = self.send("Runtime.evaluate", {"expression": expression, "returnByValue": True,
+                                                "awaitPromise": await_promise}, self.attach(target_id), timeout)
+        if "exceptionDetails" in result:
+            raise CDPError(result["exceptionDetails"].get("text", "JavaScript exception"))
+        return result["result"].get("value")
+
+    def navigate(self, target_id, url):
+        self.send("Page.navigate", {"url": url}, self.attach(target_id))
+
+    def activate(self, target_id):
+        self.send("Target.activateTarget", {"targetId": target_id})
+
+    def focus(self, target_id, selector, timeout=15.0):
+        """Wait in the page (one round trip) for selector to appear, then focus it; True once it has focus."""
+        script = (f"new Promise(resolve => {{ const deadline = Date.now() + {int(timeout * 1000)}; "
+                  f"const poll = () => {{ const el = document.querySelector({json.dumps(selector)}); "
+                  f"if (el) {{ el.focus(); "
+                  f"resolve(el === document.activeElement || el.contains(document.activeElement)); }} "
+                  f"else if (Date.now() > deadline) resolve(false); else setTimeout(poll, 100); }}; poll(); }})")
+        return bool(self.evaluate(target_id, script, await_promise=True, timeout=timeout + self.timeout))
+
+    def send_message(self, target_id, text, selector='div[role="textbox"]', timeout=15.0):
+        """Wait up to timeout for the chat box and focus it, then type text and press Enter in one batch."""
+        if not self.focus(target_id, selector, timeout):
+            raise CDPError(f"Chat box {selector} not found or not focusable within {timeout}s")
+        enter = {"key": "Enter", "code": "Enter", "windowsVirtualKeyCode": 13, "nativeVirtualKeyCode": 13}
+        self.send_batch([
+            ("Input.insertText", {"text": text}),
+            ("Input.dispatchKeyEvent", dict(enter, type="keyDown", text="\r")),
+            ("Input.dispatchKeyEvent", dict(enter, type="keyUp")),
+        ], self.attach(target_id))
+
+    def close(self):
+        for session_id in self._sessions.values():
+            try:
+                self.send("Target.detachFromTarget", {"sessionId": session_id})
+            except Exception:
+                pass
+        self._sessions = {}
+        self._ws.close()  # Disconnects only; the browser and its tabs keep running
@@ -0,0 +1,100 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from grok_local.asset_cache import AssetCache, RequestInterceptor, is_hashed_asset
+
+CHUNK = "https://grok.com/_next/static/chunks/main-app-1284e9164cb2e71b.js"
+
+class FakeRequest:
+    def __init__(self, url, resource_type, method="GET"):
+        self.url = url
+        self.resource_type = resource_type
+        self.method = method
+
+class FakeResponse:
+    status = 200
+    headers = {"content-type": "application/javascript", "access-control-allow-origin": "*",
+               "cross-origin-resource-policy": "cross-origin", "set-cookie": "session=secret", "date": "Mon"}
+
+    def body(self):
+        return b"console.log('chunk');" * 100
+
+class FakeRoute:
+    def __init__(self, url, resource_type):
+        self.request = FakeRequest(url, resource_type)
+        self.outcome = None
+        self.fetches = 0
+
+    def abort(self):
+        self.outcome = "aborted"
+
+    def continue_(self):
+        self.outcome = "network"
+
+    def fetch(self):
+        self.fetches += 1
+        return FakeResponse()
+
+    def fulfill(self, response=None, body=None, status=None, headers=None):
+        self.outcome = "fulfilled"
+        self.body = body
+        self.headers = headers
+
+class TestAssetCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.interceptor = RequestInterceptor(AssetCache(self.tmp_dir), blocked_types={"image", "font", "media"})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_hashed_asset_detection(self):
+        self.assertTrue(is_hashed_asset(CHUNK))
+        self.assertTrue(is_hashed_asset("https://x.com/static/1955741d02186fb9.css"))
+        self.assertFalse(is_hashed_asset("https://grok.com/app.js"))
+        self.assertFalse(is_hashed_asset("https://grok.com/rest/app-chat/conversations"))
+
+    def test_blocks_heavy_and_tracking_requests(self):
+        for url, kind in (("https://grok.com/logo.png", "image"), ("https://www.google-analytics.com/g/collect", "xhr")):
+            route = FakeRoute(url, kind)
+            self.interceptor.handle(route)
+            self.assertEqual(route.outcome, "aborted")
+        route = FakeRoute("https://grok.com/rest/app-chat", "fetch")
+        self.interceptor.handle(route)
+        self.assertEqual(route.outcome, "network")
+        self.assertEqual(self.interceptor.reset()["blocked"], 2)
+
+    def test_second_visit_is_served_from_cache(self):
+        first = FakeRoute(CHUNK, "script")
+        self.interceptor.handle(first)
+        self.assertEqual((first.fetches, self.interceptor.reset()["cache_misses"]), (1, 1))
+        second = FakeRoute(CHUNK, "script")
+        self.interceptor.handle(second)
+        stats = self.interceptor.reset()
+        self.assertEqual(second.fetches, 0)
+        self.assertEqual(second.body, FakeResponse().body())
+        self.assertEqual(stats["cache_hits"], 1)
+        self.assertEqual(stats["bytes_saved"], len(FakeResponse().body()))
+        # CORS headers come back with the body, so crossorigin scripts and fonts still load; cookies do not.
+        self.assertEqual(second.headers, {"content-type": "application/javascript", "access-control-allow-origin": "*",
+                                          "cross-origin-resource-policy": "cross-origin"})
+
+    def test_entries_without_headers_still_load(self):
+        cache = self.interceptor.cache
+        cache.put(CHUNK, b"old", {"Content-Type": "text/javascript"})
+        with open(cache._index_path(CHUNK), encoding="utf-8") as f:
+            entry = json.load(f)
+        del entry["headers"]
+        with open(cache._index_path(CHUNK), "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        self.assertEqual(cache.get(CHUNK), (b"old", {"content-type": "text/javascript"}))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import os
+import sys
+import time
+import json
+import sqlite3
+import shutil
+import tempfile
+import threading
+import unittest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import grok_local.tools  # Before grok_bridge, as the app imports them; grok_local.commands imports grok_bridge back
+from grok_local.bridge_store import RequestStore, question_key
+from grok_local import grok_bridge
+
+class TestRequestStore(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, "bridge.sqlite")
+        self.store = RequestStore(self.path)
+
+    def test_lifecycle(self):
+        request_id = self.store.create("What time is it?")
+        self.assertEqual([p["id"] for p in self.store.pending()], [request_id])
+        self.assertTrue(self.store.add_chunk(request_id, "It is "))
+        self.assertTrue(self.store.add_chunk(request_id, "noon"))
+        self.assertTrue(self.store.complete(request_id, "It is noon", only_pending=True))
+        self.assertFalse(self.store.complete(request_id, "Too late", only_pending=True))  # First answer wins
+        entry = self.store.get(request_id)
+        self.assertEqual((entry["status"], entry["response"], entry["chunks"]),
+                         ("completed", "It is noon", ["It is ", "noon"]))
+        self.assertEqual(self.store.pending(), [])
+        self.assertEqual(self.store.counts(), {"completed": 1})
+        self.assertIsNone(self.store.get("missing"))
+        self.assertFalse(self.store.add_chunk("missing", "text"))
+
+    def test_evicts_only_old_completed_requests(self):
+        done, waiting = self.store.create("done"), self.store.create("waiting")
+        self.store.complete(done, "answer")
+        self.assertEqual(self.store.evict(ttl=60), 0)
+        self.assertEqual(self.store.evict(ttl=-1), 1)
+        self.assertIsNone(self.store.get(done))
+        self.assertIsNotNone(self.store.get(waiting))
+
+    def test_shared_between_connections(self):
+        request_id = self.store.create("question")
+        other = RequestStore(self.path)
+        since = time.time()
+        other.complete(request_id, "answer")
+        self.assertEqual(self.store.completed_since(since - 1), [request_id])
+        self.assertEqual(self.store.get(request_id)["response"], "answer")
+
+    def test_migrates_databases_without_coalescing_columns(self):
+        path = os.path.join(self.dir, "old.sqlite")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE requests (id TEXT PRIMARY KEY, question TEXT NOT NULL, status TEXT NOT NULL, "
+                     "response TEXT, chunks TEXT NOT NULL DEFAULT '[]', created_at REAL NOT NULL, completed_at REAL)")
+        conn.commit()
+        conn.close()
+        store = RequestStore(path)
+        request_id, coalesced = store.submit("question")
+        self.assertEqual((store.submit("question"), coalesced), ((request_id, True), False))
+
+class TestCoalescing(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.store = RequestStore(os.path.join(self.dir, "bridge.sqlite"))
+
+    def test_identical_pending_questions_share_a_request(self):
+        self.assertEqual(question_key("What  is\tGrok?"), question_key("what is grok?"))
+        first, coalesced = self.store.submit("What is Grok?")
+        self.assertFalse(coalesced)
+        self.assertEqual(self.store.submit("  what is   GROK? "), (first, True))
+        self.assertNotEqual(self.store.submit("What is X?")[0], first)
+        self.assertNotEqual(self.store.create("What is Grok?"), first)  # coalesce=False
+        stats = self.store.coalesce_stats()
+        self.assertEqual((stats["asked"], stats["coalesced"], stats["pending_shared"]), (4, 1, 1))
+
+    def test_only_recent_requests_are_joined(self):
+        stale, _ = self.store.submit("What is Grok?")
+        self.store._conn().execute("UPDATE requests SET created_at = created_at - ? WHERE id = ?",
+                                   (self.store.coalesce_window + 1, stale))
+        fresh, coalesced = self.store.submit("What is Grok?")
+        self.assertFalse(coalesced)
+        self.assertNotEqual(fresh, stale)
+        newest = self.store.create("What is Grok?")
+        self.assertEqual(self.store.submit("What is Grok?"), (newest, True))
+
+    def test_answered_questions_are_asked_again(self):
+        first, _ = self.store.submit("What is Grok?")
+        self.store.complete(first, "An AI")
+        second, coalesced = self.store.submit("What is Grok?")
+        self.assertFalse(coalesced)
+        self.assertNotEqual(second, first)
+
+class TestFlaskBridge(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.store = RequestStore(os.path.join(self.dir, "bridge.sqlite"))
+        self.previous = grok_bridge.store
+        grok_bridge.store = self.store
+        self.addCleanup(setattr, grok_bridge, "store", self.previous)
+        self.client = grok_bridge.app.test_client()
+
+    def ask(self, question):
+        resp = self.client.post("/ask", json={"question": question})
+        self.assertEqual(resp.status_code, 200)
+        return resp.get_json()
+
+    def test_import_opens_no_store(self):
+        self.assertIsNone(self.previous)
+
+    def test_ask_and_answer(self):
+        self.assertEqual(self.client.post("/ask", json={}).status_code, 400)
+        self.assertEqual(self.client.post("/ask", json={"question": "q", "priority": "high"}).status_code, 400)
+        asked = self.ask("What is Grok?")
+        self.assertEqual((asked["status"], asked["coalesced"]), ("pending", False))
+        self.assertTrue(self.ask("what is grok?")["coalesced"])
+        self.assertEqual(self.client.get("/response?id=missing&response=x").status_code, 404)
+        self.assertEqual(self.client.post("/response", json={"id": asked["id"]}).status_code, 400)
+        resp = self.client.post("/response", json={"id": asked["id"], "response": "An AI"})
+        self.assertEqual(resp.get_json()["status"], "Response received")
+        self.assertEqual(self.client.post("/response", json={"id": asked["id"], "response": "Again"}).status_code, 409)
+        status = self.client.get("/status").get_json()
+        self.assertEqual(status["store"], {"completed": 1})
+        self.assertEqual(status["coalescing"]["coalesced"], 1)
+
+    def test_long_poll(self):
+        request_id = self.ask("Slow question")["id"]
+        self.assertEqual(self.client.get("/wait-response?id=missing").status_code, 404)
+        self.assertEqual(self.client.get(f"/wait-response?id={request_id}&timeout=0").status_code, 202)
+        timer = threading.Timer(0.2, self.store.complete, (request_id, "Slow answer"))  # As another process would
+        timer.start()
+        self.addCleanup(timer.cancel)
+        resp = self.client.get(f"/wait-response?id={request_id}&timeout=5")
+        self.assertEqual((resp.status_code, resp.get_json()["response"]), (200, "Slow answer"))
+        self.assertEqual(grok_bridge._conditions, {})
+
+    def test_stream(self):
+        request_id = self.ask("Streamed question")["id"]
+        self.client.get(f"/response?id={request_id}&response=Hello&partial=1")
+
+        def answer():
+            self.client.post("/response", json={"id": request_id, "response": " world", "partial": True})
+            self.client.post("/response", json={"id": request_id, "response": "Hello world"})
+
+        timer = threading.Timer(0.2, answer)
+        timer.start()
+        self.addCleanup(timer.cancel)
+        body = self.client.get(f"/stream-response?id={request_id}&timeout=5").get_data(as_text=True)
+        events = [(block.split("\n")[0], json.loads(block.split("data: ", 1)[1]))
+                  for block in body.split("\n\n") if block.startswith("event:")]
+        self.assertEqual([name for name, _ in events], ["event: partial", "event: partial", "event: done"])
+        self.assertEqual([data.get("text") or data.get("response") for _, data in events],
+                         ["Hello", " world", "Hello world"])
+        self.assertEqual(grok_bridge._conditions, {})
+
+    def test_timed_out_waiters_release_their_condition(self):
+        request_id = self.ask("Never answered")["id"]
+        self.client.get(f"/wait-response?id={request_id}&timeout=0.1")
+        self.client.post("/response", json={"id": request_id, "response": "chunk", "partial": True})
+        self.assertEqual(grok_bridge._conditions, {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import sys
+import time
+import asyncio
+import shutil
+import tempfile
+import unittest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from aiohttp.test_utils import TestServer, TestClient
+import grok_local.tools  # Before the bridges, as the app imports them; grok_local.commands imports grok_bridge back
+from grok_local.bridge_store import RequestStore
+from grok_local.grok_bridge_async import create_app
+
+class BridgeTestCase(unittest.IsolatedAsyncioTestCase):
+    max_pending = 100
+
+    async def asyncSetUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.store = RequestStore(os.path.join(self.dir, "bridge.sqlite"))
+        self.app = create_app(self.store, max_pending=self.max_pending, backends="")
+        self.state = self.app["state"]
+        self.client = TestClient(TestServer(self.app))
+        await self.client.start_server()
+        self.addAsyncCleanup(self.client.close)
+
+    async def ask(self, question, status=200):
+        resp = await self.client.post("/ask", json={"question": question})
+        self.assertEqual(resp.status, status)
+        return await resp.json()
+
+class TestBackpressure(BridgeTestCase):
+    max_pending = 2
+
+    async def test_only_live_requests_count(self):
+        first = (await self.ask("one"))["id"]
+        await self.ask("two")
+        await self.ask("three", status=503)
+        self.state.pending[first] = time.time() - self.store.pending_ttl - 1  # Abandoned long ago
+        await self.ask("three")
+        self.assertEqual((await (await self.client.get("/status")).json())["pending"], 2)
+
+class TestExpiry(BridgeTestCase):
+    async def test_expired_requests_end_waits(self):
+        request_id = (await self.ask("Nobody will answer"))["id"]
+        self.assertEqual(self.store.expire(ttl=-1), [request_id])
+        self.assertEqual(self.store.pending(), [])
+        resp = await self.client.get("/wait-response", params={"id": request_id, "timeout": 5})
+        self.assertEqual((resp.status, (await resp.json())["status"]), (410, "expired"))
+        resp = await self.client.get("/stream-response", params={"id": request_id, "timeout": 5})
+        self.assertIn('event: timeout\ndata: {"id": "%s", "expired": true}' % request_id, await resp.text())
+        # A late answer is still kept, and the request is evicted like an answered one.
+        resp = await self.client.post("/response", json={"id": request_id, "response": "Late"})
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(self.store.evict(ttl=-1), 1)
+
+class TestResponders(BridgeTestCase):
+    async def connect(self):
+        ws = await self.client.ws_connect("/ws/responder")
+        self.addAsyncCleanup(ws.close)
+        return ws
+
+    async def receive(self, ws, timeout=2):
+        return await asyncio.wait_for(ws.receive_json(), timeout)
+
+    async def assert_silent(self, ws):
+        # A cancelled receive leaves the client socket unusable, so this can only be a test's last check.
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.receive(ws, timeout=0.2)
+
+    async def test_each_question_goes_to_one_responder(self):
+        first, second = await self.connect(), await self.connect()
+        await self.ask("one")
+        await self.ask("two")
+        got = [await self.receive(first), await self.receive(second)]
+        self.assertEqual(sorted(message["question"] for message in got), ["one", "two"])
+        await self.assert_silent(first)
+        await self.assert_silent(second)
+
+    async def test_only_the_owner_may_answer(self):
+        owner = await self.connect()
+        request_id = (await self.ask("question"))["id"]
+        self.assertEqual((await self.receive(owner))["id"], request_id)
+        other = await self.connect()
+        await other.send_json({"type": "chunk", "id": request_id, "text": "intruder"})
+        self.assertEqual((await self.receive(other))["error"], "Question not assigned to you")
+        await owner.send_json({"type": "chunk", "id": request_id, "text": "Hello"})
+        await owner.send_json({"type": "answer", "id": request_id})
+        self.assertEqual(await self.receive(owner), {"type": "answered", "id": request_id})
+        entry = self.store.get(request_id)
+        self.assertEqual((entry["response"], entry["chunks"]), ("Hello", ["Hello"]))
+        await owner.send_json({"type": "chunk", "id": request_id, "text": "late"})
+        self.assertEqual((await self.receive(owner))["error"], "Question not assigned to you")
+        resp = await self.client.post("/response", json={"id": request_id, "response": "late", "partial": True})
+        self.assertEqual(resp.status, 409)
+        self.assertEqual(self.store.get(request_id)["chunks"], ["Hello"])
+
+    async def test_connecting_responder_gets_unowned_questions_once(self):
+        request_id = (await self.ask("asked before anyone listened"))["id"]
+        first = await self.connect()
+        self.assertEqual((await self.receive(first))["id"], request_id)
+        second = await self.connect()
+        await self.assert_silent(second)
+
+    async def test_questions_of_a_closed_responder_are_handed_on(self):
+        owner = await self.connect()
+        request_id = (await self.ask("question"))["id"]
+        await self.receive(owner)
+        other = await self.connect()
+        while len(self.state.responders) < 2:
+            await asyncio.sleep(0.01)
+        self.assertEqual([len(ids) for ids in self.state.responders.values()], [1, 0])  # Not offered twice
+        await owner.close()
+        self.assertEqual((await self.receive(other))["id"], request_id)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from grok_local.bridge_store import RequestStore
+from grok_local.bridge_dispatch import Dispatcher, _Job, parse_backends, AGING_SECONDS
+
+class TestScheduling(unittest.TestCase):
+    def setUp(self):
+        self.dispatcher = Dispatcher(None, {"A": 1, "B": 1})
+
+    def push(self, request_id, priority, backend=None, waited=0.0):
+        job = _Job(request_id, request_id, priority, backend)
+        job.enqueued_at -= waited
+        self.dispatcher._push(job)
+        return job
+
+    def take_all(self, name):
+        taken = []
+        while True:
+            job, stolen = self.dispatcher._take(name)
+            if job is None:
+                return taken
+            taken.append((job.request_id, stolen))
+
+    def test_parse_backends(self):
+        self.assertEqual(parse_backends(" local_deepseek:2, stub ,"), {"LOCAL_DEEPSEEK": 2, "STUB": 1})
+
+    def test_own_and_shared_queues_are_ordered_together(self):
+        self.push("own-low", 5, "A")
+        self.push("shared-urgent", 1)
+        self.push("own-urgent", 0, "A")
+        self.push("shared-low", 7)
+        self.assertEqual([request_id for request_id, _ in self.take_all("A")],
+                         ["own-urgent", "shared-urgent", "own-low", "shared-low"])
+
+    def test_aged_shared_job_is_not_starved_by_own_jobs(self):
+        self.push("shared-old", 5, waited=5 * AGING_SECONDS)
+        for i in range(3):
+            self.push(f"own-{i}", 1, "A")  # A steady stream of more urgent jobs for this backend
+        self.assertEqual(self.dispatcher._take("A")[0].request_id, "shared-old")
+
+    def test_equal_keys_keep_arrival_order(self):
+        first, second = _Job("first", "", 3, None), _Job("second", "", 3, "A")
+        second.enqueued_at = first.enqueued_at
+        self.dispatcher._push(first)
+        self.dispatcher._push(second)
+        self.assertEqual([request_id for request_id, _ in self.take_all("A")], ["first", "second"])
+
+    def test_steals_only_when_own_and_shared_are_empty(self):
+        self.push("for-b", 5, "B")
+        self.push("shared", 9)
+        self.assertEqual(self.take_all("A"), [("shared", False), ("for-b", True)])
+
+    def test_never_takes_a_job_it_failed(self):
+        job = self.push("failed-on-a", 1)
+        job.tried.add("A")
+        self.push("for-b", 2, "B").tried.add("A")
+        self.assertEqual(self.take_all("A"), [])
+        self.assertEqual(self.take_all("B"), [("failed-on-a", False), ("for-b", False)])
+
+class FakeAdapter:
+    def __init__(self, name, fail=False):
+        self.name = name
+        self.fail = fail
+
+    def delegate(self, question):
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        return f"{self.name}: {question}"
+
+class StreamingAdapter(FakeAdapter):
+    def stream(self, question):
+        yield "Hello"
+        yield " world"
+        return "Hello world"
+
+class TestDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.store = RequestStore(os.path.join(self.dir, "bridge.sqlite"))
+        self.done = {}
+        self.all_done = threading.Event()
+
+    def run_dispatcher(self, backends, adapters, questions, before=(), **submit):
+        def on_complete(request_id, response):
+            self.done[request_id] = response
+            if len(self.done) == len(questions):
+                self.all_done.set()
+
+        dispatcher = Dispatcher(self.store, backends, on_complete=on_complete, adapter_factory=adapters).start()
+        self.addCleanup(dispatcher.stop, 1)
+        for request_id in before:  # Queued ahead of the questions, with the same priority
+            dispatcher.submit(request_id, "", **submit)
+        ids = [self.store.create(question) for question in questions]
+        for request_id, question in zip(ids, questions):
+            dispatcher.submit(request_id, question, **submit)
+        self.assertTrue(self.all_done.wait(5))
+        return dispatcher, ids
+
+    def test_answers_and_streams(self):
+        _, ids = self.run_dispatcher({"STREAM": 1}, lambda name: StreamingAdapter(name), ["q1", "q2"])
+        for request_id in ids:
+            entry = self.store.get(request_id)
+            self.assertEqual((entry["status"], entry["response"], entry["chunks"]),
+                             ("completed", "Hello world", ["Hello", " world"]))
+
+    def test_failed_job_is_retried_on_another_backend(self):
+        # UP either steals the job while DOWN is busy failing, or gets it back once DOWN has failed.
+        dispatcher, ids = self.run_dispatcher({"DOWN": 1, "UP": 1}, lambda name: FakeAdapter(name, fail=name == "DOWN"),
+                                              ["question"], backend="down")
+        self.assertEqual(self.store.get(ids[0])["response"], "UP: question")
+        self.assertEqual(dispatcher.snapshot()["backends"]["UP"]["completed"], 1)
+
+    def test_gives_up_when_every_backend_failed(self):
+        dispatcher, ids = self.run_dispatcher({"DOWN": 1, "ALSO_DOWN": 1}, lambda name: FakeAdapter(name, fail=True),
+                                              ["question"])
+        self.assertEqual(self.done, {ids[0]: None})
+        self.assertTrue(self.store.get(ids[0])["response"].startswith("Error: all backends failed"))
+        stats = dispatcher.snapshot()["backends"]
+        self.assertEqual(stats["DOWN"]["failed"] + stats["ALSO_DOWN"]["failed"], 2)
+
+    def test_skips_requests_answered_while_queued(self):
+        answered = self.store.create("answered elsewhere")
+        self.store.complete(answered, "by a person")
+        dispatcher, ids = self.run_dispatcher({"UP": 1}, lambda name: FakeAdapter(name), ["question"],
+                                              before=[answered])
+        self.assertEqual(self.store.get(answered)["response"], "by a person")
+        self.assertEqual(list(self.done), ids)
+
+if __name__ == "__main__":
+    unittest.main()
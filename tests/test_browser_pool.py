@@ -0,0 +1,91 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from grok_local import browser_pool
+from grok_local.browser_pool import BrowserPool
+
+class FakeAdapter:
+    launched = 0
+
+    def __init__(self, backend, headless=True, page=None):
+        FakeAdapter.launched += 1
+        self.alive = True
+        self.closed = False
+        self.visits = []
+
+    def goto(self, url):
+        self.visits.append(url)
+
+    def is_alive(self):
+        return self.alive and not self.closed
+
+    def close(self):
+        self.closed = True
+
+class TestBrowserPool(unittest.TestCase):
+    def setUp(self):
+        FakeAdapter.launched = 0
+        patcher = mock.patch.object(browser_pool, "BrowserAdapter", FakeAdapter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_sessions_are_reused_and_kept_warm(self):
+        pool = BrowserPool("SELENIUM", size=2, warm_url="https://grok.com")
+        for _ in range(5):
+            with pool.checkout() as browser:
+                self.assertEqual(browser.visits[-1], "https://grok.com")
+                browser.goto("https://grok.com/chat/1")
+        self.assertEqual(FakeAdapter.launched, 1)
+        self.assertEqual(pool.stats["reused"], 4)
+
+    def test_release_does_not_wait_for_the_reload(self):
+        pool = BrowserPool("SELENIUM", size=1, warm_url="https://grok.com")
+        with pool.checkout() as browser:
+            browser.goto("https://grok.com/chat/1")
+        self.assertEqual(browser.visits, ["https://grok.com", "https://grok.com/chat/1"])  # Answer returned first
+        with pool.checkout() as again:
+            self.assertIs(again, browser)
+            self.assertEqual(browser.visits[-1], "https://grok.com")
+
+    def test_crashed_and_failed_sessions_are_recycled(self):
+        pool = BrowserPool("SELENIUM", size=1)
+        with pool.checkout() as browser:
+            first = browser
+        first.alive = False
+        with pool.checkout() as browser:
+            self.assertIsNot(browser, first)
+        with self.assertRaises(RuntimeError):
+            with pool.checkout() as browser:
+                raise RuntimeError("page crashed")
+        self.assertTrue(browser.closed)
+        self.assertEqual(FakeAdapter.launched, 2)
+        with pool.checkout():
+            pass
+        self.assertEqual(FakeAdapter.launched, 3)
+
+    def test_full_pool_times_out(self):
+        pool = BrowserPool("SELENIUM", size=1)
+        with pool.checkout():
+            with self.assertRaises(TimeoutError):
+                pool.acquire(timeout=0.05)
+
+    def test_bench_counts_a_failed_browser_load_as_an_error(self):
+        from grok_local import browser_bench
+        from grok_local.dom_discovery import html_fetcher
+        pool = mock.Mock()
+        pool.checkout.return_value.__enter__ = mock.Mock(side_effect=RuntimeError("browser crashed"))
+        pool.checkout.return_value.__exit__ = mock.Mock(return_value=False)
+        with mock.patch.object(html_fetcher, "get_pool", return_value=pool), \
+                mock.patch.object(html_fetcher, "fetch_static") as fetch_static:
+            result = browser_bench.bench_fetch(2, "SELENIUM", "https://x.com/i/grok")
+        fetch_static.assert_not_called()
+        self.assertEqual(result["errors"], 2)
+        self.assertIsNone(result["cold_ms"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import unittest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from grok_local.browser_adapter import wait_until, wait_until_stable, stream_deltas
+from grok_local.utils import drain_stream
+
+class TestBrowserWaits(unittest.TestCase):
+    def test_wait_until_returns_first_truthy_value(self):
+        calls = iter([None, "", "ready"])
+        self.assertEqual(wait_until(lambda: next(calls), timeout=1, interval=0.01), "ready")
+
+    def test_wait_until_times_out(self):
+        with self.assertRaises(TimeoutError):
+            wait_until(lambda: False, timeout=0.05, interval=0.01)
+
+    def test_stable_text_waits_for_rendering_to_finish(self):
+        # Simulates an answer rendered in three steps, 50ms apart.
+        started = time.monotonic()
+        steps = ["", "Hel", "Hello", "Hello world"]
+        read = lambda: steps[min(int((time.monotonic() - started) / 0.05), len(steps) - 1)]
+        self.assertEqual(wait_until_stable(read, stable_ms=100, timeout=2, interval=0.01), "Hello world")
+
+    def test_stable_text_times_out_while_still_changing(self):
+        counter = iter(range(10 ** 6))
+        with self.assertRaises(TimeoutError):
+            wait_until_stable(lambda: str(next(counter)), stable_ms=50, timeout=0.1, interval=0.01)
+
+    def test_stream_yields_deltas_and_returns_full_text(self):
+        snapshots = iter([{"text": "", "idle_ms": 0, "stopped": False},
+                          {"text": "Hel", "idle_ms": 0, "stopped": False},
+                          {"text": "Hello", "idle_ms": 0, "stopped": False},
+                          {"text": "Hello world", "idle_ms": 0, "stopped": False},
+                          {"text": "Hello world", "idle_ms": 5000, "stopped": False}])
+        deltas = []
+        text = drain_stream(stream_deltas(lambda: next(snapshots), interval=0), deltas.append)
+        self.assertEqual(deltas, ["Hel", "lo", " world"])
+        self.assertEqual(text, "Hello world")
+
+    def test_stream_ends_when_stop_button_disappears(self):
+        snapshots = iter([{"text": "Short answer", "idle_ms": 0, "stopped": False},
+                          {"text": "Short answer", "idle_ms": 10, "stopped": True}])
+        self.assertEqual(drain_stream(stream_deltas(lambda: next(snapshots), interval=0)), "Short answer")
+
+    def test_rewritten_text_is_returned_not_streamed(self):
+        snapshots = iter([{"text": "**bold", "idle_ms": 0, "stopped": False},
+                          {"text": "bold text", "idle_ms": 5000, "stopped": False}])
+        deltas = []
+        self.assertEqual(drain_stream(stream_deltas(lambda: next(snapshots), interval=0), deltas.append), "bold text")
+        self.assertEqual(deltas, ["**bold"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from datetime import datetime
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from grok_local.checkpoint_store import CheckpointStore, checkpoint_fields
+
+def checkpoint(message, timestamp, group="default", chat_id="chat-1"):
+    return {"description": {"message": message, "timestamp": timestamp, "chat_id": chat_id, "group": group},
+            "timestamp": timestamp, "files": [], "current_task": "", "chat_address": chat_id, "chat_group": group}
+
+class TestCheckpointStore(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def store(self):
+        store = CheckpointStore(self.dir)
+        self.addCleanup(store.close)
+        return store
+
+    def write(self, name, data):
+        with open(os.path.join(self.dir, name), "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+
+    def test_migrates_both_legacy_formats_once(self):
+        listed = checkpoint("from the list", "2025-03-09_054630")
+        self.write("checkpoints.json", [checkpoint("later", "2025-03-10T08:00:00"), listed])
+        self.write("checkpoint_2025-03-09_054630.json", listed)  # Saved both ways
+        self.write("checkpoint_mar02_2025.json", {"description": "'Per-file checkpoint'",
+                                                  "timestamp": "2025-03-02T02:01:34.684336", "files": [],
+                                                  "current_task": ""})
+        self.write("checkpoint.json", checkpoint("the single file", "2025-03-05T09:00:00"))
+        checkpoints, total = self.store().query()
+        self.assertEqual(total, 4)
+        self.assertEqual([checkpoint_fields(cp)[3] for cp in checkpoints],
+                         ["later", "from the list", "the single file", "Per-file checkpoint"])
+        self.assertEqual(checkpoints[2]["migrated_from"], "checkpoint.json")
+        self.assertEqual(checkpoints[3]["migrated_from"], "checkpoint_mar02_2025.json")
+
+        os.remove(os.path.join(self.dir, "checkpoints.json"))
+        self.assertEqual(self.store().query()[1], 4)  # The log exists now; nothing is migrated again
+
+    def test_append_only_grows_the_log(self):
+        store = self.store()
+        store.append(checkpoint("first", "2025-03-01T10:00:00"))
+        with open(store.log_path, "rb") as f:
+            before = f.read()
+        inode = os.stat(store.log_path).st_ino
+        store.append(checkpoint("second", "2025-03-02T10:00:00"))
+        with open(store.log_path, "rb") as f:
+            after = f.read()
+        self.assertTrue(after.startswith(before))
+        self.assertEqual(os.stat(store.log_path).st_ino, inode)
+        self.assertEqual(after.count(b"\n"), 2)
+
+    def test_paged_and_filtered_listing(self):
+        store = self.store()
+        for day in range(1, 11):
+            store.append(checkpoint(f"day {day}", f"2025-03-{day:02d}T12:00:00", group="odd" if day % 2 else "even",
+                                    chat_id=f"chat-{day % 3}"))
+        page, total = store.query(limit=4, page=2)
+        self.assertEqual(total, 10)
+        self.assertEqual([checkpoint_fields(cp)[3] for cp in page], ["day 6", "day 5", "day 4", "day 3"])
+        self.assertEqual([checkpoint_fields(cp)[3] for cp in store.query(group="odd", chat_id="chat-1")[0]],
+                         ["day 7", "day 1"])
+        since, until = datetime(2025, 3, 3).timestamp(), datetime(2025, 3, 5).timestamp()
+        self.assertEqual([checkpoint_fields(cp)[3] for cp in store.query(since=since, until=until)[0]],
+                         ["day 4", "day 3"])
+
+    def test_index_follows_other_writers_and_replaced_logs(self):
+        store, other = self.store(), self.store()
+        store.append(checkpoint("mine", "2025-03-01T10:00:00"))
+        other.append(checkpoint("theirs", "2025-03-02T10:00:00"))
+        self.assertEqual(store.query()[1], 2)
+        # A log replaced wholesale (a git checkout, say) is reindexed from scratch.
+        replacement = store.log_path + ".new"
+        with open(replacement, "w", encoding="utf-8") as f:
+            f.write(json.dumps(checkpoint("only", "2025-03-03T10:00:00")) + "\n")
+        os.replace(replacement, store.log_path)
+        checkpoints, total = store.query()
+        self.assertEqual((total, checkpoint_fields(checkpoints[0])[3]), (1, "only"))
+
+    def test_grok_checkpoint_appends_to_the_log(self):
+        import grok_checkpoint
+        with open(os.path.join(self.dir, "grok_bootstrap.py"), "w", encoding="utf-8") as f:
+            f.write("# Current Task\n# - nothing\n")
+        with mock.patch.object(grok_checkpoint, "CheckpointStore", lambda: CheckpointStore(self.dir)), \
+                mock.patch.object(grok_checkpoint, "PROJECT_DIR", self.dir):
+            result = grok_checkpoint.save_checkpoint("saved by the CLI", None, filename="named.json")
+            listing = grok_checkpoint.list_checkpoints()
+        self.assertIn("checkpoints.jsonl", result)
+        self.assertEqual(sorted(os.listdir(self.dir)), ["checkpoints.jsonl", "checkpoints_index.sqlite",
+                                                        "grok_bootstrap.py"])
+        checkpoints, total = self.store().query()
+        self.assertEqual((total, checkpoints[0]["name"]), (1, "named.json"))
+        self.assertIn("saved by the CLI", listing)
+
+if __name__ == "__main__":
+    unittest.main()
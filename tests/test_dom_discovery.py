@@ -0,0 +1,360 @@
+import os
+import io
+import sys
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import grok_local.dom_discovery as dom_discovery
+from grok_local.dom_discovery.element_parser import parse_elements, BeautifulSoup
+from grok_local.dom_discovery.element_stream import extract_elements, iter_elements
+from grok_local.dom_discovery.selector_engine import SelectorIndex, StructureHash
+from grok_local.dom_discovery.discovery_cache import DiscoveryCache
+from grok_local.dom_discovery.role_model import RoleModel, selector_matches, np
+from grok_local.dom_discovery import agent_analyzer, bulk, snapshot_diff
+from grok_local.dom_discovery.html_compactor import compact_html, estimate_tokens
+from grok_local.dom_discovery.snapshot_diff import SnapshotStore, take_snapshot, diff_snapshots, check_page
+
+GROK_CHAT = os.path.join(PROJECT_DIR, "grok_local", "html", "grok_chat.html")
+
+PAGE = """<!DOCTYPE html><html><body>
+<form class="chat"><textarea id="prompt-box" class="input"></textarea>
+<button type="submit" class="btn">Send <b>now</b></button></form>
+<div class="message">first answer that is long enough</div><div class="message">second</div>
+<div class="message"><span aria-label="copy">x</span></div>
+<script>var hidden = "<div>not an element</div>";</script><br></br>
+</body></html>"""
+
+class TestElementParser(unittest.TestCase):
+    def test_fast_parser_output(self):
+        elements = {e["selector"]: e for e in parse_elements(PAGE, backend="fast")}
+        self.assertEqual(elements["#prompt-box"]["candidate_role"], {"role": "prompt_input", "confidence": 1.0})
+        self.assertEqual(elements["button.btn"]["text"], "Sendnow")
+        self.assertEqual(elements["button.btn"]["candidate_role"]["role"], "submit_button")
+        self.assertEqual(elements["form.chat"]["text"], "Sendnow")
+        self.assertNotIn("not an element", json.dumps(list(elements.values())))
+
+    @unittest.skipIf(BeautifulSoup is None, "beautifulsoup4 not installed")
+    def test_fast_parser_matches_beautifulsoup(self):
+        with open(GROK_CHAT, encoding="utf-8") as f:
+            html = f.read()
+        for page in (PAGE, html, "<div><p>a &amp; b<div>unclosed &#150; <span>x</span>"):
+            self.assertEqual(parse_elements(page, backend="fast"), parse_elements(page, backend="bs4"))
+
+    def test_streaming_matches_full_parse_and_bounds_output(self):
+        streamed = [element for _, element in sorted(iter_elements(PAGE, chunk_size=7))]
+        self.assertEqual(streamed, parse_elements(PAGE, backend="fast"))
+        big = "<div>" + "".join(f"<p style='{'x' * 1000}'>paragraph number {i} with text</p>" for i in range(500)) + "</div>"
+        elements = extract_elements(io.StringIO(big), top_k=3, max_attribute_length=20)
+        roles = [e["candidate_role"]["role"] for e in elements]
+        self.assertLessEqual(roles.count("response_output"), 3)
+        self.assertTrue(all(len(e["attributes"].get("style", "")) <= 21 for e in elements))
+
+class TestSelectorEngine(unittest.TestCase):
+    def test_selectors_are_unique_and_prefer_stable_attributes(self):
+        index = SelectorIndex.build(PAGE)
+        selectors = dict(index.selector_for_element(order) for order in index.by_order)
+        self.assertIn('span[aria-label="copy"]', selectors)
+        self.assertIn("#prompt-box", selectors)
+        self.assertEqual(index.count("div.message"), 3)
+        self.assertNotIn("div.message", selectors)  # Ambiguous, so never returned
+        self.assertIn("body > div:nth-of-type(2)", selectors)
+        self.assertEqual(selectors["body > div:nth-of-type(2)"], 0.1)
+
+    def test_fingerprint_ignores_text_and_generated_names(self):
+        base = SelectorIndex.build(PAGE).fingerprint()
+        reworded = PAGE.replace("second", "a different answer").replace('class="message"', 'class="message css-1x9ab2c"')
+        self.assertEqual(SelectorIndex.build(reworded).fingerprint(), base)
+        restructured = PAGE.replace("<div class=\"message\">second</div>", "")
+        self.assertNotEqual(SelectorIndex.build(restructured).fingerprint(), base)
+
+    def test_streamed_index_matches_a_separate_parse(self):
+        index = SelectorIndex()
+        elements = extract_elements(io.StringIO(PAGE), chunk_size=7, index=index)
+        built = SelectorIndex.build(PAGE)
+        self.assertEqual(index.fingerprint(), built.fingerprint())
+        self.assertEqual({order: index.selector_for_element(order) for order in index.by_order},
+                         {order: built.selector_for_element(order) for order in built.by_order})
+        self.assertIn("#prompt-box", [element["selector"] for element in elements])
+        structure = StructureHash()
+        extract_elements(io.StringIO(PAGE), chunk_size=7, structure=structure)
+        self.assertEqual(structure.fingerprint(), built.fingerprint())  # Without keeping the tree
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestRoleModel(unittest.TestCase):
+    def roles(self, model, html=PAGE):
+        return {e["selector"]: e["candidate_role"]["role"] for e in parse_elements(html, role_model=model)}
+
+    def test_default_weights_find_the_chat_controls(self):
+        roles = self.roles(RoleModel.default())
+        self.assertEqual(roles["#prompt-box"], "prompt_input")
+        self.assertEqual(roles["button.btn"], "submit_button")
+        self.assertIsNone(roles["form.chat"])
+
+    def test_fit_learns_from_labels(self):
+        page = PAGE.replace('class="message"', 'class="bubble"')
+        model = RoleModel.default()
+        self.assertNotEqual(self.roles(model, page)["div.bubble"], "response_output")
+        rows, labels = [], []
+        for element in parse_elements(page):
+            attributes = element["attributes"]
+            rows.append(RoleModel.features(element["tag"], attributes, element["text"].lower(), len(element["text"]), 2, 0, 0))
+            labels.append("response_output" if selector_matches("div.bubble", element["tag"], attributes) else None)
+        model.fit(rows, labels)
+        self.assertEqual(self.roles(model, page)["div.bubble"], "response_output")
+
+class TestDiscoveryCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.html_dir = os.path.join(self.tmp_dir, "page")
+        os.makedirs(self.html_dir)
+        self.write_page(PAGE)
+        patcher = mock.patch.object(dom_discovery, "DiscoveryCache", lambda: DiscoveryCache(os.path.join(self.tmp_dir, "cache")))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.suggest = mock.Mock(return_value={"raw_response": "{}", "parsed": {}, "error": None})
+        for name, value in (("get_agent_suggestions", self.suggest), ("ensure_ollama_running", lambda model: True)):
+            patcher = mock.patch.object(dom_discovery, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_page(self, html):
+        with open(os.path.join(self.html_dir, "saved_resource.html"), "w", encoding="utf-8") as f:
+            f.write(html)
+
+    def discover(self):
+        output = os.path.join(self.tmp_dir, "out.json")
+        dom_discovery.discover_dom("https://example.com", output, html_dir=self.html_dir)
+        with open(output, encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_unchanged_structure_skips_the_model(self):
+        first = self.discover()
+        self.write_page(PAGE.replace("second", "new text"))
+        second = self.discover()
+        self.assertEqual(second["agent_suggestions"], first["agent_suggestions"])
+        self.assertEqual(self.suggest.call_count, 1)
+        # The elements are this page's, not the cached snapshot's.
+        self.assertIn("new text", [element["text"] for element in second["elements"]])
+        self.assertNotIn("second", [element["text"] for element in second["elements"]])
+
+    def test_cache_miss_parses_the_page_once(self):
+        indexes = mock.Mock(side_effect=SelectorIndex)
+        extract = mock.Mock(side_effect=extract_elements)
+        with mock.patch.object(dom_discovery, "SelectorIndex", indexes), \
+                mock.patch.object(dom_discovery, "extract_elements", extract):
+            self.discover()
+        self.assertEqual((indexes.call_count, extract.call_count), (1, 1))
+        self.assertTrue(extract.call_args.kwargs["index"].nodes)  # The fingerprint's index is the extraction's
+
+    def test_large_pages_are_not_indexed_or_read_whole(self):
+        with mock.patch.object(dom_discovery, "MAX_INDEX_BYTES", 0):
+            self.discover()
+        self.assertNotIsInstance(self.suggest.call_args.args[1], str)  # The outline streams the file
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir, "cache", "snapshots")))
+        self.discover()  # Indexed this time: same fingerprint, so the suggestions are reused
+        self.assertEqual(self.suggest.call_count, 1)
+
+    def test_structure_change_invalidates(self):
+        self.discover()
+        self.write_page(PAGE.replace("<br></br>", "<input name='extra'>"))
+        self.discover()
+        self.assertEqual(self.suggest.call_count, 2)
+        entries = [f for _, _, files in os.walk(os.path.join(self.tmp_dir, "cache", "entries")) for f in files]
+        self.assertEqual(len(entries), 1)  # The old structure's entry was dropped
+
+class TestHtmlCompactor(unittest.TestCase):
+    def test_outline_keeps_controls_and_drops_noise(self):
+        page = PAGE.replace("<body>", "<head><title>Chat</title><style>p {}</style></head><body><svg><text>logo</text></svg>"
+                            "<p hidden>gone</p><div style='display: none'><button>gone</button></div>")
+        outline = compact_html(page)
+        self.assertEqual(outline.splitlines()[:5], ["<html>", "  <title> Chat", "  <body>", '    <form class="chat">',
+                                                    '      <textarea id="prompt-box" class="input">'])
+        self.assertNotIn("gone", outline)
+        self.assertNotIn("logo", outline)
+        self.assertNotIn("not an element", outline)
+
+    def test_repeats_collapse_and_budget_is_respected(self):
+        items = "".join(f"<li class='message'><p>answer {i} " + "words " * 30 + "</p></li>" for i in range(200))
+        page = f"<main><ul>{items}</ul><div class='composer'><textarea name='q'></textarea></div></main>"
+        outline = compact_html(page)
+        self.assertIn("… 198 more <li.message>", outline)
+        small = compact_html(page, budget=40)
+        self.assertLessEqual(estimate_tokens(small), 40)
+        self.assertIn('<textarea name="q">', small)  # Entry fields are kept first
+        self.assertEqual(compact_html(page, budget=40), small)
+        self.assertIn(small, agent_analyzer._build_prompt("https://example.com", page, [], budget=40))
+
+    def test_deep_nesting(self):
+        depth = 1500  # Past the default recursion limit of 1000
+        bare = "<div>" * depth + "<button id='send'>Send</button>" + "</div>" * depth
+        self.assertIn('<button id="send"> Send', compact_html(bare))  # The wrappers are unwrapped
+        nested = "".join(f"<section class='level'><p>level {i}</p>" for i in range(depth)) + "</section>" * depth
+        self.assertIn("more elements omitted", compact_html(nested))
+
+class TestSnapshotDiff(unittest.TestCase):
+    KNOWN = {"example.com": {"#prompt-box": "prompt_input", "button.btn": "submit_button", ".answer": "response_output"}}
+
+    def snapshot(self, html):
+        return take_snapshot("https://example.com", SelectorIndex.build(html), {})
+
+    def test_diff_finds_only_the_changed_regions(self):
+        old = self.snapshot(PAGE)
+        self.assertEqual(diff_snapshots(old, self.snapshot(PAGE.replace("second", "reworded"))), [])
+        new = self.snapshot(PAGE.replace('<div class="message">second</div>', "<p>new</p>")
+                            .replace('class="btn"', 'class="send"'))
+        changes = sorted((c["change"], c["path"]) for c in diff_snapshots(old, new))
+        self.assertEqual(changes, [
+            ("added", "html:nth-of-type(1) > body:nth-of-type(1) > p:nth-of-type(1)"),
+            ("changed", "html:nth-of-type(1) > body:nth-of-type(1) > form:nth-of-type(1) > button:nth-of-type(1)"),
+            ("removed", "html:nth-of-type(1) > body:nth-of-type(1) > div:nth-of-type(2)"),
+        ])
+
+    def test_check_reports_broken_selectors_with_replacements(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        store = SnapshotStore(tmp_dir)
+        first = check_page("https://example.com/", PAGE, store, self.KNOWN)
+        self.assertIsNone(first["previous"])
+        self.assertEqual({s: r["status"] for s, r in first["selectors"].items()},
+                         {"#prompt-box": "ok", "button.btn": "ok", ".answer": "missing"})
+        unchanged = check_page("https://example.com/", PAGE, store, self.KNOWN)
+        self.assertEqual(unchanged["selectors"][".answer"]["replacement"]["selector"], "body > div:nth-of-type(1)")
+        drifted = check_page("https://example.com/", PAGE.replace('class="btn"', 'class="send-button"'), store,
+                             self.KNOWN)
+        self.assertEqual(drifted["previous"], first["fingerprint"])
+        self.assertEqual([e["selector"] for e in drifted["elements"]], ["button.send-button"])
+        button = drifted["selectors"]["button.btn"]
+        self.assertEqual((button["before"], button["after"], button["status"]), (1, 0, "broken"))
+        self.assertEqual(button["replacement"]["selector"], "button.send-button")
+        self.assertEqual(drifted["selectors"]["#prompt-box"]["status"], "ok")
+        # It stays broken on later checks, with a replacement from the unchanged page.
+        again = check_page("https://example.com/", PAGE.replace('class="btn"', 'class="send-button"'), store,
+                           self.KNOWN)
+        button = again["selectors"]["button.btn"]
+        self.assertEqual((button["before"], button["after"], button["status"]), (1, 0, "broken"))
+        self.assertEqual(button["replacement"]["selector"], "button.send-button")
+
+    def test_unchanged_page_with_good_selectors_rediscovers_nothing(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        store, known = SnapshotStore(tmp_dir), {"example.com": {"#prompt-box": "prompt_input"}}
+        check_page("https://example.com/", PAGE, store, known)
+        self.assertEqual(check_page("https://example.com/", PAGE, store, known)["elements"], [])
+
+    def test_main_fails_while_a_selector_is_broken(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        page = os.path.join(tmp_dir, "page.html")
+        args = [page, "--url", "https://example.com/", "--store", os.path.join(tmp_dir, "snapshots")]
+        with mock.patch.dict(snapshot_diff.KNOWN_SELECTORS, self.KNOWN, clear=True), \
+                mock.patch("builtins.print"):
+            for html, code in ((PAGE.replace("<br></br>", "<p class='answer'>a</p>"), 0), (PAGE, 1), (PAGE, 1)):
+                with open(page, "w", encoding="utf-8") as f:
+                    f.write(html)
+                self.assertEqual(snapshot_diff.main(args), code)
+
+class TestBulkDiscovery(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        pages = os.path.join(self.tmp_dir, "pages")
+        os.makedirs(os.path.join(pages, "grok_files"))
+        for name, html in (("a.html", "<!-- saved from url=(0019)https://example.com -->" + PAGE),
+                           ("b.html", PAGE.replace("<br></br>", "<input name='extra'>")),
+                           ("grok_files/saved_resource.html", "<p>a saved page resource</p>")):
+            with open(os.path.join(pages, name), "w", encoding="utf-8") as f:
+                f.write(html)
+        self.manifest = os.path.join(self.tmp_dir, "manifest.jsonl")
+        with open(self.manifest, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"url": "https://example.org", "html_file": "fetched/page.html"}) + "\n")
+        self.sources = [pages, self.manifest]
+        self.batches = []
+        def suggest(batch, model):
+            self.batches.append([url for url, _, _ in batch])
+            return [{"raw_response": "{}", "parsed": {"url": url}, "error": None} for url, _, _ in batch]
+        for name, value in (("DiscoveryCache", lambda: DiscoveryCache(os.path.join(self.tmp_dir, "cache"))),
+                            ("fetch_static", lambda url: PAGE), ("ensure_ollama_running", lambda model: True),
+                            ("get_agent_suggestions_batch", suggest)):
+            patcher = mock.patch.object(bulk, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_bulk(self):
+        output = os.path.join(self.tmp_dir, "out.jsonl")
+        summary = bulk.discover_bulk(self.sources, output, workers=2, batch_size=2)
+        with open(output, encoding="utf-8") as f:
+            records = {record["url"]: record for record in map(json.loads, f)}
+        self.assertEqual(summary["pages"], len(records))
+        return records
+
+    def test_pages_are_fetched_parsed_and_batched(self):
+        records = self.run_bulk()
+        self.assertEqual(sorted(records), ["file://" + os.path.join(self.tmp_dir, "pages", "b.html"),
+                                           "https://example.com", "https://example.org"])
+        # a.html and the fetched page have the same structure, so only one of them is asked about.
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(len(self.batches[0]), 2)
+        for url, record in records.items():
+            self.assertIsNone(record["error"])
+            self.assertIn(record["agent_suggestions"]["parsed"]["url"], self.batches[0])
+            self.assertIn("#prompt-box", [e["selector"] for e in record["elements"]])
+            self.assertEqual(set(record["timings"]), {"fetch", "parse", "suggest", "total"})
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir, "fetched", "page.html")))
+
+        self.batches.clear()
+        again = self.run_bulk()  # Everything is saved and cached now
+        self.assertEqual(self.batches, [])
+        for url, record in again.items():
+            self.assertEqual(record["cached"], {"suggestions": True})
+            self.assertEqual(record["elements"], records[url]["elements"])
+            self.assertEqual(record["timings"]["fetch"], 0.0)
+
+    def test_pages_with_the_same_structure_keep_their_own_text(self):
+        with open(os.path.join(self.tmp_dir, "pages", "c.html"), "w", encoding="utf-8") as f:
+            f.write(PAGE.replace("second", "Hi"))
+        records = self.run_bulk()
+        texts = {url: [element["text"] for element in record["elements"]] for url, record in records.items()}
+        c = "file://" + os.path.join(self.tmp_dir, "pages", "c.html")
+        self.assertIn("Hi", texts[c])
+        self.assertNotIn("second", texts[c])
+        self.assertIn("second", texts["https://example.com"])
+        self.assertEqual(records[c]["agent_suggestions"], records["https://example.com"]["agent_suggestions"])
+
+    def test_model_is_asked_while_pages_are_still_fetching(self):
+        asked, overlapped = threading.Event(), []
+        suggest = bulk.get_agent_suggestions_batch
+        def slow_fetch(url):
+            overlapped.append(asked.wait(5))  # The saved pages fill a batch; its request must not wait for this fetch
+            return PAGE
+        def ask(batch, model):
+            asked.set()
+            return suggest(batch, model)
+        with mock.patch.object(bulk, "fetch_static", slow_fetch), \
+                mock.patch.object(bulk, "get_agent_suggestions_batch", ask):
+            records = self.run_bulk()
+        self.assertEqual(overlapped, [True])
+        self.assertEqual(len(self.batches), 1)
+        self.assertTrue(records["https://example.org"]["cached"]["suggestions"])  # Same structure as a.html
+
+    def test_batched_answers_fall_back_to_single_requests(self):
+        answer = {key: {"selector": "#x", "reason": "r"} for key in agent_analyzer.SUGGESTION_KEYS}
+        with mock.patch.object(agent_analyzer, "_generate", return_value=json.dumps({"1": answer})), \
+                mock.patch.object(agent_analyzer, "get_agent_suggestions",
+                                  return_value={"raw_response": None, "parsed": None, "error": "single"}) as single:
+            results = agent_analyzer.get_agent_suggestions_batch([("u1", PAGE, []), ("u2", PAGE, [])])
+        self.assertEqual(results[0]["parsed"], answer)
+        self.assertEqual(results[1]["error"], "single")
+        single.assert_called_once_with("u2", PAGE, [], model="deepseek-r1")
+
+if __name__ == "__main__":
+    unittest.main()
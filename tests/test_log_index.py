@@ -0,0 +1,112 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from grok_local.tools.log_index import LogIndex, percentile, stats_report
+
+CONVERSATION_LOG = """\
+[2025-03-10 12:00:00] Orchestrator: Using model deepseek-r1
+[2025-03-10 12:00:00] Developer: Starting model call at 2025-03-10 12:00:00
+[2025-03-10 12:00:02] Developer: Model call completed at 2025-03-10 12:00:02.500000
+[2025-03-10 12:00:03] Debugger: Received task
+[2025-03-10 12:00:04] Orchestrator: Debug loop finished after 2 iterations
+[2025-03-10 12:00:05] Local llama3.2 took 1.25 seconds
+  a continuation line with no timestamp
+"""
+
+HANDLER_LOG = """\
+2025-03-10 12:01:00,000 - INFO - Posted request: req-1
+2025-03-10 12:01:03,500 - INFO - Response received for req-1: done
+2025-03-10 12:01:04,000 - INFO - Response received for req-unknown: ignored
+"""
+
+class TestPercentile(unittest.TestCase):
+    def test_nearest_rank(self):
+        values = [1, 2, 3, 4, 5, 6]
+        self.assertEqual(percentile(values, 50), 3)  # Rank ceil(0.5 * 6) = 3, not 4
+        self.assertEqual(percentile(values, 95), 6)
+        self.assertEqual(percentile(values, 100), 6)
+        self.assertEqual(percentile(values, 0), 1)
+        self.assertEqual(percentile(list(range(1, 101)), 99), 99)
+        self.assertIsNone(percentile([], 50))
+
+class TestLogIndex(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.index = LogIndex(os.path.join(self.dir, "index.sqlite"))
+        self.addCleanup(self.index.close)
+
+    def write(self, name, text, mode="w"):
+        path = os.path.join(self.dir, name)
+        with open(path, mode, encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_parses_conversation_and_handler_lines(self):
+        paths = [self.write("grok_local.log", CONVERSATION_LOG), self.write("x_poller.log", HANDLER_LOG)]
+        self.assertEqual(self.index.ingest(paths), 4)
+        self.assertEqual(self.index.values("model_call", group_by=("model", "agent")),
+                         {("deepseek-r1", "Developer"): [2.5], ("llama3.2", "LocalDeepSeekAI"): [1.25]})
+        self.assertEqual(self.index.values("debug_loop"), {(): [2.0]})
+        self.assertEqual(self.index.values("bridge_wait"), {(): [3.5]})
+        self.assertEqual(self.index.ingest(paths), 0)  # Nothing new since the recorded offsets
+
+    def test_jsonl_records(self):
+        records = [
+            {"ts": "2025-03-10T12:00:00.000", "event": "model_call", "duration": 0.75, "agent": "Developer",
+             "model": "deepseek-r1", "message": "call"},
+            {"event": "model_call", "duration": 9.0, "message": "no ts"},
+            ["not", "a", "record"],
+            {"ts": "2025-03-10T12:00:01.000", "event": "bridge_wait", "duration": 2.0, "request_id": "req-2",
+             "message": "wait"},
+        ]
+        path = self.write("grok_local.jsonl", "".join(json.dumps(r) + "\n" for r in records) + "not json\n")
+        self.assertEqual(self.index.ingest([path]), 2)
+        self.assertEqual(self.index.values("model_call"), {(): [0.75]})
+        self.assertEqual(self.index.values("bridge_wait"), {(): [2.0]})
+
+    def test_partial_line_waits_for_its_newline(self):
+        line = "[2025-03-10 12:00:05] Local llama3.2 took 1.25 seconds"
+        path = self.write("grok_local.log", line)
+        self.assertEqual(self.index.ingest([path]), 0)
+        self.write("grok_local.log", "\n", mode="a")
+        self.assertEqual(self.index.ingest([path]), 1)
+
+    def test_rotation_finishes_the_old_file_first(self):
+        path = self.write("grok_local.log", "[2025-03-10 12:00:00] Local a took 1.0 seconds\n")
+        self.assertEqual(self.index.ingest([path]), 1)
+        # Written after the last run, then rotated away before the next one.
+        self.write("grok_local.log", "[2025-03-10 12:00:01] Local b took 2.0 seconds\n", mode="a")
+        os.rename(path, path + ".1")
+        self.write("grok_local.log", "[2025-03-10 12:00:02] Local c took 3.0 seconds\n")
+        self.assertEqual(self.index.ingest([path]), 2)
+        self.assertEqual(self.index.values("model_call", group_by=("model",)),
+                         {("a",): [1.0], ("b",): [2.0], ("c",): [3.0]})
+
+    def test_truncated_log_is_read_from_the_start(self):
+        path = self.write("grok_local.log", CONVERSATION_LOG)
+        self.index.ingest([path])
+        self.write("grok_local.log", "[2025-03-10 13:00:00] Local d took 4.0 seconds\n")  # Same inode, shorter
+        self.assertEqual(self.index.ingest([path]), 1)
+
+    def test_stats_report(self):
+        self.index.ingest([self.write("grok_local.log", CONVERSATION_LOG),
+                           self.write("x_poller.log", HANDLER_LOG + "2025-03-10 12:02:00,000 - INFO - Posted request: req-9\n")])
+        report = stats_report(self.index)
+        self.assertIn("deepseek-r1 / Developer: n=1 p50=2.50s p95=2.50s p99=2.50s max=2.50s", report)
+        self.assertIn("tasks=1 mean=2.00 max=2 (2x1)", report)
+        self.assertIn("n=1 p50=3.50s", report)
+        self.assertIn("1 request(s) still unanswered", report)
+        empty = LogIndex(os.path.join(self.dir, "empty.sqlite"))
+        self.addCleanup(empty.close)
+        self.assertIn("no model calls logged", stats_report(empty))
+
+if __name__ == "__main__":
+    unittest.main()
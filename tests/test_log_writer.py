@@ -0,0 +1,63 @@
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import tempfile
+import unittest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from grok_local.tools.logging import LogWriter
+
+class TestLogWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.log_file = os.path.join(self.tmp_dir, "grok_local.log")
+        self.jsonl_file = os.path.join(self.tmp_dir, "grok_local.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_batched_text_and_jsonl(self):
+        writer = LogWriter(log_file=self.log_file, jsonl_file=self.jsonl_file)
+        for i in range(500):
+            writer.put((time.time(), f"Model call {i}", "model_call", 0.25, {"agent": "developer"}))
+        writer.close()
+        with open(self.log_file, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 500)
+        self.assertTrue(lines[0].endswith("] Model call 0"))
+        with open(self.jsonl_file, encoding="utf-8") as f:
+            record = json.loads(f.readline())
+        self.assertEqual(record["event"], "model_call")
+        self.assertEqual(record["duration"], 0.25)
+        self.assertEqual(record["agent"], "developer")
+
+    def test_size_rotation(self):
+        writer = LogWriter(log_file=self.log_file)
+        writer.text_file.maxBytes = 2000
+        for i in range(500):
+            writer.put((time.time(), f"line {i}", None, None, {}))
+        writer.close()
+        self.assertTrue(os.path.exists(self.log_file + ".1"))
+        self.assertLessEqual(os.path.getsize(self.log_file), 2000)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        writer = LogWriter(log_file=self.log_file, queue_size=1)
+        for i in range(1000):
+            writer.put((time.time(), f"line {i}", None, None, {}))
+        writer.close()
+        with open(self.log_file, encoding="utf-8") as f:
+            content = f.read()
+        self.assertIn("line 0", content)
+        # Every message is either written or counted in a "dropped" record.
+        written = len(re.findall(r"\] line \d+$", content, re.M))
+        dropped = sum(int(n) for n in re.findall(r"Log queue full: dropped (\d+) message", content))
+        self.assertGreater(dropped, 0)
+        self.assertEqual(written + dropped, 1000)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -5,6 +5,7 @@ import subprocess
 import argparse
 from dotenv import load_dotenv
 from browser_use import Agent  # For real X interaction
+from grok_local.browser_adapter import wait_until, wait_until_stable
 
 PROJECT_DIR = os.getcwd()
 LAST_CMD_FILE = os.path.join(PROJECT_DIR, "last_processed.txt")
@@ -45,14 +46,14 @@ def x_login(headless=True, stub=False):
         # Assuming fill_form takes a dict of field names to values
         agent.fill_form({"username": X_USERNAME, "password": X_PASSWORD})
         agent.submit_form()
-        time.sleep(2)
         # Check if login succeeded (agent.current_url might be current_url())
-        if "login" not in agent.current_url():
-            logger.info("Successfully logged into X via Browser-Use")
-            return agent
-        else:
+        try:
+            wait_until(lambda: "login" not in agent.current_url(), timeout=15, description="post-login redirect")
+        except TimeoutError:
             logger.error("X login failed: Still on login page")
             return None
+        logger.info("Successfully logged into X via Browser-Use")
+        return agent
     except Exception as e:
         logger.error(f"X login error with Browser-Use: {str(e)}")
         return None
@@ -95,8 +96,11 @@ def ask_grok(prompt, fetch=False, headless=False, use_stub=False):
         agent.navigate("https://x.com/i/grok")
         agent.fill_form({"message": prompt}, selector=".grok-input-field")
         agent.submit_form()
-        time.sleep(2)
-        response = agent.extract_text(selector=".grok-response")
+        try:
+            response = wait_until_stable(lambda: agent.extract_text(selector=".grok-response"), stable_ms=1500,
+                                         timeout=120, description="Grok response")
+        except TimeoutError:
+            response = agent.extract_text(selector=".grok-response")
         logger.info(f"Grok 3 response to '{prompt}': {response}")
         return response if response else "No response received"
     except Exception as e: